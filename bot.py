@@ -37,9 +37,16 @@ class Bot:
         """Create a clone of the bot instance"""
         return Bot(self.ai.clone_me())
 
-    def move(self, state):
+    def _next_game(self, state):
+        """Update the current game in place, or start a new one"""
+        if self.game is not None and self.game.is_same_game(state):
+            self.game.update(state)
+            return self.game
+        return Game(state)
+
+    def move(self, state, deadline=None):
         """Return store data provided by A.I
-        and return selected move"""
+        and return selected move, by `deadline` (time.monotonic()) if given"""
         self.state = state        
         # Store status for later report
         try:
@@ -55,7 +62,7 @@ class Bot:
         except AttributeError:
             # First move has no previous move
             pass
-        self.game = Game(self.state)
+        self.game = self._next_game(self.state)
         
         ################################################################
         # Put your call to AI code here
@@ -68,7 +75,7 @@ class Bot:
             self.hero_move, \
             self.nearest_enemy_pos, \
             self.nearest_mine_pos, \
-            self.nearest_tavern_pos = self.ai.decide()
+            self.nearest_tavern_pos = self.ai.decide_by(deadline)
 
         ################################################################
         # /AI
@@ -91,5 +98,5 @@ class Bot:
         except AttributeError:
             # First move has no previous move and no game
             pass
-        self.game = Game(self.state)
+        self.game = self._next_game(self.state)
         
@@ -0,0 +1,273 @@
+"""
+Asyncio tournament client.
+
+One event loop drives every game of a tournament: each game is a coroutine
+that waits on the server while the others play, so dozens of games can be in
+flight without a thread per client.
+
+* HTTP goes through aiohttp when it is installed, otherwise through a
+  pooled `requests` session in a thread pool sized for the games in flight. Any
+  object with the same ``async post(url, data, timeout)`` can stand in for
+  the server; ``local://`` server urls play on the in-process
+  `utils.local_server`.
+* Decisions run in a `DecisionPool` of worker processes, off the event loop.
+  Each game is pinned to one worker, where its `Bot` lives for the whole game,
+  so AIs keep their state from one turn to the next.
+
+Usage::
+
+    tournament = AsyncTournament(configs, games_in_flight=8)
+    results = tournament.run()
+    print(tournament.games_per_minute())
+"""
+
+import asyncio
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import itertools
+import multiprocessing
+import os
+import time
+from typing import NamedTuple
+
+from bot import Bot
+from clients.basic_client import shared_session
+from utils import decision_log
+from utils.local_server import LOCAL_URL, AsyncLocalTransport, shared_server
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+TIMEOUT = 15
+JOIN_TIMEOUT = 10 * 60  # arena games wait for four players
+
+
+class GameResult(NamedTuple):
+    """How one game ended for one of our bots."""
+
+    name: str
+    game_id: str
+    hero_id: int
+    gold: int
+    rank: int  # 1 for the richest hero
+    crashed: bool
+    turns: int
+    seconds: float
+    ranking: tuple  # (name, gold) of every hero
+
+
+class HttpTransport:
+    """Async form POSTs returning JSON, on one pooled session."""
+
+    def __init__(self, threads=32):
+        self.threads = threads  # without aiohttp: blocking calls in flight at once
+        self._session = None
+        self._executor = None
+
+    async def post(self, url, data, timeout=TIMEOUT):
+        if aiohttp is not None:
+            if self._session is None:
+                self._session = aiohttp.ClientSession(headers={'Accept': 'application/json'})
+            async with self._session.post(url, data=data, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+        if self._session is None:
+            self._session = shared_session(pool_size=self.threads)
+            self._executor = concurrent.futures.ThreadPoolExecutor(self.threads, thread_name_prefix="http")
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            self._executor, lambda: self._session.post(url, data, headers={'Accept': 'application/json'},
+                                                       timeout=timeout))
+        response.raise_for_status()
+        return response.json()
+
+    async def close(self):
+        if self._session is None:
+            return
+        if aiohttp is not None:
+            await self._session.close()
+        else:
+            self._executor.shutdown(wait=False)
+        self._session = self._executor = None
+
+
+# -- Worker side: the bots of the games a worker plays ---------------------------
+
+_bots = {}
+
+
+def _start_bot(key, ai):
+    _bots[key] = Bot(brain=ai)
+
+
+def _move(key, state, move_time):
+    deadline = time.monotonic() + move_time if move_time else None
+    return _bots[key].move(state, deadline)
+
+
+def _finish_bot(key):
+    _bots.pop(key, None)
+    decision_log.flush()
+
+
+class DecisionPool:
+    """
+    Worker processes running the bots' decisions.
+
+    Every worker is a single-process executor, and each game goes to one of
+    them for its whole length. A worker that dies is replaced: the games it
+    was playing fail, the next ones pinned to it play on the new worker. With
+    ``workers=0`` the bots decide in the calling process, blocking the event
+    loop (for debugging).
+    """
+
+    def __init__(self, workers=None):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        # Not forked from the running event loop and its threads (see utils.parallel_search)
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self._context = multiprocessing.get_context(method)
+        self._lanes = [self._new_lane() for _ in range(self.workers)]
+        self._next_lane = itertools.cycle(range(self.workers))
+        self._games = {}  # game key -> lane index, None inline
+
+    def _new_lane(self):
+        return concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=self._context)
+
+    async def _call(self, key, function, *args):
+        lane = self._games[key]
+        if lane is None:
+            return function(key, *args)
+        executor = self._lanes[lane]
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, function, key, *args)
+        except BrokenProcessPool:
+            if self._lanes and self._lanes[lane] is executor:
+                executor.shutdown(wait=False)
+                self._lanes[lane] = self._new_lane()
+            raise
+
+    async def start_bot(self, key, ai):
+        self._games[key] = next(self._next_lane) if self._lanes else None
+        await self._call(key, _start_bot, ai)
+
+    async def move(self, key, state, move_time=None):
+        return await self._call(key, _move, state, move_time)
+
+    async def finish_bot(self, key):
+        try:
+            await self._call(key, _finish_bot)
+        finally:
+            del self._games[key]
+
+    def close(self):
+        for lane in self._lanes:
+            lane.shutdown(wait=False, cancel_futures=True)
+        self._lanes = []
+
+
+async def play_game(config, transport, pool, key):
+    """Play one game of `config` (a `config.Config`) and return its `GameResult`."""
+    if config.game_mode == 'training':
+        params = {'key': config.key, 'turns': config.number_of_turns}
+        if config.map_name:
+            params['map'] = config.map_name
+        endpoint = '/api/training'
+    elif config.game_mode == 'arena':
+        params = {'key': config.key}
+        endpoint = '/api/arena'
+    else:
+        raise ValueError(f"Unknown game mode: {config.game_mode}")
+
+    start = time.perf_counter()
+    state = await transport.post(config.server_url + endpoint, params, timeout=JOIN_TIMEOUT)
+    await pool.start_bot(key, config.ai.clone_me())
+    try:
+        while not state['game']['finished']:
+            direction = await pool.move(key, state, config.move_time)
+            state = await transport.post(state['playUrl'], {'dir': direction}, timeout=TIMEOUT)
+    finally:
+        await pool.finish_bot(key)
+
+    hero = state['hero']
+    heroes = sorted(state['game']['heroes'], key=lambda h: h['gold'], reverse=True)
+    rank = 1 + [h['id'] for h in heroes].index(hero['id'])
+    return GameResult(config.ai.name, state['game']['id'], hero['id'], hero['gold'], rank, hero['crashed'],
+                      state['game']['turn'], time.perf_counter() - start,
+                      tuple((h['name'], h['gold']) for h in state['game']['heroes']))
+
+
+class AsyncTournament:
+    """
+    Every config plays its `number_of_games`, up to `games_in_flight` at a time per bot.
+
+    Finished games are rated in `ratings` (a `utils.ratings.RatingLedger`), if given.
+    """
+
+    def __init__(self, configs, games_in_flight=4, workers=None, transport=None, ratings=None):
+        self.configs = configs
+        self.ratings = ratings
+        self.games_in_flight = games_in_flight
+        self.workers = workers
+        self.transport = transport
+        self.results = []
+        self.errors = 0
+        self.seconds = 0.0  # length of the tournament, once finished
+        self._start = None
+
+    def run(self):
+        """Play the whole tournament, return the `GameResult`s."""
+        return asyncio.run(self.run_async())
+
+    async def run_async(self):
+        threads = self.games_in_flight * len(self.configs) + 4
+        if self.transport is not None:
+            transport = self.transport
+        elif all(config.server_url.startswith(LOCAL_URL) for config in self.configs):
+            transport = AsyncLocalTransport(shared_server(), threads=threads)
+        else:
+            transport = HttpTransport(threads=threads)
+        pool = DecisionPool(self.workers)
+        self._start = time.perf_counter()
+        try:
+            await asyncio.gather(*(self._play_all(config, transport, pool) for config in self.configs))
+        finally:
+            self.seconds = time.perf_counter() - self._start
+            pool.close()
+            if self.transport is None:
+                await transport.close()
+            if self.ratings is not None:
+                self.ratings.save()
+        return self.results
+
+    async def _play_all(self, config, transport, pool):
+        slots = asyncio.Semaphore(self.games_in_flight)
+
+        async def play(n):
+            async with slots:
+                try:
+                    result = await play_game(config, transport, pool, f"{config.key}-{n}")
+                except Exception as e:
+                    self.errors += 1
+                    print(f"{config.ai.name}: game {n + 1} failed: {e!r}")
+                    return
+                self.results.append(result)
+                if self.ratings is not None:
+                    self.ratings.record(result.ranking, result.game_id)
+                print(f"{result.name}: game {n + 1}/{config.number_of_games} rank {result.rank} "
+                      f"gold {result.gold} - {self.games_per_minute():.1f} games/minute")
+
+        await asyncio.gather(*(play(n) for n in range(config.number_of_games)))
+
+    def games_played(self):
+        """Distinct games finished (an arena game between our bots counts once)."""
+        return len({result.game_id for result in self.results})
+
+    def games_per_minute(self):
+        """Finished games per minute, so far while running."""
+        if self._start is None:
+            return 0.0
+        seconds = self.seconds or time.perf_counter() - self._start
+        return 60 * self.games_played() / seconds if seconds else 0.0
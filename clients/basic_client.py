@@ -1,18 +1,82 @@
-import ast
 import configparser
 import os
 import select
 import sys
+import threading
 import time
 import traceback
+from collections import deque
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from bot import Bot
 from clients.tui_client import Config
+from utils import decision_log, local_server
+from utils.replay import ReplayWriter, load_states, save_path, save_states
 
 TIMEOUT = 15
 
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def shared_session(pool_size=16, retries=3, keep_alive=True):
+    """
+    Process-wide requests session, reused across games and clients.
+
+    Connections are kept alive in a pool of `pool_size` per host, so games
+    after the first don't pay for the TCP setup. Failed connections are
+    retried `retries` times; requests that reached the server never are, so
+    a move is never sent twice.
+    """
+    settings = (pool_size, retries, keep_alive)
+    with _sessions_lock:
+        session = _sessions.get(settings)
+        if session is None:
+            session = requests.Session()
+            retry = Retry(total=retries, connect=retries, read=0, status=0, backoff_factor=0.1)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            if not keep_alive:
+                session.headers['Connection'] = 'close'
+            _sessions[settings] = session
+        return session
+
+
+class LatencyStats:
+    """Round-trip times of the requests of a client, in seconds."""
+
+    def __init__(self, window=1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)  # for the percentiles
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        """`p`th percentile (0-100) of the recent requests."""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def summary(self):
+        return {'requests': self.count, 'mean_ms': round(1000 * self.mean, 1),
+                'p50_ms': round(1000 * self.percentile(50), 1), 'p95_ms': round(1000 * self.percentile(95), 1),
+                'max_ms': round(1000 * self.max, 1)}
+
 
 class ClientWithSaveAndLoad:
     def __init__(self, config=Config()):
@@ -25,10 +89,13 @@ class ClientWithSaveAndLoad:
         self.ai = config.ai
         self.bot = Bot(brain=self.ai)
         self.states = []
+        self.recorder = None  # ReplayWriter of the game being played, with config.save_games
         self.delay = config.delay
         self.victory = 0
         self.time_out = 0
         self.log_win = True
+        self.latency = LatencyStats()  # move round-trips, over all the games
+        self.ratings = None  # optional utils.ratings.RatingLedger, updated after every game
 
     def load_config(self):
         config_parser = configparser.ConfigParser()
@@ -66,17 +133,24 @@ class ClientWithSaveAndLoad:
     def load_game(self, game_file_name):
         self.states = []
         try:
-            with open(game_file_name, "r") as game_file:
-                for line in game_file.readlines():
-                    if len(line.strip(chr(0)).strip()) > 0:
-                        self.states.append(ast.literal_eval(line))
+            self.states = list(load_states(game_file_name))
             self.state = self.states[0]
-        except (IOError, IndexError) as e:
+        except (IOError, IndexError, ValueError, SyntaxError) as e:
             print("Error while loading game file", game_file_name, ":", e)
             quit(1)
 
+    def record_state(self, state):
+        """Keep a state received from the server, and append it to the game's replay file when saving games."""
+        self.states.append(state)
+        if self.recorder is not None:
+            self.recorder.append(state)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
     def save_game(self):
-        user_home_dir = os.path.expanduser("~")
         try:
             game_id = self.state['game']["id"]
         except KeyError:
@@ -85,16 +159,16 @@ class ClientWithSaveAndLoad:
             except IndexError:
                 self.pprint("No states available for this game, unable to save game.")
                 return
-        game_file_name = os.path.join(user_home_dir, ".vindinium", "save", game_id)
         try:
-            if not os.path.isdir(os.path.join(user_home_dir, ".vindinium", "save")):
-                os.makedirs(os.path.join(user_home_dir, ".vindinium", "save"))
-            with open(game_file_name, "w") as game_file:
-                for state in self.states:
-                    game_file.write(str(state) + "\n")
+            game_file_name = save_path(game_id)
+            if self.recorder is not None and self.recorder.path == game_file_name:
+                # Already written turn by turn
+                self.recorder.flush()
+            else:
+                save_states(game_file_name, self.states)
             self.pprint("Game saved: " + game_file_name)
         except IOError as e:
-            print("Error  while saving game file", game_file_name, ":", e)
+            print("Error  while saving game file", game_id, ":", e)
 
     def pprint(self, *args, **kwargs):
         printable = ""
@@ -149,12 +223,17 @@ class BasicClient(ClientWithSaveAndLoad):
                             gold = int(player.gold)
                     if winner[1] == self.bot.game.hero.bot_id:
                         self.victory += 1
+                    if self.ratings is not None and self.bot.game.finished:
+                        self.ratings.record([(player.name, player.gold) for player in self.bot.game.heroes],
+                                            self.bot.game.id)
+                        self.ratings.save()
                 self.pprint("* " + winner[0] + " wins. ******************")
                 summary = str(i + 1) + "/" + str(self.config.number_of_games),
                 str(self.victory) + "/" + str(i + 1),
                 str(self.time_out) + "/" + str(i + 1)
                 self.pprint(summary)
                 self.pprint("Game finished: " + str(i + 1) + "/" + str(self.config.number_of_games))
+                self.pprint("Move latency:", **self.latency.summary())
 
     def replay(self):
         """Replay last game"""
@@ -182,9 +261,12 @@ class BasicClient(ClientWithSaveAndLoad):
         self.bot = self.get_bot()
         # Default move is no move !
         direction = "Stay"
-        # Create a requests session that will be used throughout the game
+        # Pooled session shared by all games and clients: connections are kept alive
         self.pprint('Connecting...')
-        self.session = requests.session()
+        if self.config.server_url.startswith(local_server.LOCAL_URL):
+            self.session = local_server.shared_server().session()
+        else:
+            self.session = shared_session(self.config.pool_size, self.config.retries, self.config.keep_alive)
         if self.config.game_mode == 'arena':
             self.pprint('Waiting for other players to join...')
         try:
@@ -223,10 +305,15 @@ class BasicClient(ClientWithSaveAndLoad):
             self.pprint("Error details:", str(e))
             self.running = False
             return
+        if self.config.save_games:
+            # Written as the game goes, turn by turn
+            self.recorder = ReplayWriter(save_path(self.state['game']['id']))
+            self.recorder.append(self.state)
         for i in range(self.config.number_of_turns + 1):
             if self.running:
                 # Choose a move
                 self.start_time = time.time()
+                deadline = self.move_deadline()
                 try:
                     while sys.stdin in select.select([sys.stdin], [], [], 0)[0]:
                         line = sys.stdin.read(1)
@@ -239,7 +326,7 @@ class BasicClient(ClientWithSaveAndLoad):
                         elif line.strip() == "s":
                             self.save_game()
                     if self.bot.running:
-                        direction = self.bot.move(self.state)
+                        direction = self.bot.move(self.state, deadline)
                 except Exception as e:
                     # Super error trap !
                     if self.log_win:
@@ -248,14 +335,15 @@ class BasicClient(ClientWithSaveAndLoad):
                         traceback.print_exc()
                         self.pprint("Error at client.start_game:", str(e))
                     self.running = False
+                    self.stop_recording()
                     return
                 if not self.is_game_over():
                     # Send the move and receive the updated game state
                     self.game_url = self.state['playUrl']
                     self.state = self.send_move(direction)
-                    self.states.append(self.state)
-        # Clean up the session
-        self.session.close()
+                    self.record_state(self.state)
+        self.stop_recording()
+        decision_log.flush()
 
     def get_new_game_state(self):
         if self.config.game_mode == 'training':
@@ -321,6 +409,12 @@ class BasicClient(ClientWithSaveAndLoad):
             self.running = False
             return None
 
+    def move_deadline(self):
+        """time.monotonic() the AI must return its move by, None if unlimited"""
+        if not self.config.move_time:
+            return None
+        return time.monotonic() + self.config.move_time
+
     def is_game_over(self):
         try:
             return self.state['game']['finished']
@@ -329,7 +423,9 @@ class BasicClient(ClientWithSaveAndLoad):
 
     def send_move(self, direction):
         try:
+            start = time.perf_counter()
             response = self.session.post(self.game_url, {'dir': direction}, timeout=TIMEOUT)
+            self.latency.record(time.perf_counter() - start)
             if response.status_code == 200:
                 return response.json()
             else:
@@ -9,9 +9,9 @@ import select
 import time
 import os
 import configparser
-import ast
 
 from config import Config
+from utils.replay import load_states, save_path, save_states
 
 TIMEOUT = 15
 
@@ -100,12 +100,9 @@ class Client:
         # Reset our bot and self.states
         self.states = []
         try:
-            with open(game_file_name, "r") as game_file:
-                for line in game_file.readlines():
-                    if len(line.strip(chr(0)).strip()) > 0:
-                        self.states.append(ast.literal_eval(line))
+            self.states = list(load_states(game_file_name))
             self.state = self.states[0]
-        except (IOError, IndexError) as e:
+        except (IOError, IndexError, ValueError, SyntaxError) as e:
             self.gui.quit_ui()
             print ("Error while loading game file", game_file_name, ":", e)
             quit(1)
@@ -126,11 +123,7 @@ class Client:
                 return
         game_file_name = os.path.join(user_home_dir, ".vindinium", "save", game_id)
         try:
-            if not os.path.isdir(os.path.join(user_home_dir, ".vindinium", "save")):
-                os.makedirs(os.path.join(user_home_dir, ".vindinium", "save"))
-            with open(game_file_name, "w") as game_file:
-                for state in self.states:
-                    game_file.write(str(state)+"\n")
+            save_states(save_path(game_id), self.states)
             self.pprint("Game saved: "+game_file_name)
         except IOError as e:
             self.gui.append_log("Error  while saving game file", game_file_name, ":", e)
@@ -328,6 +321,7 @@ class Client:
             if self.running:
                 # Choose a move
                 self.start_time = time.time()
+                deadline = self.move_deadline()
                 try:
                     while sys.stdin in select.select([sys.stdin], [], [], 0)[0]:
                         line = sys.stdin.read(1)
@@ -340,7 +334,7 @@ class Client:
                         elif line.strip() == "s":
                             self.save_game()
                     if self.bot.running:
-                        direction = self.bot.move(self.state)
+                        direction = self.bot.move(self.state, deadline)
                         self.display_game()
                 except Exception as e:
                     # Super error trap !
@@ -475,6 +469,12 @@ class Client:
             self.running = False
             return None
 
+    def move_deadline(self):
+        """time.monotonic() the AI must return its move by, None if unlimited"""
+        if not self.config.move_time:
+            return None
+        return time.monotonic() + self.config.move_time
+
     def is_game_over(self):
         """Return True if game defined by state is over"""
         try:
@@ -6,7 +6,12 @@ class Config:
                  map_name="m3",
                  delay=0.1,
                  ai=None,
-                 key=None):
+                 key=None,
+                 move_time=0.8,
+                 pool_size=16,
+                 retries=3,
+                 keep_alive=True,
+                 save_games=False):
         self.game_mode = game_mode
         self.number_of_games = number_of_games
         self.number_of_turns = number_of_turns
@@ -15,6 +20,11 @@ class Config:
         self.key = key
         self.ai = ai
         self.delay = delay  # Delay in seconds between turns in replay mode
+        self.move_time = move_time  # Seconds the AI may think per move, None for no limit
+        self.pool_size = pool_size  # HTTP connections kept per host, shared by all clients
+        self.retries = retries  # Retries of failed connections to the server
+        self.keep_alive = keep_alive  # Reuse connections across requests and games
+        self.save_games = save_games  # Write every game to ~/.vindinium/save as it is played
 
     @staticmethod
     def from_dict(config_dict):
@@ -27,5 +37,10 @@ class Config:
             map_name=config_dict.get('map_name', 'm3'),
             ai=config_dict.get('ai', None),
             key=config_dict.get('ai', None).key,
-            delay=config_dict.get('delay', 0.1)
+            delay=config_dict.get('delay', 0.1),
+            move_time=config_dict.get('move_time', 0.8),
+            pool_size=config_dict.get('pool_size', 16),
+            retries=config_dict.get('retries', 3),
+            keep_alive=config_dict.get('keep_alive', True),
+            save_games=config_dict.get('save_games', False)
         )
@@ -17,7 +17,10 @@ Modules
   then `decide()` each turn.
 """
 
-from typing import List, Tuple
+from typing import List, NamedTuple, Sequence, Tuple
+
+from utils.board import Board
+from utils.path_service import PathService
 
 
 # ---------------------------------------------------------------------------
@@ -25,9 +28,49 @@ from typing import List, Tuple
 # ---------------------------------------------------------------------------
 
 
+class HeroState(NamedTuple):
+    """Immutable hero snapshot for search; branch it with `_replace`."""
+
+    bot_id: int
+    pos: Tuple[int, int]
+    life: int
+    gold: int
+    mines: Tuple[Tuple[int, int], ...]
+    mine_count: int
+    spawn_pos: Tuple[int, int]
+    crashed: bool
+
+
+class GameState(NamedTuple):
+    """Immutable game snapshot for search.
+
+    `hero` is the bot's own hero, `heroes` all four (including a separate
+    snapshot of the bot's hero, as in `Game`). Snapshots share everything
+    they don't change, so branching one only costs the fields replaced.
+    """
+
+    turn: int
+    max_turns: int
+    hero: HeroState
+    heroes: Tuple[HeroState, ...]
+    board_map: Sequence[str]  # read-only rows
+
+    def replace_hero(self, hero: HeroState) -> "GameState":
+        """The same state with the bot's own hero replaced."""
+        return self._replace(hero=hero)
+
+    def replace_heroes(self, *changed: HeroState) -> "GameState":
+        """The same state with the heroes of the same `bot_id` as `changed` replaced."""
+        by_id = {h.bot_id: h for h in changed}
+        return self._replace(heroes=tuple(by_id.get(h.bot_id, h) for h in self.heroes))
+
+
 class Hero:
     """A minimal mirror of the JSON hero structure."""
 
+    __slots__ = ("bot_id", "life", "gold", "pos", "reversePos", "spawn_pos", "crashed", "mine_count", "mines",
+                 "name", "elo", "user_id", "last_move")
+
     def __init__(self, hero_dict: dict):
         self.bot_id: int = hero_dict["id"]  # ← server uses "id" in JSON
         self.life: int = hero_dict["life"]
@@ -47,15 +90,56 @@ class Hero:
         self.user_id: int = hero_dict.get("userId", 0)
         self.last_move: str | None = hero_dict.get("lastDir")
 
+    def update(self, hero_dict: dict):
+        """Refresh the fields that change from one turn to the next."""
+        self.life = hero_dict["life"]
+        self.gold = hero_dict["gold"]
+        self.pos = (hero_dict["pos"]["x"], hero_dict["pos"]["y"])
+        self.reversePos = self.pos
+        self.crashed = hero_dict["crashed"]
+        self.mine_count = hero_dict["mineCount"]
+        self.mines = []  # filled later by Game
+        self.elo = hero_dict.get("elo", 0)
+        self.last_move = hero_dict.get("lastDir")
+
+    def snapshot(self) -> HeroState:
+        return HeroState(self.bot_id, self.pos, self.life, self.gold, tuple(self.mines), self.mine_count,
+                         self.spawn_pos, self.crashed)
+
+
+class GameChanges:
+    """What changed between two consecutive states of a game.
+
+    Every attribute maps a key to an ``(old, new)`` pair and only holds the
+    entries that actually changed: `moved`, `life` and `gold` are keyed by
+    hero id, `mines` by mine position (owners are hero ids, None if neutral).
+    """
+
+    def __init__(self, turn=None):
+        self.turn = turn
+        self.moved = {}
+        self.life = {}
+        self.gold = {}
+        self.mines = {}
+
+    def __bool__(self):
+        return bool(self.moved or self.life or self.gold or self.mines)
+
+    def __repr__(self):
+        return (f"GameChanges(turn={self.turn}, moved={self.moved}, life={self.life}, "
+                f"gold={self.gold}, mines={self.mines})")
+
 
 class Game:
     """Wrapper that parses the raw game JSON into handy structures."""
 
     def __init__(self, state: dict):
         self.state = state
+        self.id = None
         self.mines = {}  # Dictionary to store mine ownership
         self.mines_locs = []  # List of mine positions
         self.spawn_points_locs = {}
+        self.spawns = set()  # spawn cell indexes, shared by the boards of this game
         self.taverns_locs = []
         self.hero = None
         self.heroes = []
@@ -66,10 +150,65 @@ class Game:
         self.max_turns = None
         self.finished = None
         self.board_size = None
-        self.board_map = []
+        self.board: Board | None = None  # compact index-based board
+        self.board_map = []  # legacy list-of-strings view
+        self.paths = PathService()  # memoized pathfinding for this turn
+        self.changes = GameChanges()  # filled by update()
 
         self.process_data(self.state)
 
+    def is_same_game(self, state: dict) -> bool:
+        """True if `state` is a later turn of this game (so `update` can be used)."""
+        try:
+            game = state['game']
+            return game.get('id') == self.id and game['board']['size'] == self.board_size
+        except (KeyError, TypeError):
+            return False
+
+    def update(self, state: dict) -> GameChanges:
+        """Move to the next turn's state in place.
+
+        Hero objects, the shared topology and the Game itself are kept; only
+        positions, life, gold and mine owners are refreshed. Returns (and
+        stores in `self.changes`) what changed since the previous state.
+        """
+        changes = GameChanges((self.turn, state['game']['turn']))
+        before = {h.bot_id: (h.pos, h.life, h.gold) for h in self.heroes}
+        owners_before = dict(self.mines)
+
+        self.state = state
+        self.set_url(state['viewUrl'])
+        self.hero.update(state['hero'])
+        game = state['game']
+        self.turn = game['turn']
+        self.max_turns = game['maxTurns']
+        self.finished = game['finished']
+        heroes = {h.bot_id: h for h in self.heroes}
+        for hero_dict in game['heroes']:
+            heroes[hero_dict['id']].update(hero_dict)
+        self.process_board(game['board'])
+        self.mark_spawns()
+        self.paths.invalidate()
+
+        for hero in self.heroes:
+            pos, life, gold = before[hero.bot_id]
+            if hero.pos != pos:
+                changes.moved[hero.bot_id] = (pos, hero.pos)
+            if hero.life != life:
+                changes.life[hero.bot_id] = (life, hero.life)
+            if hero.gold != gold:
+                changes.gold[hero.bot_id] = (gold, hero.gold)
+        for mine, owner in self.mines.items():
+            if owners_before.get(mine) != owner:
+                changes.mines[mine] = (owners_before.get(mine), owner)
+        self.changes = changes
+        return changes
+
+    def snapshot(self) -> GameState:
+        """Immutable copy of the current turn, cheap to branch during search."""
+        return GameState(self.turn, self.max_turns, self.hero.snapshot(),
+                         tuple(h.snapshot() for h in self.heroes), tuple(self.board_map))
+
     def process_data(self, state):
         """Parse the game state"""
         self.set_url(state['viewUrl'])
@@ -88,6 +227,7 @@ class Game:
         """Process the game data"""
         process = {'board': self.process_board,
                    'heroes': self.process_heroes}
+        self.id = game.get('id')
         self.turn = game['turn']
         self.max_turns = game['maxTurns']
         self.finished = game['finished']
@@ -97,61 +237,42 @@ class Game:
 
     def process_board(self, board):
         """Process the board datas
-            - Retrieve walls locs, tavern locs
+            - Builds the compact index-based `Board`
+            - Retrieve walls locs, tavern locs (shared, computed once per map)
             - Converts tiles in a displayable form"""
         self.board_size = board['size']
-        tiles = board['tiles']
-        map_line = ""
-        char = None
-        for y in range(0, len(tiles), self.board_size * 2):
-            line = tiles[y:y + self.board_size * 2]
-            for x in range(0, len(line), 2):
-                tile = line[x:x + 2]
-                tile_coords = (y // self.board_size // 2, x // 2)
-                if tile[0] == " ":
-                    # It's passable
-                    char = " "
-                elif tile[0] == "#":
-                    # It's a wall
-                    char = "#"
-                    self.walls_locs.append(tile_coords)
-                elif tile[0] == "$":
-                    # It's a mine
-                    char = "$"
-                    self.mines_locs.append(tile_coords)
-                    # Handle mine ownership: '-' means no owner, otherwise it's a player ID
-                    owner = tile[1]
-                    if owner == '-':
-                        self.mines[tile_coords] = None  # No owner
-                    else:
-                        self.mines[tile_coords] = int(owner)
-                        if owner == str(self.hero.bot_id):
-                            # This mine belongs to me
-                            self.hero.mines.append(tile_coords)
-                elif tile[0] == "[":
-                    # It's a tavern
-                    char = "T"
-                    self.taverns_locs.append(tile_coords)
-                elif tile[0] == "@":
-                    # It's a hero
-                    char = "H"
-                    if not int(tile[1]) == self.hero.bot_id:
-                        # I don't want to be put in an array !
-                        # I'm not a number, i'm a free bot:-)
-                        self.heroes_locs.append(tile_coords)
-                    else:
-                        # And I want to be differenciated
-                        char = "@"
-                map_line = map_line + str(char)
-            self.board_map.append(map_line)
-            map_line = ""
+        self.board = Board.from_tiles(self.board_size, board['tiles'], self.spawns)
+        topology = self.board.topology
+        coords = self.board.coords
+        self.walls_locs = topology.walls_locs
+        self.taverns_locs = topology.taverns_locs
+        self.mines_locs = topology.mines_locs
+        # Mine ownership: None means no owner, otherwise it's a player ID
+        self.mines = dict.fromkeys(self.mines_locs)
+        for i, owner in sorted(self.board.owned_mines().items()):
+            tile_coords = coords(i)
+            self.mines[tile_coords] = owner
+            if owner == self.hero.bot_id:
+                # This mine belongs to me
+                self.hero.mines.append(tile_coords)
+        # I don't want to be put in an array !
+        # I'm not a number, i'm a free bot:-)
+        self.heroes_locs = [coords(i) for hero_id, i in sorted(self.board.heroes.items(), key=lambda h: h[1])
+                            if hero_id != self.hero.bot_id]
+        # And I want to be differenciated
+        self.board_map = self.board.rows(self.hero.bot_id)
 
     def process_heroes(self, heroes: list):
         for h in heroes:
             self.spawn_points_locs[(h["spawnPos"]["y"], h["spawnPos"]["x"])] = h["id"]
             hero_obj = Hero(h)
             self.heroes.append(hero_obj)
-            # Mark spawn on map unless occupied by hero char
+            self.spawns.add(self.board.index(hero_obj.spawn_pos))
+        self.mark_spawns()
+
+    def mark_spawns(self):
+        """Mark spawns on map unless occupied by hero char"""
+        for hero_obj in self.heroes:
             line = list(self.board_map[hero_obj.spawn_pos[1]])
             if line[hero_obj.spawn_pos[0]] not in {"@", "H"}:
                 line[hero_obj.spawn_pos[0]] = "X"
@@ -17,7 +17,8 @@ import select
 import time
 import os
 import configparser
-import ast
+
+from utils.replay import ReplayWriter, save_path, save_states
 
 # =============================================================================
 # CONFIGURATION SECTION - EDIT THESE DICTIONARIES TO CONFIGURE YOUR GAME
@@ -76,6 +77,7 @@ class ManualClient:
         self.config = self._create_config_from_dictionaries()
         self.bot = Bot()  # Our bot
         self.states = []
+        self.recorder = None  # ReplayWriter of the game being played, with auto_save_games
         self.delay = GENERAL_CONFIG.get("delay_between_moves", 0.5)
         self.victory = 0
         self.time_out = 0
@@ -189,11 +191,11 @@ class ManualClient:
                 return
         game_file_name = os.path.join(user_home_dir, ".vindinium", "save", game_id)
         try:
-            if not os.path.isdir(os.path.join(user_home_dir, ".vindinium", "save")):
-                os.makedirs(os.path.join(user_home_dir, ".vindinium", "save"))
-            with open(game_file_name, "w") as game_file:
-                for state in self.states:
-                    game_file.write(str(state) + "\n")
+            if self.recorder is not None and self.recorder.path == save_path(game_id):
+                # Already written turn by turn
+                self.recorder.flush()
+            else:
+                save_states(save_path(game_id), self.states)
             self.pprint("Game saved:", game_file_name)
         except IOError as e:
             self.pprint("Error while saving game file", game_file_name, ":", e)
@@ -276,7 +278,12 @@ class ManualClient:
             self.pprint("Error details:", str(e))
             self.running = False
             return
-            
+
+        if GENERAL_CONFIG.get("auto_save_games", True):
+            # Written as the game goes, turn by turn
+            self.recorder = ReplayWriter(save_path(self.state['game']['id']))
+            self.recorder.append(self.state)
+
         # Game loop
         for i in range(self.config.number_of_turns + 1):
             if self.running:
@@ -301,6 +308,7 @@ class ManualClient:
                 except Exception as e:
                     self.pprint("Error during game:", str(e))
                     self.running = False
+                    self.stop_recording()
                     return
                     
                 if not self.is_game_over():
@@ -308,15 +316,23 @@ class ManualClient:
                     self.game_url = self.state['playUrl']
                     self.state = self.send_move(direction)
                     self.states.append(self.state)
+                    if self.recorder is not None:
+                        self.recorder.append(self.state)
                 else:
                     break
                     
         # Clean up the session
         self.session.close()
         
-        # Auto-save game if enabled
-        if GENERAL_CONFIG.get("auto_save_games", True):
-            self.save_game()
+        # Auto-saved game: complete
+        if self.recorder is not None:
+            self.pprint("Game saved:", self.recorder.path)
+        self.stop_recording()
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
 
     def display_game_info(self):
         """Display simplified game information (console version)"""
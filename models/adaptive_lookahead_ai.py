@@ -1,7 +1,5 @@
 from models.ai_base import AIBase, Actions, MapElements, Directions
-from utils.path_finder import bfs_from_xy_to_nearest_char, bfs_from_xy_to_xy
-from utils.grid_helpers import replace_map_values
-from copy import deepcopy
+from utils.simulator import SimState
 
 class AI(AIBase):
     MINE_VALUE = 50
@@ -13,17 +11,17 @@ class AI(AIBase):
     LOOKAHEAD_DEPTH = 3  # 2-ply minimax
 
     def decide(self):
-        # Initialize pathfinding cache for this turn
-        self._path_cache = {}
+        # Pathfinding is memoized for the turn by self.paths
         self._eval_cache = {}
         if self.game is None or getattr(self.game, 'hero', None) is None:
             return self._package(path=[(0, 0)], action=Actions.WAIT, decisions={}, hero_move=Directions.STAY)
-        hero = self.game.hero
-        game = self.game
+        # The search makes and unmakes moves on a single simulated state
+        sim = SimState.from_game(self.game)
+        game = sim.snapshot(self.game.hero.bot_id)
+        hero = game.hero
         remaining_turns = getattr(game, 'max_turns', 0) - getattr(game, 'turn', 0)
         enemies = [h for h in getattr(game, 'heroes', []) if getattr(h, 'bot_id', None) != getattr(hero, 'bot_id', None)]
-        owned_mines = set(getattr(hero, 'mines', []))
-        game_map = replace_map_values(getattr(game, 'board_map', []), owned_mines, 'O')
+        game_map = game.board_map  # owned mines are marked 'O'
 
         # Get all possible actions for the hero
         actions = self._get_possible_actions(game_map, hero, enemies, remaining_turns)
@@ -32,11 +30,9 @@ class AI(AIBase):
 
         best_action = None
         best_score = float('-inf')
-        for action in actions:
-            # Simulate this action and enemy's best response (2-ply minimax)
-            sim_game, sim_hero, sim_enemies, sim_map = self._simulate_action(game, hero, enemies, game_map, action)
-            score = self._min_value(sim_game, sim_hero, sim_enemies, sim_map, self.LOOKAHEAD_DEPTH - 1)
-            if score > best_score:
+        # Root actions are independent: they may be scored in parallel
+        for action, score in zip(actions, self.search_map('_score_action', actions)):
+            if score is not None and score > best_score:
                 best_score = score
                 best_action = action
 
@@ -53,25 +49,20 @@ class AI(AIBase):
             hero_move=direction
         )
 
+    def _score_action(self, action):
+        """Simulate this action and enemy's best response (2-ply minimax)"""
+        sim = SimState.from_game(self.game)
+        me = self.game.hero.bot_id
+        undo = self._simulate_action(sim, me, action)
+        score = self._min_value(sim, me, self.LOOKAHEAD_DEPTH - 1)
+        sim.unmake(undo)
+        return score
+
     def _cache_bfs_from_xy_to_nearest_char(self, game_map, start_pos, end_char):
-        key = (self._hashable_map(game_map), start_pos, end_char)
-        if key in self._path_cache:
-            return self._path_cache[key]
-        result = bfs_from_xy_to_nearest_char(game_map, start_pos, end_char)
-        self._path_cache[key] = result
-        return result
+        return self.paths.bfs_from_xy_to_nearest_char(game_map, start_pos, end_char)
 
     def _cache_bfs_from_xy_to_xy(self, game_map, start_pos, target_pos):
-        key = (self._hashable_map(game_map), start_pos, target_pos)
-        if key in self._path_cache:
-            return self._path_cache[key]
-        result = bfs_from_xy_to_xy(game_map, start_pos, target_pos)
-        self._path_cache[key] = result
-        return result
-
-    def _hashable_map(self, game_map):
-        # Convert map to a tuple of strings for hashing
-        return tuple(tuple(row) if isinstance(row, list) else row for row in game_map)
+        return self.paths.bfs_from_xy_to_xy(game_map, start_pos, target_pos)
 
     def _get_possible_actions(self, game_map, hero, enemies, remaining_turns):
         actions = []
@@ -94,67 +85,57 @@ class AI(AIBase):
         actions.append({'path': [getattr(hero, 'pos', (0, 0)), getattr(hero, 'pos', (0, 0))], 'action': Actions.WAIT})
         return actions
 
-    def _simulate_action(self, game, hero, enemies, game_map, action):
-        # Deepcopy everything for simulation
-        sim_game = deepcopy(game)
-        sim_hero = deepcopy(hero)
-        sim_enemies = deepcopy(enemies)
-        sim_map = deepcopy(game_map)
-        # Move hero
-        if not action['path'] or len(action['path']) < 2:
-            return sim_game, sim_hero, sim_enemies, sim_map
-        next_pos = action['path'][1]
-        sim_hero.pos = next_pos
-        if action['action'] == Actions.NEAREST_TAVERN:
-            sim_hero.life = min(100, sim_hero.life + 50)
-            sim_hero.gold = max(0, sim_hero.gold - 2)
-        elif action['action'] == Actions.TAKE_NEAREST_MINE:
-            sim_hero.life -= 20
-            if next_pos not in sim_hero.mines:
-                sim_hero.mines.append(next_pos)
-        elif action['action'] == Actions.ATTACK_NEAREST:
-            for enemy in sim_enemies:
-                if enemy.pos == next_pos:
-                    enemy.life -= 20
-                    if enemy.life <= 0:
-                        sim_hero.gold += 10
-        sim_hero.life -= 1  # Life cost per move
-        # Mark owned mines with 'O'
-        owned_mines = set(sim_hero.mines)
-        if sim_map and owned_mines:
-            sim_map = replace_map_values(sim_map, owned_mines, 'O')
-        return sim_game, sim_hero, sim_enemies, sim_map
+    def _simulate_action(self, sim, hero_id, action):
+        """Play the first step of `action` for `hero_id`; return the undo record."""
+        direction = Directions.STAY
+        if action['path'] and len(action['path']) >= 2:
+            direction = sim.move_towards(hero_id, action['path'][1])
+        return sim.make(hero_id, direction)
 
-    def _min_value(self, game, hero, enemies, game_map, depth):
-        if depth == 0 or getattr(hero, 'life', 0) <= 0:
-            return self._evaluate_state(game, hero, enemies)
+    def _min_value(self, sim, me, depth):
+        game = sim.snapshot(me)
+        hero = game.hero
+        enemies = [h for h in game.heroes if h.bot_id != me]
+        died = sim.deaths[me] > 0
+        if depth == 0 or died:
+            return self._evaluate_state(game, hero, enemies, died)
         # Simulate enemy's best move (assume only one enemy for simplicity)
         min_score = float('inf')
         for enemy in enemies:
-            enemy_actions = self._get_possible_actions(game_map, enemy, [hero] + [e for e in enemies if e != enemy], getattr(game, 'max_turns', 0) - getattr(game, 'turn', 0))
+            # The enemy plans on its own view of the board
+            view = sim.snapshot(enemy.bot_id)
+            others = [h for h in view.heroes if h.bot_id != enemy.bot_id]
+            enemy_actions = self._get_possible_actions(view.board_map, enemy, others, getattr(game, 'max_turns', 0) - getattr(game, 'turn', 0))
             for action in enemy_actions:
-                sim_game, sim_enemy, sim_heroes, sim_map = self._simulate_action(game, enemy, [hero] + [e for e in enemies if e != enemy], game_map, action)
+                undo = self._simulate_action(sim, enemy.bot_id, action)
                 # Now it's our turn again
-                score = self._max_value(sim_game, hero, enemies, sim_map, depth - 1)
+                score = self._max_value(sim, me, depth - 1)
+                sim.unmake(undo)
                 if score < min_score:
                     min_score = score
         return min_score
 
-    def _max_value(self, game, hero, enemies, game_map, depth):
-        if depth == 0 or getattr(hero, 'life', 0) <= 0:
-            return self._evaluate_state(game, hero, enemies)
+    def _max_value(self, sim, me, depth):
+        game = sim.snapshot(me)
+        hero = game.hero
+        enemies = [h for h in game.heroes if h.bot_id != me]
+        died = sim.deaths[me] > 0
+        if depth == 0 or died:
+            return self._evaluate_state(game, hero, enemies, died)
         max_score = float('-inf')
-        actions = self._get_possible_actions(game_map, hero, enemies, getattr(game, 'max_turns', 0) - getattr(game, 'turn', 0))
+        actions = self._get_possible_actions(game.board_map, hero, enemies, getattr(game, 'max_turns', 0) - getattr(game, 'turn', 0))
         for action in actions:
-            sim_game, sim_hero, sim_enemies, sim_map = self._simulate_action(game, hero, enemies, game_map, action)
-            score = self._min_value(sim_game, sim_hero, sim_enemies, sim_map, depth - 1)
+            undo = self._simulate_action(sim, me, action)
+            score = self._min_value(sim, me, depth - 1)
+            sim.unmake(undo)
             if score > max_score:
                 max_score = score
         return max_score
 
-    def _evaluate_state(self, game, hero, enemies):
+    def _evaluate_state(self, game, hero, enemies, died=False):
         # Use a cache key based on hero/enemy/mines/life/gold/pos for repeated states
         cache_key = (
+            died,
             tuple(sorted(getattr(hero, 'mines', []))),
             getattr(hero, 'life', 0),
             getattr(hero, 'gold', 0),
@@ -169,7 +150,7 @@ class AI(AIBase):
         score += getattr(hero, 'gold', 0) * self.GOLD_VALUE
         for enemy in enemies:
             score -= len(getattr(enemy, 'mines', [])) * self.ENEMY_MINE_PENALTY
-        if getattr(hero, 'life', 0) <= 0:
+        if died or getattr(hero, 'life', 0) <= 0:
             score -= self.DEATH_PENALTY
         # Bonus for being near a tavern if low HP
         if getattr(hero, 'life', 100) < 40:
@@ -1,11 +1,16 @@
 from abc import ABC, abstractmethod
-from collections import deque
+from collections import Counter, deque
 from enum import Enum
+import copy
+import math
 import os
-import csv
+import threading
+import time
 from datetime import datetime
 
 from game import Game
+from utils import decision_log, log
+from utils.path_service import PathService
 
 
 class MapElements(str, Enum):
@@ -63,26 +68,209 @@ class Actions(str, Enum):
     EXPLORE = "EXPLORE"
 
 
+# Orders a late decide_by() search's _package against the watchdog giving up on it
+_package_lock = threading.Lock()
+
+
+def _after_fork_in_child():
+    global _package_lock
+    _package_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
 class AIBase(ABC):
+    DEADLINE_MARGIN = 0.05  # seconds kept before the deadline to package and send the move
+    # decide() bounds its own time (`time_budget`) and `publish`es its best move so far,
+    # so decide_by() can run it in a watchdog thread and play on without it
+    ANYTIME = False
+
     def __init__(self, name: str = "UnknownAIName", key: str = "UnknownKey"):
         self.game: Game | None = None
         self.prev_life: int | None = None
         self.key = key  # Unique identifier for the AI instanceer for the AI instance
         self.name = name
+        self.log = log.ai_logger(name)
+        self._path_counters = Counter()  # pathfinding counters of the previous turns
+        self.search_pool = None  # optional utils.parallel_search.SearchPool
+        self.deadline = None  # time.monotonic() the current move is due by, None: no limit
+        self.overruns = 0  # moves decide() didn't return in time for
+        self._published = None  # best move so far of the current turn, see publish()
+        self._worker = None  # watchdog thread of decide_by()
+        self._stale = False  # a decide_by() search copy given up on: its move is never played
+        self._packaged = False  # a decide_by() search copy has packaged its move
+        self.log_decisions = True  # write a row per move to utils.decision_log
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['search_pool'] = None  # copies sent to the workers search serially
+        state['_worker'] = None
+        return state
 
     def clone_me(self):
         """Create a clone of the AI instance."""
-        return self.__class__(name=self.name, key=self.key)
+        clone = self.__class__(name=self.name, key=self.key)
+        clone.log_decisions = self.log_decisions
+        return clone
 
     def process(self, game: Game):
+        if self.game is not None and self.game is not game:
+            self._path_counters.update(self.game.paths.counters)
         self.game = game
 
+    @property
+    def paths(self) -> PathService:
+        """The memoizing pathfinding service of the current turn."""
+        return self.game.paths
+
+    def path_stats(self):
+        """Pathfinding counters (queries, hits, hit rate...) since this AI was created."""
+        counters = Counter(self._path_counters)
+        if self.game is not None:
+            counters.update(self.game.paths.counters)
+        return PathService.summarize(counters)
+
+    def search_map(self, method, candidates):
+        """
+        `[self.<method>(c) for c in candidates]`, in `search_pool`'s processes if set.
+
+        Results that didn't come back in time are None.
+        """
+        if self.search_pool is None or len(candidates) < 2:
+            return [getattr(self, method)(candidate) for candidate in candidates]
+        return self.search_pool.map(self, method, candidates, timeout=self.time_budget(self.search_pool.timeout))
+
     @abstractmethod
     def decide(self):
         """Decide the next move based on the current game state."""
         pass
 
+    # -- Anytime protocol ----------------------------------------------------------
+
+    def decide_by(self, deadline=None):
+        """
+        `decide()`, returning by `deadline` (a `time.monotonic()` value) whatever happens.
+
+        Only `ANYTIME` AIs are held to the deadline. Their `decide` runs in a
+        watchdog thread, on a copy of the AI with its own copy of the game, so
+        the next turn's `Game.update` never changes the game a late search is
+        reading. If it hasn't returned by the deadline, the move it last
+        `publish`ed is played, or `fallback()` if none, and the late search is
+        given up: it doesn't log its move, and until it has stopped later turns
+        aren't searched and play the fallback move. Other AIs run `decide`
+        directly, their `time_budget` cut to the deadline.
+        """
+        self.deadline = deadline
+        if deadline is None or not self.ANYTIME:
+            return self.decide()
+        if self._worker is not None and self._worker.is_alive():
+            # Still busy with an earlier turn: never run two searches on one AI
+            self.overruns += 1
+            return self.fallback()
+
+        search = self._search_copy()
+        result = {}
+
+        def run():
+            try:
+                result['move'] = search.decide()
+            except Exception as e:
+                result['error'] = e
 
+        self._worker = threading.Thread(target=run, name=f"{self.name}-decide", daemon=True)
+        self._worker.start()
+        self._worker.join(max(0.0, deadline - time.monotonic()))
+        with _package_lock:
+            if not result and not search._packaged:
+                search._stale = True
+        if not search._stale:
+            # Done, or only returning the move it has packaged
+            self._worker.join()
+            if 'error' in result:
+                raise result['error']
+            self._adopt(search)
+            return result['move']
+        self.overruns += 1
+        published = search._published
+        return self._package(*published) if published else self.fallback()
+
+    def _search_copy(self):
+        """Copy of the AI, with its own copy of the game, that a decide_by() search runs on."""
+        search = object.__new__(type(self))
+        search.__dict__.update(self.__dict__)
+        paths = self.game.paths
+        self.game.paths = PathService()  # not copied: the copy gets its own, empty one
+        try:
+            search.game = copy.deepcopy(self.game)
+        finally:
+            self.game.paths = paths
+        search._published = None
+        search._stale = False
+        search._packaged = False
+        return search
+
+    def _adopt(self, search):
+        """Keep what a decide_by() search that returned in time learned, but not its game."""
+        self._path_counters.update(search.game.paths.counters)
+        state = dict(search.__dict__)
+        for name in ('game', '_worker', '_stale', '_packaged'):
+            del state[name]
+        self.__dict__.update(state)
+
+    def publish(self, path, action, decisions, hero_move):
+        """Offer the best move so far (`_package` arguments), played if `decide` runs out of time."""
+        self._published = (path, action, decisions, hero_move)
+
+    def fallback(self):
+        """Move played when there is no time left to decide: stay put."""
+        me = self.hero()
+        return self._package(path=[getattr(me, 'pos', (0, 0))], action=Actions.WAIT, decisions={},
+                             hero_move=Directions.STAY.value)
+
+    def time_left(self) -> float:
+        """Seconds until `deadline`, infinite without one."""
+        if self.deadline is None:
+            return math.inf
+        return self.deadline - time.monotonic()
+
+    def out_of_time(self) -> bool:
+        return self.time_left() <= 0
+
+    def time_budget(self, limit: float) -> float:
+        """Seconds to think: `limit`, cut short to end `DEADLINE_MARGIN` before the deadline."""
+        return max(0.0, min(limit, self.time_left() - self.DEADLINE_MARGIN))
+
+
+
+    def fallback_record(self, game_map, policies, **context):
+        """
+        Debug record of a turn no policy gave a move for (see `utils.log.dump`):
+        `context`, the heroes, the nearest targets, the map and what every
+        policy returns now.
+        """
+        me = self.hero()
+        pos = getattr(me, 'pos', (0, 0))
+
+        def describe(hero):
+            return {field: getattr(hero, field, None) for field in ('pos', 'life', 'gold', 'mines', 'mine_count')}
+
+        record = dict(context, hero=describe(me), enemies=[describe(enemy) for enemy in self.enemies()])
+        for target, char in (('mine', MapElements.MINE), ('enemy', MapElements.ENEMY),
+                             ('tavern', MapElements.TAVERN)):
+            try:
+                path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, pos, char)
+                record[f"nearest_{target}"] = {'path': path, 'distance': distance}
+            except Exception as e:
+                record[f"nearest_{target}"] = f"error: {e!r}"
+        record['map'] = ["".join(str(tile) for tile in row) for row in game_map]
+        record['policies'] = {}
+        for policy in policies:
+            try:
+                record['policies'][policy.__name__] = policy()
+            except Exception as e:
+                record['policies'][policy.__name__] = f"error: {e!r}"
+        return record
 
     def mines(self):
         """Return a list of mine locations."""
@@ -116,7 +304,7 @@ class AIBase(ABC):
         taverns = self.taverns()
         mines = self.mines()
         enemies = self.enemies()
-        print(f"{self.name}:  action: {action} hero_move: {hero_move}")
+        self.log.debug("action: %s hero_move: %s", action, hero_move)
         me_pos = getattr(me, 'pos', (0, 0))
         nearest_enemy = (
             min(
@@ -136,29 +324,28 @@ class AIBase(ABC):
                 key=lambda t: abs(t[0] - me_pos[0]) + abs(t[1] - me_pos[1])
             ) if taverns and any(t is not None and isinstance(t, (tuple, list)) and len(t) == 2 for t in taverns) else me_pos
         )
-        self.prev_life = getattr(me, 'life', 0)
-
-        # --- Logging decisions to CSV ---
-        game = self.game
-        if game and hasattr(game, 'url') and game.url:
-            game_id = str(game.url).rstrip('/').split('/')[-1]
-            log_dir = 'moves_log'
-            os.makedirs(log_dir, exist_ok=True)
-            log_file = os.path.join(log_dir, f"{self.name}_{game_id}.csv")
-            turn = getattr(game, 'turn', None)
-            gold = getattr(me, 'gold', None)
-            life = getattr(me, 'life', None)
-            num_mines = len(getattr(me, 'mines', []))
-            move = str(hero_move)
-            timestamp = datetime.now().isoformat()
-            row = [timestamp, turn, action, move, gold, life, num_mines]
-            write_header = not os.path.exists(log_file)
-            with open(log_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                if write_header:
-                    writer.writerow(['timestamp', 'turn', 'decision', 'move', 'gold', 'life', 'number_of_mines'])
-                writer.writerow(row)
-        # --- End logging ---
+        with _package_lock:
+            if self._stale:
+                # Late decide_by() search: the move was never played
+                return (
+                    path, action, decisions, str(hero_move), nearest_enemy, nearest_mine, nearest_tavern
+                )
+            self._packaged = True
+            self.prev_life = getattr(me, 'life', 0)
+
+            # --- Logging decisions to CSV (buffered, written off the decision path) ---
+            game = self.game
+            if self.log_decisions and game and hasattr(game, 'url') and game.url:
+                game_id = str(game.url).rstrip('/').split('/')[-1]
+                turn = getattr(game, 'turn', None)
+                gold = getattr(me, 'gold', None)
+                life = getattr(me, 'life', None)
+                num_mines = len(getattr(me, 'mines', []))
+                move = str(hero_move)
+                timestamp = datetime.now().isoformat()
+                row = [timestamp, turn, action, move, gold, life, num_mines]
+                decision_log.shared_log().write(self.name, game_id, row)
+            # --- End logging ---
 
         return (
             path, action, decisions, str(hero_move), nearest_enemy, nearest_mine, nearest_tavern
@@ -25,7 +25,6 @@ from collections import deque
 from typing import List, Tuple, Any
 
 from models.ai_base import AIBase, MapElements, Directions
-from utils.path_finder import bfs_from_xy_to_xy, bfs_from_xy_to_nearest_char
 from utils.grid_helpers import replace_map_values
 
 
@@ -89,7 +88,7 @@ class AI(AIBase):
                     tavern = nearby_taverns[0]
                     path = [me_pos, tavern]
                 else:
-                    path, dist = bfs_from_xy_to_nearest_char(game_map, me_pos, MapElements.TAVERN)
+                    path, dist = self.paths.bfs_from_xy_to_nearest_char(game_map, me_pos, MapElements.TAVERN)
                     tavern = path[-1] if path else None
                 if path:
                     dbg.append(("heal", str(tavern)))
@@ -101,7 +100,7 @@ class AI(AIBase):
             if getattr(e, 'life', 100) > 40:
                 continue
             e_pos = getattr(e, 'pos', (0, 0))
-            path, dist = bfs_from_xy_to_xy(game_map, me_pos, e_pos)
+            path, dist = self.paths.bfs_from_xy_to_xy(game_map, me_pos, e_pos)
             if path and dist <= 5:
                 dbg.append(("kill", str(getattr(e, 'bot_id', ''))))
                 move = Directions.get_direction(me_pos, path[1]) if len(path) > 1 else Directions.STAY
@@ -110,7 +109,7 @@ class AI(AIBase):
         # 3. Capture mine (marginal‑value rule) ------------------------
         if mines:
             # Find the nearest mine (not owned)
-            path, dist = bfs_from_xy_to_nearest_char(game_map, me_pos, MapElements.MINE)
+            path, dist = self.paths.bfs_from_xy_to_nearest_char(game_map, me_pos, MapElements.MINE)
             mine = path[-1] if path else None
             if path:
                 path_len = len(path) - 1
@@ -1,7 +1,5 @@
 from models.ai_base import AIBase, Actions, MapElements, Directions
-from utils.path_finder import bfs_from_xy_to_nearest_char, bfs_from_xy_to_xy
 from utils.grid_helpers import replace_map_values
-from copy import deepcopy
 import math
 
 class AI(AIBase):
@@ -101,7 +99,7 @@ class AI(AIBase):
         
         # Survival strategy vote
         if hero.life < 40:
-            tavern_path, tavern_dist = bfs_from_xy_to_nearest_char(
+            tavern_path, tavern_dist = self.paths.bfs_from_xy_to_nearest_char(
                 game_map, hero.pos, MapElements.TAVERN,
                 walkable_chars={' ', MapElements.HERO}
             )
@@ -115,7 +113,7 @@ class AI(AIBase):
         
         # Mining strategy vote
         if hero.life > self.MINE_TAKE_COST:
-            mine_path, mine_dist = bfs_from_xy_to_nearest_char(
+            mine_path, mine_dist = self.paths.bfs_from_xy_to_nearest_char(
                 game_map, hero.pos, MapElements.MINE,
                 walkable_chars={' ', MapElements.HERO}
             )
@@ -130,7 +128,7 @@ class AI(AIBase):
         # Combat strategy vote
         for enemy in enemies:
             if hero.life > enemy.life + 10:
-                path, dist = bfs_from_xy_to_xy(game_map, hero.pos, enemy.pos)
+                path, dist = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, enemy.pos)
                 if path and dist < remaining_turns:
                     votes.append({
                         'path': path,
@@ -165,7 +163,7 @@ class AI(AIBase):
         # Defensive strategy vote
         if hero.mine_count > 0:
             for mine in hero.mines:
-                path, dist = bfs_from_xy_to_xy(game_map, hero.pos, mine)
+                path, dist = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, mine)
                 if path and dist < 3:
                     votes.append({
                         'path': path,
@@ -0,0 +1,247 @@
+"""
+Monte Carlo Tree Search (UCT) AI.
+
+Every turn, the AI runs as many search iterations as fit in `THINK_TIME` (or
+before the move deadline, see `AIBase.decide_by`) on a
+`utils.simulator.SimState`: walk down the tree with UCB1, add one node, play
+the game out for `ROLLOUT_DEPTH` moves with the rollout policy and back the
+result up. All four heroes are searched: each node is scored for the hero
+who made the move leading to it, with rewards being each hero's share of the
+wealth (gold plus what its mines will earn) at the end of the rollout.
+
+The tree is kept between turns: the next turn starts from the node reached
+by the moves actually played, when the previous search explored them.
+
+The rollout policy is "random" (uniform over the legal moves), any other
+`AIBase` AI, which then plays every hero in the rollouts (much slower), or a
+function ``(sim, hero_id) -> direction``.
+
+Search throughput is reported in the turn's decisions and by `search_stats`.
+"""
+
+import math
+import random
+import time
+from collections import Counter
+
+from game import Game
+from models.ai_base import AIBase, Actions, Directions
+from utils.board import MINE, TAVERN
+from utils.simulator import DIRECTIONS, HERO_IDS, SimState
+
+
+def _direction(move):
+    """The `DIRECTIONS` key of a move as `AIBase.decide` returns it ("Directions.STAY", "Stay", ...)."""
+    if isinstance(move, Directions):
+        return move.value
+    name = str(move).rsplit(".", 1)[-1]
+    return Directions[name].value if name in Directions.__members__ else name
+
+
+class Node:
+    """Search tree node: the state reached by `mover` playing `move`."""
+
+    __slots__ = ("parent", "mover", "move", "children", "untried", "visits", "value")
+
+    def __init__(self, parent=None, mover=None, move=None):
+        self.parent = parent
+        self.mover = mover
+        self.move = move
+        self.children = {}  # move -> Node
+        self.untried = None  # moves not expanded yet, set on the first visit
+        self.visits = 0
+        self.value = 0.0  # sum of the mover's rewards
+
+    def select(self, exploration):
+        """Child with the best UCB1 score."""
+        log_visits = math.log(self.visits)
+        return max(self.children.values(),
+                   key=lambda child: child.value / child.visits + exploration * math.sqrt(log_visits / child.visits))
+
+    def expand(self, mover, move):
+        child = Node(self, mover, move)
+        self.children[move] = child
+        return child
+
+
+class AI(AIBase):
+    THINK_TIME = 0.5  # seconds of search per turn
+    MAX_ITERATIONS = None  # optional cap on the iterations of a turn
+    EXPLORATION = 1.0  # UCB1 exploration constant (rewards are in [0, 1])
+    ROLLOUT_DEPTH = 40  # hero moves played after leaving the tree (10 rounds)
+    PUBLISH_EVERY = 256  # iterations between two best-so-far moves published
+    ANYTIME = True  # held to the move deadline, see AIBase.decide_by
+
+    def __init__(self, name="MCTSAI", key="YourKeyHere", rollout_policy="random"):
+        super().__init__(name, key)
+        self.rollout_policy = rollout_policy
+        self.rng = random.Random()
+        self._root = None
+        self._root_state = None
+        self._last_move = None
+        self.totals = Counter()  # iterations and seconds searched since this AI was created
+        self.last_search = {}
+
+    def clone_me(self):
+        """Create a clone of the AI instance."""
+        policy = self.rollout_policy
+        if isinstance(policy, AIBase):
+            policy = policy.clone_me()
+        clone = self.__class__(name=self.name, key=self.key, rollout_policy=policy)
+        clone.log_decisions = self.log_decisions
+        return clone
+
+    def search_stats(self):
+        """Iterations, time and iterations per second since this AI was created."""
+        stats = dict(self.totals)
+        seconds = self.totals['seconds']
+        stats['iterations_per_second'] = self.totals['iterations'] / seconds if seconds else 0.0
+        return stats
+
+    def decide(self):
+        me = self.game.hero
+        sim = SimState.from_game(self.game)
+        root = self._reroot(sim) or Node()
+        reused = root.visits
+
+        start = time.perf_counter()
+        deadline = start + self.time_budget(self.THINK_TIME)
+        iterations = 0
+        while time.perf_counter() < deadline and iterations != self.MAX_ITERATIONS:
+            self._iterate(root, sim, deadline)
+            iterations += 1
+            if not iterations % self.PUBLISH_EVERY:
+                self._publish_best(root, sim, me, iterations)
+        seconds = time.perf_counter() - start
+
+        self.totals['iterations'] += iterations
+        self.totals['seconds'] += seconds
+        self.last_search = {
+            'iterations': iterations,
+            'iterations_per_second': iterations / seconds if seconds else 0.0,
+            'reused_visits': reused,
+        }
+
+        move = Directions.STAY
+        if root.children:
+            move = max(root.children.values(), key=lambda child: child.visits).move
+        self._root, self._root_state, self._last_move = root, sim.copy(), move
+
+        target = self._target(sim, me.bot_id, move)
+        return self._package(
+            path=[me.pos, target],
+            action=self._action(sim, me.bot_id, target, move),
+            decisions={'iterations': iterations, 'it/s': round(self.last_search['iterations_per_second'])},
+            hero_move=move
+        )
+
+    def _publish_best(self, root, sim, me, iterations):
+        """Publish the most visited move so far, in case the search overruns the deadline."""
+        if not root.children:
+            return
+        move = max(root.children.values(), key=lambda child: child.visits).move
+        target = self._target(sim, me.bot_id, move)
+        self.publish([me.pos, target], self._action(sim, me.bot_id, target, move), {'iterations': iterations}, move)
+
+    # -- Search ------------------------------------------------------------------
+
+    def _iterate(self, root, sim, deadline):
+        """One UCT iteration: select, expand, roll out, back up. `sim` is left unchanged."""
+        node = root
+        undos = []
+        while not sim.finished:
+            if node.untried is None:
+                node.untried = sim.legal_moves(sim.to_move)
+            if node.untried:
+                move = node.untried.pop(self.rng.randrange(len(node.untried)))
+                mover = sim.to_move
+                undos.append(sim.make(mover, move))
+                node = node.expand(mover, move)
+                break
+            node = node.select(self.EXPLORATION)
+            undos.append(sim.make(node.mover, node.move))
+
+        for _ in range(self.ROLLOUT_DEPTH):
+            # Slow policies cut the last rollout short rather than overrun the turn
+            if sim.finished or (self.rollout_policy != "random" and time.perf_counter() > deadline):
+                break
+            mover = sim.to_move
+            undos.append(sim.make(mover, self._rollout_move(sim, mover)))
+
+        rewards = self._rewards(sim)
+        while node is not None:
+            node.visits += 1
+            if node.mover:
+                node.value += rewards[node.mover]
+            node = node.parent
+
+        for undo in reversed(undos):
+            sim.unmake(undo)
+
+    def _rollout_move(self, sim, hero_id):
+        policy = self.rollout_policy
+        if policy == "random":
+            return self.rng.choice(sim.legal_moves(hero_id))
+        if isinstance(policy, AIBase):
+            policy.process(Game(sim.to_state(hero_id)))
+            try:
+                move = _direction(policy.decide()[3])
+            except Exception:
+                move = None  # a broken policy must not break the search
+            legal = sim.legal_moves(hero_id)
+            return move if move in legal else self.rng.choice(legal)
+        return policy(sim, hero_id)
+
+    @staticmethod
+    def _rewards(sim):
+        """Each hero's share of the wealth: gold plus what its mines will still earn."""
+        rounds_left = max(0, sim.max_turns - sim.turn) / 4
+        wealth = [0.0] + [sim.gold[h] + sim.mine_count[h] * rounds_left for h in HERO_IDS]
+        total = sum(wealth)
+        if not total:
+            return [1 / len(HERO_IDS)] * len(wealth)
+        return [w / total for w in wealth]
+
+    def _reroot(self, sim):
+        """The previous tree's node for the moves played since, if it was explored."""
+        root, state = self._root, self._root_state
+        self._root = self._root_state = None
+        if root is None or state.topology is not sim.topology or not 0 < sim.turn - state.turn <= len(HERO_IDS):
+            return None
+        played = {h.bot_id: h.last_move for h in self.game.heroes}
+        played[self.game.hero.bot_id] = self._last_move
+        node = root
+        while state.turn < sim.turn:
+            mover = state.to_move
+            move = played.get(mover)
+            if move not in DIRECTIONS:
+                move = state.move_towards(mover, divmod(sim.pos[mover], sim.size))
+            state.make(mover, move)
+            node = node.children.get(move) if node is not None else None
+        # The moves we assumed must lead to the state we observe
+        if node is None or state.signature() != sim.signature():
+            return None
+        node.parent = None
+        return node
+
+    # -- Reporting ---------------------------------------------------------------
+
+    @staticmethod
+    def _target(sim, hero_id, move):
+        r, c = divmod(sim.pos[hero_id], sim.size)
+        dr, dc = DIRECTIONS[move]
+        return r + dr, c + dc
+
+    @staticmethod
+    def _action(sim, hero_id, target, move):
+        if move == Directions.STAY:
+            return Actions.WAIT
+        index = sim.topology.index(target)
+        if index in sim.pos:
+            return Actions.ATTACK_NEAREST
+        cell = sim.topology.cells[index]
+        if cell == MINE:
+            return Actions.TAKE_NEAREST_MINE
+        if cell == TAVERN:
+            return Actions.NEAREST_TAVERN
+        return Actions.EXPLORE
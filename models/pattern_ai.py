@@ -1,6 +1,7 @@
 from models.ai_base import AIBase, Actions, MapElements, Directions
-from utils.path_finder import bfs_from_xy_to_nearest_char, bfs_from_xy_to_xy
 from utils.grid_helpers import replace_map_values
+from utils.pattern_index import similarity
+from utils.pattern_store import shared_store
 from copy import deepcopy
 import json
 import os
@@ -13,34 +14,35 @@ class AI(AIBase):
     LIFE_COST_PER_STEP = 1
     MINE_TAKE_COST = 20
     MIN_LIFE = 1
+    MATCH_THRESHOLD = 0.7  # similarity above which a pattern is played
 
     def __init__(self, name="PatternAI", key="YourKeyHere"):
         super().__init__(name, key)
         self.patterns_file = "data/learned_patterns.json"
         self.state_file = "data/game_state.json"
-        self.patterns = self._load_patterns()
+        self._attach_store()
         self.game_state = self._load_state()
         self.current_pattern = None
+        self.current_phase = None
         self.pattern_success_count = 0
         self.pattern_failure_count = 0
 
-    def _load_patterns(self):
-        """Load learned patterns from file"""
-        if os.path.exists(self.patterns_file):
-            with open(self.patterns_file, 'r') as f:
-                return json.load(f)
-        return {
-            'opening': [],  # Patterns for game start
-            'mid': [],     # Patterns for mid game
-            'end': [],     # Patterns for end game
-            'success_rates': {}  # Track success rates of patterns
-        }
+    def _attach_store(self):
+        """Use the learned patterns of this process, loaded once and shared by every instance"""
+        self.store = shared_store(self.patterns_file)
+        self.patterns = self.store.patterns
+        # Situations of the patterns of each phase, in the same order
+        self.pattern_index = self.store.index
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        for name in ('store', 'patterns', 'pattern_index', 'current_pattern'):
+            state[name] = None
+        return state
 
-    def _save_patterns(self):
-        """Save learned patterns to file"""
-        os.makedirs(os.path.dirname(self.patterns_file), exist_ok=True)
-        with open(self.patterns_file, 'w') as f:
-            json.dump(self.patterns, f)
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._attach_store()
 
     def _load_state(self):
         """Load game state from file"""
@@ -87,6 +89,7 @@ class AI(AIBase):
         pattern = self._find_matching_pattern(situation, phase)
         if pattern:
             self.current_pattern = pattern
+            self.current_phase = phase
             action = self._execute_pattern(pattern, game_map, hero, enemies, remaining_turns)
         else:
             # No matching pattern, use default strategy
@@ -123,7 +126,7 @@ class AI(AIBase):
 
     def _get_nearest_distance(self, game_map, pos, target):
         """Get distance to nearest target using BFS"""
-        path, dist = bfs_from_xy_to_nearest_char(game_map, pos, target, walkable_chars={' ', MapElements.HERO})
+        path, dist = self.paths.bfs_from_xy_to_nearest_char(game_map, pos, target, walkable_chars={' ', MapElements.HERO})
         return dist if path else float('inf')
 
     def _get_nearest_enemy_distance(self, hero, enemies):
@@ -132,75 +135,38 @@ class AI(AIBase):
             return float('inf')
         min_dist = float('inf')
         for enemy in enemies:
-            path, dist = bfs_from_xy_to_xy(self.game.board_map, hero.pos, enemy.pos, walkable_chars={' ', MapElements.HERO})
+            path, dist = self.paths.bfs_from_xy_to_xy(self.game.board_map, hero.pos, enemy.pos, walkable_chars={' ', MapElements.HERO})
             if path and dist < min_dist:
                 min_dist = dist
         return min_dist
 
     def _find_matching_pattern(self, situation, phase):
         """Find a pattern that matches the current situation"""
-        best_pattern = None
-        best_score = float('-inf')
-        
-        for pattern in self.patterns[phase]:
-            score = self._calculate_pattern_match_score(situation, pattern['situation'])
-            if score > best_score:
-                best_score = score
-                best_pattern = pattern
-                
-        return best_pattern if best_score > 0.7 else None
+        position, score = self.pattern_index[phase].best(situation)
+        return self.patterns[phase][position] if score > self.MATCH_THRESHOLD else None
 
     def _calculate_pattern_match_score(self, situation1, situation2):
         """Calculate how well two situations match"""
-        score = 0
-        total_weights = 0
-        
-        # Define weights for different aspects
-        weights = {
-            'hero_life': 0.2,
-            'hero_mines': 0.15,
-            'hero_gold': 0.1,
-            'enemy_count': 0.1,
-            'enemy_life_avg': 0.15,
-            'enemy_mines_avg': 0.1,
-            'nearest_tavern': 0.1,
-            'nearest_mine': 0.05,
-            'nearest_enemy': 0.05
-        }
-        
-        for key, weight in weights.items():
-            if key in situation1 and key in situation2:
-                # Normalize differences
-                if key in ['hero_life', 'enemy_life_avg']:
-                    diff = abs(situation1[key] - situation2[key]) / 100
-                elif key in ['nearest_tavern', 'nearest_mine', 'nearest_enemy']:
-                    diff = abs(situation1[key] - situation2[key]) / 10
-                else:
-                    diff = abs(situation1[key] - situation2[key]) / max(1, max(situation1[key], situation2[key]))
-                
-                score += (1 - diff) * weight
-                total_weights += weight
-                
-        return score / total_weights if total_weights > 0 else 0
+        return similarity(situation1, situation2)
 
     def _execute_pattern(self, pattern, game_map, hero, enemies, remaining_turns):
         """Execute a learned pattern using BFS pathfinding"""
         action = pattern['action']
         
         if action == Actions.NEAREST_TAVERN:
-            path, dist = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN, walkable_chars={' ', MapElements.HERO})
+            path, dist = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN, walkable_chars={' ', MapElements.HERO})
             if path and dist < remaining_turns:
                 return {'path': path, 'action': action}
                 
         elif action == Actions.TAKE_NEAREST_MINE:
-            path, dist = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE, walkable_chars={' ', MapElements.HERO})
+            path, dist = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE, walkable_chars={' ', MapElements.HERO})
             if path and dist < remaining_turns:
                 return {'path': path, 'action': action}
                 
         elif action == Actions.ATTACK_NEAREST:
             for enemy in enemies:
                 if hero.life > enemy.life + 10:
-                    path, dist = bfs_from_xy_to_xy(game_map, hero.pos, enemy.pos, walkable_chars={' ', MapElements.HERO})
+                    path, dist = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, enemy.pos, walkable_chars={' ', MapElements.HERO})
                     if path and dist < remaining_turns:
                         return {'path': path, 'action': action}
                         
@@ -211,20 +177,20 @@ class AI(AIBase):
         """Default strategy when no pattern matches, using BFS pathfinding"""
         # Critical health check
         if hero.life < 30:
-            tavern_path, tavern_dist = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN, walkable_chars={' ', MapElements.HERO})
+            tavern_path, tavern_dist = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN, walkable_chars={' ', MapElements.HERO})
             if tavern_path and tavern_dist < remaining_turns:
                 return {'path': tavern_path, 'action': Actions.NEAREST_TAVERN}
                 
         # Mine capture
         if hero.life > self.MINE_TAKE_COST:
-            mine_path, mine_dist = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE, walkable_chars={' ', MapElements.HERO})
+            mine_path, mine_dist = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE, walkable_chars={' ', MapElements.HERO})
             if mine_path and mine_dist < remaining_turns:
                 return {'path': mine_path, 'action': Actions.TAKE_NEAREST_MINE}
                 
         # Combat
         for enemy in enemies:
             if hero.life > enemy.life + 10:
-                path, dist = bfs_from_xy_to_xy(game_map, hero.pos, enemy.pos, walkable_chars={' ', MapElements.HERO})
+                path, dist = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, enemy.pos, walkable_chars={' ', MapElements.HERO})
                 if path and dist < remaining_turns:
                     return {'path': path, 'action': Actions.ATTACK_NEAREST}
                     
@@ -239,27 +205,17 @@ class AI(AIBase):
             'success_count': 0,
             'failure_count': 0
         }
-        self.patterns[phase].append(pattern)
-        self._save_patterns()
+        self.store.add(phase, pattern)
 
     def update_pattern_success(self, success):
         """Update pattern success/failure counts"""
         if self.current_pattern:
             if success:
-                self.current_pattern['success_count'] += 1
                 self.pattern_success_count += 1
             else:
-                self.current_pattern['failure_count'] += 1
                 self.pattern_failure_count += 1
-                
-            # Update success rate
-            total = self.current_pattern['success_count'] + self.current_pattern['failure_count']
-            if total > 0:
-                self.patterns['success_rates'][str(self.current_pattern['situation'])] = (
-                    self.current_pattern['success_count'] / total
-                )
-                
-            self._save_patterns()
+            # Counts and success rate of the pattern
+            self.store.record_outcome(self.current_phase, self.current_pattern, success)
 
     def end_game(self, final_gold, final_mines):
         """Called at the end of each game to update statistics"""
@@ -1,8 +1,9 @@
 from models.ai_base import AIBase, Actions, MapElements, Directions
-from copy import deepcopy
-from utils.path_finder import bfs_from_xy_to_nearest_char
-from utils.grid_helpers import replace_map_values
+from utils.simulator import SimState
+import heapq
+import itertools
 import math
+import time
 
 class AI(AIBase):
     MINE_GOLD_VALUE = 1
@@ -12,6 +13,12 @@ class AI(AIBase):
     MINE_TAKE_COST = 20
     MIN_LIFE = 1
 
+    # Planning budget, per turn: the server timeout is hard
+    PLAN_TIME_LIMIT = 0.3  # seconds
+    PLAN_NODE_BUDGET = 2000  # nodes expanded
+    LIFE_BUCKET = 10  # life granularity of the transposition table
+    ANYTIME = True  # held to the move deadline, see AIBase.decide_by
+
     def __init__(self, name="AIPlanAhead", key="YourKeyHere"):
         super().__init__(name, key)
         self.base_max_depth = 5  # base number of turns to plan ahead
@@ -19,19 +26,19 @@ class AI(AIBase):
 
     def decide(self):
         start_pos = self.hero().pos
-        game_copy = deepcopy(self.game)
-        
-        # Mark owned mines on the map
-        owned_mines = set(game_copy.hero.mines)
-        game_copy.board_map = replace_map_values(game_copy.board_map, owned_mines, 'O')
+        # Simulated state of the current turn, the root of the search
+        sim = SimState.from_game(self.game)
         
         # Dynamically adjust planning depth based on game state
         remaining_turns = self.game.max_turns - self.game.turn
         self.max_depth = min(self.base_max_depth, remaining_turns)
         self.max_steps = min(self.base_max_steps, remaining_turns)
 
-        # Start recursive exploration of action sequences
-        score, sequence, path = self._explore_sequences(game_copy, start_pos, [], 0)
+        # Best-first search of action sequences, within the turn's budget
+        if self.search_pool is None:
+            score, sequence, path = self._plan(sim, start_pos)
+        else:
+            score, sequence, path = self._plan_in_parallel(sim, start_pos)
 
         if not sequence:
             # No plan found, stay put
@@ -127,21 +134,21 @@ class AI(AIBase):
 
         if action == Actions.TAKE_NEAREST_MINE:
             # Only look for unowned mines (not marked as 'O')
-            path, dist = bfs_from_xy_to_nearest_char(board_map, current_pos, end_char=MapElements.MINE, walkable_chars={' ', MapElements.HERO})
+            path, dist = self.paths.bfs_from_xy_to_nearest_char(board_map, current_pos, end_char=MapElements.MINE, walkable_chars={' ', MapElements.HERO})
             if not path or len(path) <= 1:
                 return current_pos, 0
             next_pos = path[1] if len(path) > 1 else current_pos
             return next_pos, dist
 
         elif action == Actions.NEAREST_TAVERN:
-            path, dist = bfs_from_xy_to_nearest_char(board_map, current_pos, end_char=MapElements.TAVERN, walkable_chars={' ', MapElements.HERO})
+            path, dist = self.paths.bfs_from_xy_to_nearest_char(board_map, current_pos, end_char=MapElements.TAVERN, walkable_chars={' ', MapElements.HERO})
             if not path or len(path) <= 1:
                 return current_pos, 0
             next_pos = path[1] if len(path) > 1 else current_pos
             return next_pos, dist
 
         elif action == Actions.ATTACK_NEAREST:
-            path, dist = bfs_from_xy_to_nearest_char(board_map, current_pos, end_char=MapElements.ENEMY, walkable_chars={' ', MapElements.HERO})
+            path, dist = self.paths.bfs_from_xy_to_nearest_char(board_map, current_pos, end_char=MapElements.ENEMY, walkable_chars={' ', MapElements.HERO})
             if not path or len(path) <= 1:
                 return current_pos, 0
             next_pos = path[1] if len(path) > 1 else current_pos
@@ -149,7 +156,7 @@ class AI(AIBase):
 
         elif action == Actions.WAIT:
             # Try to find a better position using BFS
-            path, dist = bfs_from_xy_to_nearest_char(board_map, current_pos, end_char=' ', walkable_chars={' ', MapElements.HERO})
+            path, dist = self.paths.bfs_from_xy_to_nearest_char(board_map, current_pos, end_char=' ', walkable_chars={' ', MapElements.HERO})
             if not path or len(path) <= 1:
                 return current_pos, 0
             next_pos = path[1] if len(path) > 1 else current_pos
@@ -157,81 +164,120 @@ class AI(AIBase):
 
         return current_pos, 0
 
-    def apply_move(self, game_state, next_pos, n_remaining_turns, n_steps=1):
-        hero = game_state.hero
-        board_map = game_state.board_map
+    def apply_move(self, sim, next_pos):
+        """
+        Play our move towards `next_pos`, then the other heroes' turns (they stay).
 
-        # Reduce hero life for moving n_steps
-        hero.life -= self.LIFE_COST_PER_STEP * n_steps
-        hero.life = max(hero.life, self.MIN_LIFE)
-
-        r, c = next_pos
-        tile = board_map[r][c]
-
-        if tile == MapElements.MINE:  # Mine tile
-            if next_pos not in hero.mines:
-                if hero.life > self.MINE_TAKE_COST:
-                    # Take over mine
-                    hero.mines.append(next_pos)
-                    # Losing life for combat
-                    hero.life -= self.MINE_TAKE_COST
-                    if hero.life <= 0:
-                        self._respawn_hero(hero, board_map)
-                        return True
-
-        elif tile == MapElements.ENEMY:  # Enemy hero
-            enemy = self._find_enemy_at(game_state, next_pos)
-            if enemy:
-                # Enemy life reduced
-                enemy.life -= 1
-                if enemy.life <= 0:
-                    # Hero wins, gets enemy's mines
-                    hero.mines.extend(enemy.mines)
-                    enemy.mines.clear()
-                else:
-                    # Hero loses, respawn
-                    self._respawn_hero(hero, board_map)
-                    return True
-
-        elif tile == MapElements.TAVERN:  # Tavern tile
-            if hero.gold >= self.TAVERN_HEAL_COST:
-                hero.gold -= self.TAVERN_HEAL_COST
-                hero.life = min(100, hero.life + self.TAVERN_HEAL_AMOUNT)
-
-        # Update hero position
-        hero.pos = next_pos
-
-        return False  # hero did not die
-
-    def _respawn_hero(self, hero, board_map):
-        # Find spawn location '@'
-        for r in range(len(board_map)):
-            for c in range(len(board_map[0])):
-                if board_map[r][c] == MapElements.HERO:
-                    hero.pos = (r, c)
-                    hero.life = 100
-                    hero.mines.clear()
-                    return
-
-    def _find_enemy_at(self, game_state, pos):
-        for enemy in game_state.heroes:
-            if enemy.pos == pos and enemy.bot_id != game_state.hero.bot_id:
-                return enemy
-        return None
-
-    def _explore_sequences(self, game_state, current_pos, action_sequence, current_depth, current_path_length=0):
+        Returns the undo records, for `take_back`, and whether our hero died.
+        """
+        me = self.game.hero.bot_id
+        deaths = sim.deaths[me]
+        moves = [sim.make(me, sim.move_towards(me, next_pos))]
+        for i in range(me, me + 3):
+            moves.append(sim.make(i % 4 + 1, Directions.STAY))
+        return moves, sim.deaths[me] > deaths
+
+    @staticmethod
+    def take_back(sim, moves):
+        for undo in reversed(moves):
+            sim.unmake(undo)
+
+    def _plan_in_parallel(self, sim, start_pos):
+        """`_plan`, one search process per first move (root parallelism)."""
+        first_moves = self._ordered_moves(sim.snapshot(self.game.hero.bot_id))
+        plans = [plan for plan in self.search_map('_plan_first_move', first_moves) if plan is not None and plan[1]]
+        return max(plans, key=lambda plan: plan[0]) if plans else (float('-inf'), None, None)
+
+    def _plan_first_move(self, first_move):
+        return self._plan(SimState.from_game(self.game), self.hero().pos, [first_move])
+
+    def _plan(self, sim, start_pos, first_moves=None):
         """
-        Recursively explore all action sequences up to max_depth and max_steps.
+        Iterative best-first search of action sequences up to max_depth and max_steps.
+
+        The most promising plan (by `evaluate`) is extended first, until the
+        node budget or the time limit runs out. States reached again with the
+        same position, life bucket and mines by a plan at least as short are
+        dropped.
+
+        Best-first search jumps between plans of the frontier, so each one
+        keeps its own `SimState`: a copy is a few lists (2 us), much cheaper
+        than taking moves back to a common prefix and making them again
+        (15 us to make and unmake the four heroes' moves of a turn).
+
+        Returns (score, sequence, path) of the best plan that reached
+        max_depth or max_steps, or of the best plan found if none did.
+
+        `first_moves` restricts the first move of the plans to the given
+        (action, next_pos, step_increment).
         """
-        # Stop exploring if max_depth or max_steps reached
-        if current_depth == self.max_depth or current_path_length >= self.max_steps:
-            score = self.evaluate(game_state)
-            return score, action_sequence, [current_pos]
+        deadline = time.perf_counter() + self.time_budget(self.PLAN_TIME_LIMIT)
+        me = self.game.hero.bot_id
+        root_state = sim.snapshot(me)
+        root_score = self.evaluate(root_state)
+        if self.max_depth <= 0 or self.max_steps <= 0:
+            return root_score, [], [start_pos]
+
+        tie = itertools.count()  # never compare states in the heap
+        frontier = [(-root_score, next(tie), sim, root_state, [], [start_pos], 0)]
+        seen = {self._transposition_key(root_state.hero): 0}
+        best_complete = best_partial = None
+        expanded = 0
+        while frontier and expanded < self.PLAN_NODE_BUDGET and time.perf_counter() < deadline:
+            _, _, node, game_state, sequence, path, path_length = heapq.heappop(frontier)
+            expanded += 1
+            depth = len(sequence) + 1
+            moves = first_moves if first_moves is not None and not sequence else self._ordered_moves(game_state)
+            for action, next_pos, step_increment in moves:
+                new_path_length = path_length + step_increment
+
+                # If path length would exceed max, skip this action
+                if new_path_length > self.max_steps:
+                    continue
+
+                # Simulate the move on a copy: the parent stays in the frontier
+                child = node.copy()
+                _, died = self.apply_move(child, next_pos)
+                if died:
+                    continue  # Skip this path if hero died
+
+                child_state = child.snapshot(me)
+                key = self._transposition_key(child_state.hero)
+                if seen.get(key, depth + 1) <= depth:
+                    continue
+                seen[key] = depth
+
+                plan = (self.evaluate(child_state), sequence + [action], path + [next_pos])
+                if depth >= self.max_depth or new_path_length >= self.max_steps:
+                    if best_complete is None or plan[0] > best_complete[0]:
+                        best_complete = plan
+                        self._publish_plan(plan)
+                else:
+                    if best_partial is None or plan[0] > best_partial[0]:
+                        best_partial = plan
+                        if best_complete is None:
+                            self._publish_plan(plan)
+                    heapq.heappush(frontier, (-plan[0], next(tie), child, child_state, plan[1], plan[2],
+                                              new_path_length))
+
+        return best_complete or best_partial or (float('-inf'), None, None)
+
+    def _publish_plan(self, plan):
+        """Publish the first move of `plan`, in case the search overruns the deadline."""
+        _, sequence, path = plan
+        self.publish(path=path, action=sequence[0], decisions={},
+                     hero_move=Directions.get_direction(path[0], path[1]))
 
-        best_score = float('-inf')
-        best_sequence = None
-        best_path = None
+    def _transposition_key(self, hero):
+        return hero.pos, hero.life // self.LIFE_BUCKET, hero.mines
 
+    def _ordered_moves(self, game_state):
+        """
+        Candidate (action, next_pos, step_increment), most urgent action first.
+
+        Actions leading to the same next cell give the same state: only the
+        first one is kept.
+        """
         # Prioritize actions based on game state
         hero = game_state.hero
         enemies = [h for h in game_state.heroes if h.bot_id != hero.bot_id]
@@ -263,51 +309,18 @@ class AI(AIBase):
                 actions.append(Actions.NEAREST_TAVERN)
             elif hero.mines and hero.life > 70:  # Defend mines in end game
                 actions.append(Actions.WAIT)
-                
-        # If we have no other actions, try to move in any valid direction
-        if not actions:
-            actions.append(Actions.WAIT)
 
         # Always consider waiting as a fallback
         actions.append(Actions.WAIT)
 
+        moves = []
+        targets = set()
         for action in actions:
             # Find next position for this action
-            next_pos, dst = self.decide_position_for_action(action, game_state, current_pos)
-
-            # If no move (e.g., WAIT), path length doesn't increase
-            step_increment = 0 if next_pos == current_pos else dst
-            new_path_length = current_path_length + step_increment
-
-            # If path length would exceed max, skip this action
-            if new_path_length > self.max_steps:
+            next_pos, dst = self.decide_position_for_action(action, game_state, hero.pos)
+            if next_pos in targets:
                 continue
-
-            # Simulate the move
-            new_game_state = deepcopy(game_state)
-            died = self.apply_move(new_game_state, next_pos, 
-                                 n_remaining_turns=self.max_depth - current_depth, 
-                                 n_steps=step_increment)
-            
-            if died:
-                continue  # Skip this path if hero died
-
-            # Mark owned mines on the map after the move
-            owned_mines = set(new_game_state.hero.mines)
-            new_game_state.board_map = replace_map_values(new_game_state.board_map, owned_mines, 'O')
-
-            # Recursive call with updated path length
-            score, seq, path = self._explore_sequences(
-                new_game_state,
-                next_pos,
-                action_sequence + [action],
-                current_depth + 1,
-                new_path_length
-            )
-
-            if score > best_score:
-                best_score = score
-                best_sequence = seq
-                best_path = [current_pos] + path
-
-        return best_score, best_sequence, best_path
\ No newline at end of file
+            targets.add(next_pos)
+            # If no move (e.g., WAIT), path length doesn't increase
+            moves.append((action, next_pos, 0 if next_pos == hero.pos else dst))
+        return moves
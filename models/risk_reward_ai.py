@@ -1,7 +1,7 @@
 from models.ai_base import AIBase, Actions, MapElements, Directions
-from utils.path_finder import bfs_from_xy_to_nearest_char, bfs_from_xy_to_xy
 from utils.grid_helpers import replace_map_values
-from copy import deepcopy
+from utils import rollouts
+from utils.simulator import SimState
 import random
 import math
 
@@ -19,8 +19,10 @@ class AI(AIBase):
     MAX_RISK_THRESHOLD = 0.9   # Maximum risk threshold
     
     # Monte Carlo parameters
-    SIMULATION_DEPTH = 3       # How many turns to simulate
-    SIMULATION_COUNT = 10      # Number of simulations per action
+    SIMULATION_DEPTH = 3       # How many rounds to simulate after the action's path
+    SIMULATION_COUNT = 1000 if rollouts.VECTORIZED else 50  # Number of simulations per action
+    LIFE_VALUE = 0.5           # Value of one life point at the end of a simulation
+    DEATH_PENALTY = 100        # Dying refills life, but is never worth it
 
     def __init__(self, name="RiskRewardAI", key="YourKeyHere"):
         super().__init__(name, key)
@@ -128,7 +130,7 @@ class AI(AIBase):
         
         # Check for tavern visits
         if hero.life < 40:
-            tavern_path, tavern_dist = bfs_from_xy_to_nearest_char(
+            tavern_path, tavern_dist = self.paths.bfs_from_xy_to_nearest_char(
                 game_map, hero.pos, MapElements.TAVERN, 
                 walkable_chars={' ', MapElements.HERO}
             )
@@ -145,7 +147,7 @@ class AI(AIBase):
         
         # Check for mine captures
         if hero.life > self.MINE_TAKE_COST:
-            mine_path, mine_dist = bfs_from_xy_to_nearest_char(
+            mine_path, mine_dist = self.paths.bfs_from_xy_to_nearest_char(
                 game_map, hero.pos, MapElements.MINE,
                 walkable_chars={' ', MapElements.HERO}
             )
@@ -163,7 +165,7 @@ class AI(AIBase):
         # Check for combat opportunities
         for enemy in enemies:
             if hero.life > enemy.life + 10:
-                path, dist = bfs_from_xy_to_xy(game_map, hero.pos, enemy.pos)
+                path, dist = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, enemy.pos)
                 if path and dist < remaining_turns:
                     risk = self._calculate_combat_risk(hero, enemy, dist)
                     reward = self._calculate_combat_reward(enemy)
@@ -205,7 +207,7 @@ class AI(AIBase):
         
         # Additional risk from enemies
         for enemy in enemies:
-            enemy_path, enemy_dist = bfs_from_xy_to_xy(self.game.board_map, enemy.pos, hero.pos)
+            enemy_path, enemy_dist = self.paths.bfs_from_xy_to_xy(self.game.board_map, enemy.pos, hero.pos)
             if enemy_dist < distance + 2:
                 risk += 0.2
                 
@@ -238,12 +240,15 @@ class AI(AIBase):
         best_action = None
         best_score = float('-inf')
         
-        for action in actions:
+        # Apply Monte Carlo simulation, actions may be simulated in parallel
+        simulated_rewards = self.search_map('_monte_carlo_simulation', actions)
+        
+        for action, simulated_reward in zip(actions, simulated_rewards):
             # Calculate risk-adjusted reward
             risk_adjusted_reward = action['reward'] * (1 - action['risk'])
             
-            # Apply Monte Carlo simulation
-            simulated_reward = self._monte_carlo_simulation(action)
+            # Simulations that didn't finish in time count for nothing
+            simulated_reward = simulated_reward or 0
             
             # Combine immediate and simulated rewards
             total_score = risk_adjusted_reward + simulated_reward
@@ -255,59 +260,20 @@ class AI(AIBase):
         return best_action
 
     def _monte_carlo_simulation(self, action):
-        """Perform Monte Carlo simulation for an action"""
-        total_reward = 0
-        
-        for _ in range(self.SIMULATION_COUNT):
-            game_copy = deepcopy(self.game)
-            current_reward = 0
-            
-            # Simulate the action
-            if action['action'] == Actions.TAKE_NEAREST_MINE:
-                current_reward += self._simulate_mine_capture(game_copy, action['path'])
-            elif action['action'] == Actions.ATTACK_NEAREST:
-                current_reward += self._simulate_combat(game_copy, action['path'])
-            elif action['action'] == Actions.NEAREST_TAVERN:
-                current_reward += self._simulate_tavern_visit(game_copy, action['path'])
-                
-            total_reward += current_reward
-            
-        return total_reward / self.SIMULATION_COUNT
-
-    def _simulate_mine_capture(self, game_copy, path):
-        """Simulate mine capture outcome"""
-        if len(path) <= 1:
-            return 0
-            
-        hero = game_copy.hero
-        next_pos = path[1]
-        
-        # Check if we can take the mine
-        if hero.life > self.MINE_TAKE_COST:
-            return self.MINE_GOLD_VALUE * (game_copy.max_turns - game_copy.turn)
-        return 0
+        """Mean value of random continuations after following the action's path"""
+        sim = SimState.from_game(self.game)
+        me = self.game.hero.bot_id
+        result = rollouts.simulate(sim, me, action['path'], self.SIMULATION_COUNT, self.SIMULATION_DEPTH,
+                                   seed=random.getrandbits(32))
 
-    def _simulate_combat(self, game_copy, path):
-        """Simulate combat outcome"""
-        if len(path) <= 1:
-            return 0
-            
-        hero = game_copy.hero
-        next_pos = path[1]
-        
-        # Find enemy at position
-        for enemy in game_copy.heroes:
-            if enemy.bot_id != hero.bot_id and enemy.pos == next_pos:
-                if hero.life > enemy.life:
-                    return enemy.mine_count * 2
-        return 0
+        # Gold earned, plus what the mines won or lost will earn until the end
+        remaining_turns = max(0, sim.max_turns - result.turn)
+        reward = self._mean(result.gold) - sim.gold[me]
+        reward += (self._mean(result.mine_count) - sim.mine_count[me]) * self.MINE_GOLD_VALUE * remaining_turns
+        reward += (self._mean(result.life) - sim.life[me]) * self.LIFE_VALUE
+        reward -= self._mean(result.deaths) * self.DEATH_PENALTY
+        return reward
 
-    def _simulate_tavern_visit(self, game_copy, path):
-        """Simulate tavern visit outcome"""
-        if len(path) <= 1:
-            return 0
-            
-        hero = game_copy.hero
-        if hero.gold >= self.TAVERN_HEAL_COST:
-            return (100 - hero.life) * 0.5
-        return 0 
\ No newline at end of file
+    @staticmethod
+    def _mean(values):
+        return sum(values) / len(values) if len(values) else 0
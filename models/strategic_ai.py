@@ -1,5 +1,4 @@
 from models.ai_base import AIBase, Actions, MapElements, Directions
-from utils.path_finder import bfs_from_xy_to_nearest_char, bfs_from_xy_to_xy
 from utils.grid_helpers import replace_map_values
 from copy import deepcopy
 import math
@@ -54,18 +53,18 @@ class AI(AIBase):
             """Evaluate how good a position is strategically"""
             score = 0
             # Distance to nearest mine
-            mine_path, mine_dist = bfs_from_xy_to_nearest_char(game_map, pos, MapElements.MINE)
+            mine_path, mine_dist = self.paths.bfs_from_xy_to_nearest_char(game_map, pos, MapElements.MINE)
             if mine_path:
                 score += (10 - min(mine_dist, 10)) * 2
             
             # Distance to nearest tavern
-            tavern_path, tavern_dist = bfs_from_xy_to_nearest_char(game_map, pos, MapElements.TAVERN)
+            tavern_path, tavern_dist = self.paths.bfs_from_xy_to_nearest_char(game_map, pos, MapElements.TAVERN)
             if tavern_path:
                 score += (5 - min(tavern_dist, 5))
             
             # Distance to enemies
             for enemy in enemies:
-                enemy_path, enemy_dist = bfs_from_xy_to_xy(game_map, pos, enemy.pos)
+                enemy_path, enemy_dist = self.paths.bfs_from_xy_to_xy(game_map, pos, enemy.pos)
                 if enemy_path:
                     if enemy.life < hero.life:
                         score += (5 - min(enemy_dist, 5)) * 2
@@ -80,7 +79,7 @@ class AI(AIBase):
             
             # Critical health check
             if hero.life < critical_hp:
-                tavern_path, tavern_dist = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
+                tavern_path, tavern_dist = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
                 if tavern_path and tavern_dist < remaining_turns:
                     return tavern_path, Actions.NEAREST_TAVERN
 
@@ -89,7 +88,7 @@ class AI(AIBase):
                 if hero.life < mine_threshold:
                     # Find safe position near owned mine
                     for mine in hero.mines:
-                        path, dist = bfs_from_xy_to_xy(game_map, hero.pos, mine)
+                        path, dist = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, mine)
                         if path and dist < 3:
                             return path, Actions.DEFEND_MINE
                 
@@ -112,12 +111,12 @@ class AI(AIBase):
             if hero.life > mine_threshold and not self.defensive_mode:
                 # If we have a target mine, try to reach it
                 if self.target_mine:
-                    path, dist = bfs_from_xy_to_xy(game_map, hero.pos, self.target_mine)
+                    path, dist = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, self.target_mine)
                     if path and dist < remaining_turns:
                         return path, Actions.TAKE_NEAREST_MINE
                 
                 # Find new target mine
-                mine_path, mine_dist = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
+                mine_path, mine_dist = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
                 if mine_path and mine_dist < remaining_turns:
                     self.target_mine = mine_path[-1]
                     return mine_path, Actions.TAKE_NEAREST_MINE
@@ -126,7 +125,7 @@ class AI(AIBase):
             if hero.life > combat_threshold and not self.defensive_mode:
                 # Look for weak enemies
                 for enemy in sorted(enemies, key=lambda e: e.life):
-                    path, dist = bfs_from_xy_to_xy(game_map, hero.pos, enemy.pos)
+                    path, dist = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, enemy.pos)
                     if path and dist < remaining_turns and hero.life > enemy.life + dist:
                         return path, Actions.ATTACK_NEAREST
 
@@ -2,7 +2,6 @@ from enum import Enum
 
 from models.ai_base import AIBase, Actions, MapElements, Directions
 from utils.grid_helpers import replace_map_values
-from utils.path_finder import bfs_from_xy_to_xy, bfs_from_xy_to_nearest_char
 
 class AI(AIBase):
 
@@ -18,7 +17,7 @@ class AI(AIBase):
         game_map = replace_map_values(game_map, owned_mines, 'O')
 
         def should_do_nearest_mine():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
+            path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
             if distance < remaining_turns:
                 return path, Actions.TAKE_NEAREST_MINE
             else:
@@ -26,13 +25,13 @@ class AI(AIBase):
 
         def should_attack_richest():
             richest = enemies_by_mines[0]
-            path, distance = bfs_from_xy_to_xy(game_map, hero.pos, richest.pos)
+            path, distance = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, richest.pos)
             if distance < remaining_turns and hero.life >= richest.life:
                 return path, Actions.ATTACK_RICHEST
             return None
 
         def should_attack_nearest():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
+            path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
             if len(path) > 0:
                 enemy_position = path[-1]
                 enemy = [e for e in enemies if
@@ -42,7 +41,7 @@ class AI(AIBase):
             return None
 
         def should_go_to_tavern():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
+            path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
             if distance < remaining_turns:
                 return path, Actions.NEAREST_TAVERN
             return None
@@ -60,7 +59,7 @@ class AI(AIBase):
             i += 1
         move = Directions.get_direction(hero.pos, path_and_action[0][1])
         # If nothing to do, stay still or chase random enemy mine
-        print(f"---- {self.name} has decided to: {path_and_action[1]} and move to the {move}")
+        self.log.debug("decided to: %s and move to the %s", path_and_action[1], move)
 
         return self._package(
             path=path_and_action[0],
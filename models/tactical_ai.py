@@ -1,6 +1,5 @@
 from models.ai_base import AIBase, Actions, MapElements, Directions
 from utils.grid_helpers import replace_map_values
-from utils.path_finder import bfs_from_xy_to_xy, bfs_from_xy_to_nearest_char
 
 
 # loop move detection
@@ -36,7 +35,7 @@ class AI(AIBase):
         critical_hp = 35 if phase == "opening" else 30 if phase == "mid" else 25
 
         def end_game_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
+            path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
 
             if phase == "end" and is_leading and distance <= remaining_turns:
                 return path, Actions.ENDGAME_TAVERN
@@ -44,7 +43,7 @@ class AI(AIBase):
                 return None
 
         def do_nearest_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
+            path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
             if distance < remaining_turns:
                 return path, Actions.TAKE_NEAREST_MINE
             else:
@@ -52,14 +51,14 @@ class AI(AIBase):
 
         def attack_richest_if():
             richest = enemies_by_mines[0]
-            path, distance = bfs_from_xy_to_xy(game_map, hero.pos, richest.pos)
+            path, distance = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, richest.pos)
             if distance < remaining_turns and hero.life - distance - 1 >= richest.life and hero.life > critical_hp + distance * 5:
                 return path, Actions.ATTACK_RICHEST
             else:
                 return None
 
         def opportunistic_kill_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
+            path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
             if len(path) > 0:
                 enemy_position = path[-1]
                 enemy = [e for e in enemies if
@@ -69,7 +68,7 @@ class AI(AIBase):
             return None
 
         def attack_nearest_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
+            path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
             if len(path) > 0:
                 enemy_position = path[-1]
                 enemy = [e for e in enemies if
@@ -80,21 +79,21 @@ class AI(AIBase):
 
         def attack_weakest_if():
             weakest = min(enemies, key=lambda e: e.life)
-            path, distance = bfs_from_xy_to_xy(game_map, hero.pos, weakest.pos)
+            path, distance = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, weakest.pos)
             if weakest.life < hero.life - distance - 1 and distance < remaining_turns:
                     return path, Actions.ATTACK_WEAKEST
             return None
 
         def go_to_tavern_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
+            path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
             if distance < remaining_turns and hero.life < critical_hp and (hero.mine_count > 0 or hero.gold > 0):
                 return path, Actions.NEAREST_TAVERN
             return None
 
         def suicide():
             if hero.mine_count == 0 and hero.gold == 0:
-                path_1, distance_1 = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
-                path_2, distance_2 = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
+                path_1, distance_1 = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
+                path_2, distance_2 = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
                 path, distance = (path_1, distance_1) if distance_1 < distance_2 else (path_2, distance_2)
                 if distance < remaining_turns * 2:
                     return path, Actions.SUICIDE
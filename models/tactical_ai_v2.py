@@ -1,6 +1,6 @@
 from models.ai_base import AIBase, Actions, MapElements, Directions
+from utils import log
 from utils.grid_helpers import replace_map_values
-from utils.path_finder import bfs_from_xy_to_xy, bfs_from_xy_to_nearest_char
 
 
 class AI(AIBase):
@@ -66,11 +66,11 @@ class AI(AIBase):
             # Check if any enemy is close to our mines
             for mine_pos in hero.mines:
                 for enemy in enemies:
-                    path, distance = bfs_from_xy_to_xy(game_map, enemy.pos, mine_pos)
+                    path, distance = self.paths.bfs_from_xy_to_xy(game_map, enemy.pos, mine_pos)
                     if distance < 3 and hero.life > enemy.life + distance:
                         # Intercept enemy before they reach our mine
-                        intercept_pathA, intercept_distanceA = bfs_from_xy_to_xy(game_map, hero.pos, path[0])
-                        intercept_pathB, intercept_distanceB = bfs_from_xy_to_xy(game_map, hero.pos, mine_pos)
+                        intercept_pathA, intercept_distanceA = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, path[0])
+                        intercept_pathB, intercept_distanceB = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, mine_pos)
 
                         intercept_path, intercept_distance = (intercept_pathA, intercept_distanceA) if intercept_distanceA < intercept_distanceB else (intercept_pathB, intercept_distanceB)
                         if len(intercept_path)>0:
@@ -78,7 +78,7 @@ class AI(AIBase):
             return None
 
         def end_game_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
+            path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
 
             if phase == "end" and is_leading and distance <= remaining_turns:
                 return path, Actions.ENDGAME_TAVERN
@@ -86,7 +86,7 @@ class AI(AIBase):
                 return None
 
         def do_nearest_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
+            path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
             if distance < remaining_turns and calculate_mine_value(distance):
                 return path, Actions.TAKE_NEAREST_MINE
             else:
@@ -94,7 +94,7 @@ class AI(AIBase):
 
         def attack_richest_if():
             richest = enemies_by_mines[0]
-            path, distance = bfs_from_xy_to_xy(game_map, hero.pos, richest.pos)
+            path, distance = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, richest.pos)
             # More aggressive attack if they have many mines
             if distance < remaining_turns and hero.life - distance - 1 >= richest.life and hero.life > critical_hp + distance * 5:
                 # If they have many mines, be more aggressive
@@ -106,7 +106,7 @@ class AI(AIBase):
             return None
 
         def opportunistic_kill_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
+            path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
             if len(path) > 0:
                 enemy_position = path[-1]
                 enemy = [e for e in enemies if
@@ -116,7 +116,7 @@ class AI(AIBase):
             return None
 
         def attack_nearest_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
+            path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
             if len(path) > 0:
                 enemy_position = path[-1]
                 enemy = [e for e in enemies if
@@ -127,13 +127,13 @@ class AI(AIBase):
 
         def attack_weakest_if():
             weakest = min(enemies, key=lambda e: e.life)
-            path, distance = bfs_from_xy_to_xy(game_map, hero.pos, weakest.pos)
+            path, distance = self.paths.bfs_from_xy_to_xy(game_map, hero.pos, weakest.pos)
             if weakest.life < hero.life - distance - 1 and distance < remaining_turns:
                     return path, Actions.ATTACK_WEAKEST
             return None
 
         def go_to_tavern_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
+            path, distance = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
             # Only go to tavern if we have enough gold and the heal is worth it
             if (distance < remaining_turns and 
                 hero.life < critical_hp and 
@@ -145,8 +145,8 @@ class AI(AIBase):
 
         def suicide():
             if hero.mine_count == 0 and hero.gold == 0:
-                path_1, distance_1 = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
-                path_2, distance_2 = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
+                path_1, distance_1 = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
+                path_2, distance_2 = self.paths.bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
                 path, distance = (path_1, distance_1) if distance_1 < distance_2 else (path_2, distance_2)
                 if distance < remaining_turns * 2:
                     return path, Actions.SUICIDE
@@ -172,67 +172,9 @@ class AI(AIBase):
             path_and_action = policy_priority[i]()
             i += 1
         if path_and_action is None or len(path_and_action[0]) < 2:
-            # Fallback to wait action - print comprehensive debug info
-            print("=== FALLBACK TRIGGERED - DEBUG INFO ===")
-            print(f"Hero position: {getattr(hero, 'pos', 'None')}")
-            print(f"Hero life: {getattr(hero, 'life', 'None')}")
-            print(f"Hero gold: {getattr(hero, 'gold', 'None')}")
-            print(f"Hero mines: {getattr(hero, 'mines', 'None')}")
-            print(f"Hero mine_count: {getattr(hero, 'mine_count', 'None')}")
-            print(f"Remaining turns: {remaining_turns}")
-            print(f"Phase: {phase}")
-            print(f"Critical HP: {critical_hp}")
-            print(f"Enemies count: {len(enemies)}")
-
-            # Print nearest targets info
-            try:
-                nearest_mine_path, nearest_mine_dist = bfs_from_xy_to_nearest_char(game_map,
-                                                                                   getattr(hero, 'pos', (0, 0)),
-                                                                                   MapElements.MINE)
-                print(f"Nearest mine: path={nearest_mine_path}, distance={nearest_mine_dist}")
-            except Exception as e:
-                print(f"Error getting nearest mine: {e}")
-
-            try:
-                nearest_enemy_path, nearest_enemy_dist = bfs_from_xy_to_nearest_char(game_map,
-                                                                                     getattr(hero, 'pos', (0, 0)),
-                                                                                     MapElements.ENEMY)
-                print(f"Nearest enemy: path={nearest_enemy_path}, distance={nearest_enemy_dist}")
-            except Exception as e:
-                print(f"Error getting nearest enemy: {e}")
-
-            try:
-                nearest_tavern_path, nearest_tavern_dist = bfs_from_xy_to_nearest_char(game_map,
-                                                                                       getattr(hero, 'pos', (0, 0)),
-                                                                                       MapElements.TAVERN)
-                print(f"Nearest tavern: path={nearest_tavern_path}, distance={nearest_tavern_dist}")
-            except Exception as e:
-                print(f"Error getting nearest tavern: {e}")
-
-            # Print game map
-            print("Game map:")
-            try:
-                for i, row in enumerate(game_map):
-                    print(f"Row {i}: {row}")
-            except Exception as e:
-                print(f"Error printing game map: {e}")
-
-            # Print enemy details
-            print("Enemies:")
-            for i, enemy in enumerate(enemies):
-                print(
-                    f"  Enemy {i}: pos={getattr(enemy, 'pos', 'None')}, life={getattr(enemy, 'life', 'None')}, mines={getattr(enemy, 'mines', 'None')}, mine_count={getattr(enemy, 'mine_count', 'None')}")
-
-            # Print policy results
-            print("Policy results:")
-            for i, policy in enumerate(policy_priority):
-                try:
-                    result = policy()
-                    print(f"  Policy {i}: {policy.__name__} = {result}")
-                except Exception as e:
-                    print(f"  Policy {i}: {policy.__name__} = ERROR: {e}")
-
-            print("=== END DEBUG INFO ===")
+            # Debug record of why, rate-limited and only built at DEBUG level
+            log.dump(self.log, "fallback", lambda: self.fallback_record(
+                game_map, policy_priority, remaining_turns=remaining_turns, phase=phase, critical_hp=critical_hp))
 
             # Fallback to wait action
             path_and_action = ([getattr(hero, 'pos', (0, 0)), getattr(hero, 'pos', (0, 0))], Actions.WAIT)
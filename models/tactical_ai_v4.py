@@ -1,6 +1,6 @@
 from models.ai_base import AIBase, Actions, MapElements, Directions
+from utils import log
 from utils.grid_helpers import replace_map_values
-from utils.path_finder import bfs_from_xy_to_xy, bfs_from_xy_to_nearest_char
 
 
 class AI(AIBase):
@@ -29,6 +29,8 @@ class AI(AIBase):
         owned_mines = set(getattr(hero, 'mines', []))
         game_map = getattr(self.game, 'board_map', [])
         game_map = replace_map_values(game_map, owned_mines, 'O')
+        # One sweep from the hero answers every hero-centred query of the turn
+        field = self.paths.field(game_map, hero.pos)
 
         # --- Recharge if next to tavern, have gold, and life < 65 ---
         taverns = set(getattr(self.game, 'taverns_locs', []))
@@ -77,10 +79,10 @@ class AI(AIBase):
         def defend_mines_if():
             for mine_pos in hero.mines:
                 for enemy in enemies:
-                    path, distance = bfs_from_xy_to_xy(game_map, enemy.pos, mine_pos)
+                    path, distance = self.paths.bfs_from_xy_to_xy(game_map, enemy.pos, mine_pos)
                     if distance < 3 and hero.life > enemy.life + distance:
-                        intercept_pathA, intercept_distanceA = bfs_from_xy_to_xy(game_map, hero.pos, path[0])
-                        intercept_pathB, intercept_distanceB = bfs_from_xy_to_xy(game_map, hero.pos, mine_pos)
+                        intercept_pathA, intercept_distanceA = field.path_to(path[0])
+                        intercept_pathB, intercept_distanceB = field.path_to(mine_pos)
                         intercept_path, intercept_distance = (intercept_pathA,
                                                               intercept_distanceA) if intercept_distanceA < intercept_distanceB else (
                             intercept_pathB, intercept_distanceB)
@@ -91,7 +93,7 @@ class AI(AIBase):
             return None
 
         def end_game_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
+            path, distance = field.nearest(MapElements.TAVERN)
             if phase == "end" and is_leading and distance <= remaining_turns:
                 self.explore_path = None
                 self.explore_objective = None
@@ -100,7 +102,7 @@ class AI(AIBase):
                 return None
 
         def do_nearest_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
+            path, distance = field.nearest(MapElements.MINE)
             if distance < remaining_turns and calculate_mine_value(distance):
                 self.explore_path = None
                 self.explore_objective = None
@@ -110,7 +112,7 @@ class AI(AIBase):
 
         def attack_richest_if():
             richest = enemies_by_mines[0]
-            path, distance = bfs_from_xy_to_xy(game_map, hero.pos, richest.pos)
+            path, distance = field.path_to(richest.pos)
             if distance < remaining_turns and hero.life - distance - 1 >= richest.life and hero.life > critical_hp + distance * 5:
                 if richest.mine_count >= 3:
                     self.explore_path = None
@@ -123,7 +125,7 @@ class AI(AIBase):
             return None
 
         def opportunistic_kill_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
+            path, distance = field.nearest(MapElements.ENEMY)
             if len(path) > 0:
                 enemy_position = path[-1]
                 enemy = [e for e in enemies if e.pos[0] == enemy_position[0] and e.pos[1] == enemy_position[1]]
@@ -134,7 +136,7 @@ class AI(AIBase):
             return None
 
         def attack_nearest_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
+            path, distance = field.nearest(MapElements.ENEMY)
             if len(path) > 0:
                 enemy_position = path[-1]
                 enemy = [e for e in enemies if e.pos[0] == enemy_position[0] and e.pos[1] == enemy_position[1]]
@@ -146,7 +148,7 @@ class AI(AIBase):
 
         def attack_weakest_if():
             weakest = min(enemies, key=lambda e: e.life)
-            path, distance = bfs_from_xy_to_xy(game_map, hero.pos, weakest.pos)
+            path, distance = field.path_to(weakest.pos)
             if weakest.life < hero.life - distance - 1 and distance < remaining_turns:
                 self.explore_path = None
                 self.explore_objective = None
@@ -154,7 +156,7 @@ class AI(AIBase):
             return None
 
         def go_to_tavern_if():
-            path, distance = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.TAVERN)
+            path, distance = field.nearest(MapElements.TAVERN)
             if (distance < remaining_turns and hero.life < critical_hp and hero.gold >= 2 and (
                     hero.life + 50 - distance) * hero.mine_count > 2):
                 self.explore_path = None
@@ -164,8 +166,8 @@ class AI(AIBase):
 
         def suicide():
             if hero.mine_count == 0 and hero.gold == 0:
-                path_1, distance_1 = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.ENEMY)
-                path_2, distance_2 = bfs_from_xy_to_nearest_char(game_map, hero.pos, MapElements.MINE)
+                path_1, distance_1 = field.nearest(MapElements.ENEMY)
+                path_2, distance_2 = field.nearest(MapElements.MINE)
                 path, distance = (path_1, distance_1) if distance_1 < distance_2 else (path_2, distance_2)
                 if distance < remaining_turns * 2:
                     self.explore_path = None
@@ -208,7 +210,7 @@ class AI(AIBase):
                     return None
 
                 # Plan path to target
-                path_to_target, dist_to_target = bfs_from_xy_to_xy(game_map, hero.pos, target_pos)
+                path_to_target, dist_to_target = field.path_to(target_pos)
 
                 # If life is too low to reach, plan a tavern stop
                 if hero.life < dist_to_target * 5 + 20:
@@ -219,15 +221,15 @@ class AI(AIBase):
                     best_tavern = None
                     best_distance = float('inf')
                     for t in taverns:
-                        _, dist = bfs_from_xy_to_xy(game_map, t, target_pos)
+                        _, dist = self.paths.bfs_from_xy_to_xy(game_map, t, target_pos)
                         if dist is not None and dist < best_distance:
                             best_tavern = t
                             best_distance = dist
                     tavern_near_target = best_tavern
                     if tavern_near_target is None:
                         return None
-                    path_to_tavern, dist_to_tavern = bfs_from_xy_to_xy(game_map, hero.pos, tavern_near_target)
-                    path_tavern_to_target, _ = bfs_from_xy_to_xy(game_map, tavern_near_target, target_pos)
+                    path_to_tavern, dist_to_tavern = field.path_to(tavern_near_target)
+                    path_tavern_to_target, _ = self.paths.bfs_from_xy_to_xy(game_map, tavern_near_target, target_pos)
                     full_path = path_to_tavern + path_tavern_to_target[1:]
                     self.explore_path = full_path
                     return (full_path[:2], Actions.EXPLORE)
@@ -262,67 +264,9 @@ class AI(AIBase):
 
         # Safety check: ensure path has at least 2 elements for direction calculation
         if path_and_action is None or len(path_and_action[0]) < 2:
-            # Fallback to wait action - print comprehensive debug info
-            print("=== FALLBACK TRIGGERED - DEBUG INFO ===")
-            print(f"Hero position: {getattr(hero, 'pos', 'None')}")
-            print(f"Hero life: {getattr(hero, 'life', 'None')}")
-            print(f"Hero gold: {getattr(hero, 'gold', 'None')}")
-            print(f"Hero mines: {getattr(hero, 'mines', 'None')}")
-            print(f"Hero mine_count: {getattr(hero, 'mine_count', 'None')}")
-            print(f"Remaining turns: {remaining_turns}")
-            print(f"Phase: {phase}")
-            print(f"Critical HP: {critical_hp}")
-            print(f"Enemies count: {len(enemies)}")
-
-            # Print nearest targets info
-            try:
-                nearest_mine_path, nearest_mine_dist = bfs_from_xy_to_nearest_char(game_map,
-                                                                                   getattr(hero, 'pos', (0, 0)),
-                                                                                   MapElements.MINE)
-                print(f"Nearest mine: path={nearest_mine_path}, distance={nearest_mine_dist}")
-            except Exception as e:
-                print(f"Error getting nearest mine: {e}")
-
-            try:
-                nearest_enemy_path, nearest_enemy_dist = bfs_from_xy_to_nearest_char(game_map,
-                                                                                     getattr(hero, 'pos', (0, 0)),
-                                                                                     MapElements.ENEMY)
-                print(f"Nearest enemy: path={nearest_enemy_path}, distance={nearest_enemy_dist}")
-            except Exception as e:
-                print(f"Error getting nearest enemy: {e}")
-
-            try:
-                nearest_tavern_path, nearest_tavern_dist = bfs_from_xy_to_nearest_char(game_map,
-                                                                                       getattr(hero, 'pos', (0, 0)),
-                                                                                       MapElements.TAVERN)
-                print(f"Nearest tavern: path={nearest_tavern_path}, distance={nearest_tavern_dist}")
-            except Exception as e:
-                print(f"Error getting nearest tavern: {e}")
-
-            # Print game map
-            print("Game map:")
-            try:
-                for i, row in enumerate(game_map):
-                    print(f"Row {i}: {row}")
-            except Exception as e:
-                print(f"Error printing game map: {e}")
-
-            # Print enemy details
-            print("Enemies:")
-            for i, enemy in enumerate(enemies):
-                print(
-                    f"  Enemy {i}: pos={getattr(enemy, 'pos', 'None')}, life={getattr(enemy, 'life', 'None')}, mines={getattr(enemy, 'mines', 'None')}, mine_count={getattr(enemy, 'mine_count', 'None')}")
-
-            # Print policy results
-            print("Policy results:")
-            for i, policy in enumerate(policy_priority):
-                try:
-                    result = policy()
-                    print(f"  Policy {i}: {policy.__name__} = {result}")
-                except Exception as e:
-                    print(f"  Policy {i}: {policy.__name__} = ERROR: {e}")
-
-            print("=== END DEBUG INFO ===")
+            # Debug record of why, rate-limited and only built at DEBUG level
+            log.dump(self.log, "fallback", lambda: self.fallback_record(
+                game_map, policy_priority, remaining_turns=remaining_turns, phase=phase, critical_hp=critical_hp))
 
             # Fallback to wait action
             path_and_action = ([getattr(hero, 'pos', (0, 0)), getattr(hero, 'pos', (0, 0))], Actions.WAIT)
@@ -1,13 +1,8 @@
-import gc
-import threading
 import sys
 
-# Configure garbage collection
-gc.set_threshold(700, 10, 5)  # Increase thresholds to reduce collection frequency
-gc.disable()  # Disable automatic garbage collection during tournament
-
-from clients.basic_client import BasicClient
+from clients.async_client import AsyncTournament
 from clients.tui_client import Config
+from utils.ratings import RatingLedger
 from models import adaptive_lookahead_ai, heuristic_ai, tactical_ai_v2, tactical_ai_v4, risk_reward_ai, tactical_ai_v3
 
 # Local tournament for Vindinium AIs
@@ -32,6 +27,10 @@ base_config = dict(
     delay=0  # Map name: "m1", "m2", "m3", "m4", "m5", or "m6"
 )
 
+# Games each bot plays at the same time, and processes running the decisions
+games_in_flight = 8
+workers = None  # one per CPU
+
 
 def wait_for_enter():
     """Simple cross-platform function to wait for Enter key press"""
@@ -41,23 +40,24 @@ def wait_for_enter():
 
 
 if __name__ == "__main__":
-    try:
-        client_configs = [
-            Config.from_dict({**base_config, **ai_config}) for ai_config in ai_configs
-        ]
-        clients = [BasicClient(config) for config in client_configs]
-
-        wait_for_enter()
-
-        threads = []
-        for c in clients:
-            t = threading.Thread(target=c.play)
-            t.start()
-            threads.append(t)
-
-        for t in threads:
-            t.join()
-
-        print("Tournament completed.")
-    finally:
-        gc.enable()  # Re-enable garbage collection after tournament
+    client_configs = [
+        Config.from_dict({**base_config, **ai_config}) for ai_config in ai_configs
+    ]
+    ratings = RatingLedger.load()  # data/ratings.json
+    tournament = AsyncTournament(client_configs, games_in_flight=games_in_flight, workers=workers, ratings=ratings)
+
+    wait_for_enter()
+
+    results = tournament.run()
+
+    print("Tournament completed.")
+    print(f"{tournament.games_played()} games in {tournament.seconds:.0f}s: "
+          f"{tournament.games_per_minute():.1f} games/minute, {tournament.errors} failed")
+    for config in client_configs:
+        played = [r for r in results if r.name == config.ai.name]
+        wins = sum(r.rank == 1 for r in played)
+        print(f"{config.ai.name}: {wins}/{len(played)} wins")
+    print("Ratings:")
+    for line in ratings.leaderboard():
+        low, high = line.interval()
+        print(f"{line.name}: {line.rating:.0f} [{low:.0f}, {high:.0f}] in {line.games} games")
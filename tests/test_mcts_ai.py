@@ -0,0 +1,28 @@
+from game import Game
+from models.ai_base import AIBase, Actions, Directions
+from models.mcts_ai import AI
+from utils.local_server import LocalServer
+from utils.simulator import DIRECTIONS, SimState
+
+
+class Waiter(AIBase):
+    """Rollout policy that always stays put."""
+
+    def decide(self):
+        return self._package([self.hero().pos], Actions.WAIT, {}, Directions.STAY)
+
+
+def test_rollouts_with_a_waiting_ai_policy():
+    game = Game(LocalServer(seed=1).training("mcts", turns=40))
+    policy = Waiter()
+    policy.log_decisions = False
+    ai = AI(rollout_policy=policy)
+    ai.log_decisions = False
+    ai.MAX_ITERATIONS = 20
+    ai.process(game)
+
+    sim = SimState.from_game(game)
+    assert ai._rollout_move(sim, sim.to_move) == "Stay"
+    decision = ai.decide()
+    assert ai.last_search['iterations'] == 20
+    assert decision[3] in DIRECTIONS
@@ -65,6 +65,8 @@ class tui:
         self.time_win = None
         self.summary_win = None
         self.log_entries = []
+        self.map_frame = {}  # (y, x) -> (char, attr) last drawn on the map
+        self.fields = {}  # (window, y, x) -> (text, attr) last drawn there
         self.stdscr = curses.initscr()
         curses.start_color()
         # Basic color set
@@ -78,6 +80,18 @@ class tui:
         curses.init_pair(8, curses.COLOR_WHITE, curses.COLOR_MAGENTA)
         curses.init_pair(9, curses.COLOR_WHITE, curses.COLOR_GREEN)
         curses.init_pair(10, curses.COLOR_WHITE, curses.COLOR_YELLOW)
+        # Colors of the heroes by bot id, blue by default
+        self.hero_attrs = {1: curses.A_BOLD + curses.color_pair(6),
+                           2: curses.A_BOLD + curses.color_pair(8),
+                           3: curses.A_BOLD + curses.color_pair(9),
+                           4: curses.A_BOLD + curses.color_pair(10)}
+        # Map tiles other than heroes and empty cells
+        self.map_cells = {"#": (curses.ACS_CKBOARD, 0),
+                          "$": ("$", curses.A_BOLD + curses.color_pair(4)),
+                          "T": ("T", curses.A_BOLD + curses.color_pair(5)),
+                          "@": ("@", curses.A_BOLD + curses.color_pair(2)),
+                          "X": ("X", curses.A_BOLD + curses.color_pair(7))}
+        self.path_cell = (curses.ACS_BULLET, curses.color_pair(3) + curses.A_BOLD)
         # check for minimal screen size
         screen_y, screen_x = self.stdscr.getmaxyx()
         if screen_y < MIN_LINES or screen_x < MIN_COLS:
@@ -100,6 +114,8 @@ class tui:
 
     def clear(self):
         """Refresh all windows"""
+        self.map_frame = {}
+        self.fields = {}
         self.stdscr.erase()
         if self.data_win:
             self.data_win.erase()
@@ -153,6 +169,7 @@ class tui:
         """Draw the windows needed for the game"""
         if self.menu_win:
             self.menu_win.erase()
+        self.fields = {}
         self.draw_data_win()
         self.draw_path_win()
         self.draw_log_win()
@@ -303,7 +320,7 @@ class tui:
 # MAP ------------------------------------------------------------------
 
     def draw_map(self, board_map, path, heroes):
-        """Draw the map"""
+        """Draw the map, repainting only the cells that changed since the last call"""
         board_size = len(board_map)
         self.MAP_H = board_size
         self.MAP_W = board_size
@@ -318,10 +335,7 @@ class tui:
                 self.map_win.resize(board_size + 2, board_size + 2)
                 # Time line (Cost cpu time)
                 self.draw_time_win()
-                self.map_win.noutrefresh()
-            else:
-                self.map_win.erase()
-                self.map_win.noutrefresh()
+                self.map_frame = {}
         else:
             # map doesn't exist
             self.map_win = curses.newwin(board_size + 2, board_size + 2, self.MAP_Y, self.MAP_X)
@@ -329,45 +343,33 @@ class tui:
             # Time line (Cost cpu time)
             self.draw_time_win()
             curses.panel.update_panels()
-        self.map_win.box()
+            self.map_frame = {}
+        if not self.map_frame:
+            # New, resized or cleared window: everything is drawn
+            self.map_win.erase()
+            self.map_win.box()
         # highlight choosen path
         if path is None:
             path = []
-        for cell in path:
-            self.map_win.addch(cell[0]+1, cell[1] + 1, curses.ACS_BULLET, curses.color_pair(3) + curses.A_BOLD)
+        path_cells = set(tuple(cell) for cell in path)
+        hero_attrs = {}
+        for hero in heroes:
+            hero_attrs[tuple(hero.pos)] = self.hero_attrs.get(hero.bot_id, self.hero_attrs[1])
         # Draw map content
+        frame = self.map_frame
         y = 0
         for line in board_map:
             x = 0
             for char in line:
-                attr = 0
-                if char == "#":
-                    attr = 0
-                    char = curses.ACS_CKBOARD
-                elif char == "$":
-                    attr = curses.A_BOLD + curses.color_pair(4)
-                elif char == "T":
-                    attr = curses.A_BOLD + curses.color_pair(5)
+                if char == " ":
+                    cell = self.path_cell if (y, x) in path_cells else (" ", 0)
                 elif char == "H":
-                    # default bot color is BLUE
-                    attr = curses.A_BOLD + curses.color_pair(6)
-                    for hero in heroes:
-                        # Select color for bot (cost cpu time)
-                        if hero.pos == (y, x):
-                            if hero.bot_id == 1:
-                                attr = curses.A_BOLD + curses.color_pair(6)
-                            elif hero.bot_id == 2:
-                                attr = curses.A_BOLD + curses.color_pair(8)
-                            elif hero.bot_id == 3:
-                                attr = curses.A_BOLD + curses.color_pair(9)
-                            elif hero.bot_id == 4:
-                                attr = curses.A_BOLD + curses.color_pair(10)
-                elif char == "@":
-                    attr = curses.A_BOLD + curses.color_pair(2)
-                elif char == "X":
-                    attr = curses.A_BOLD + curses.color_pair(7)
-                if not (char == " " and (y, x in path)):
-                    self.map_win.addch(y + 1, x + 1, char, attr)
+                    cell = ("H", hero_attrs.get((y, x), self.hero_attrs[1]))
+                else:
+                    cell = self.map_cells.get(char, (char, 0))
+                if frame.get((y, x)) != cell:
+                    self.map_win.addch(y + 1, x + 1, cell[0], cell[1])
+                    frame[(y, x)] = cell
                 x = x + 1
             y = y + 1
 
@@ -380,198 +382,168 @@ class tui:
     # the good place. Names are explicit.
 
     def display_heroes(self, heroes, bot_id):
-        x = 12
-        gold_winner = ""
+        gold_winner = None
         max_gold = 0
-        gold_pos = 0
-        mine_winner = ""
+        mine_winner = None
         max_mine = 0
-        mine_pos = 0
         for hero in heroes:
-            if hero.bot_id != bot_id:
-                for i in range(1, 21, 2):
-                    # Clear player tab
-                    self.players_win.hline(i, x, " ", 17)
-                if hero.bot_id == 1:
-                    attr = curses.A_BOLD + curses.color_pair(6)
-                elif hero.bot_id == 2:
-                    attr = curses.A_BOLD + curses.color_pair(8)
-                elif hero.bot_id == 3:
-                    attr = curses.A_BOLD + curses.color_pair(9)
-                elif hero.bot_id == 4:
-                    attr = curses.A_BOLD + curses.color_pair(10)
-                self.players_win.addstr(1, x, str(hero.name[0:17]), attr)
-                self.players_win.addstr(3, x, str(hero.user_id))
-                self.players_win.addstr(5, x, str(hero.bot_id))
-                self.players_win.addstr(7, x, str(hero.elo))
-                self.players_win.addstr(9, x, str(hero.pos))
-                self.players_win.addstr(11, x, str(hero.life))
-                self.players_win.addstr(13, x, str(hero.mine_count))
-                self.players_win.addstr(15, x, str(hero.gold))
-                self.players_win.addstr(17, x, str(hero.spawn_pos))
-                self.players_win.addstr(19, x, str(hero.crashed))
-                x += 18 #  player horizontal offset
             if int(hero.gold) > max_gold:
                 max_gold = int(hero.gold)
-                gold_winner =  str(hero.bot_id)
-                gold_pos = x - 2
+                gold_winner = hero.bot_id
             if int(hero.mine_count) > max_mine:
                 max_mine = int(hero.mine_count)
-                mine_winner = str(hero.bot_id)
-                mine_pos = x - 2
-        if gold_winner == str(bot_id):
-            self.data_win.addstr(17, 21, "$", curses.A_BOLD + curses.color_pair(4))
-        elif gold_pos > 0:
-            self.players_win.addstr(15, gold_pos, "$", curses.A_BOLD + curses.color_pair(4))
-        if mine_winner == str(bot_id):
-            self.data_win.addstr(15, 21, "*", curses.A_BOLD + curses.color_pair(4))
-        elif mine_pos > 0:
-            self.players_win.addstr(13, mine_pos, "*", curses.A_BOLD + curses.color_pair(4))
+                mine_winner = hero.bot_id
+        x = 12
+        for hero in heroes:
+            if hero.bot_id != bot_id:
+                attr = self.hero_attrs.get(hero.bot_id, self.hero_attrs[1])
+                self.draw_field(self.players_win, 1, x, 17, str(hero.name[0:17]), attr)
+                self.draw_field(self.players_win, 3, x, 17, str(hero.user_id))
+                self.draw_field(self.players_win, 5, x, 17, str(hero.bot_id))
+                self.draw_field(self.players_win, 7, x, 17, str(hero.elo))
+                self.draw_field(self.players_win, 9, x, 17, str(hero.pos))
+                self.draw_field(self.players_win, 11, x, 17, str(hero.life))
+                # Mine count and gold leave room for the winner marks
+                self.draw_field(self.players_win, 13, x, 16, str(hero.mine_count))
+                self.draw_mark(self.players_win, 13, x + 16, "*", mine_winner == hero.bot_id)
+                self.draw_field(self.players_win, 15, x, 16, str(hero.gold))
+                self.draw_mark(self.players_win, 15, x + 16, "$", gold_winner == hero.bot_id)
+                self.draw_field(self.players_win, 17, x, 17, str(hero.spawn_pos))
+                self.draw_field(self.players_win, 19, x, 17, str(hero.crashed))
+                x += 18 #  player horizontal offset
+        self.draw_mark(self.data_win, 17, 21, "$", gold_winner == bot_id)
+        self.draw_mark(self.data_win, 15, 21, "*", mine_winner == bot_id)
 
     def display_url(self, url):
         url = url[url.rfind("/")+1:]
-        self.data_win.addstr(1, 14, str(url))
+        self.draw_field(self.data_win, 1, 14, 17, str(url))
 
     def display_bot_name(self, name):
-        self.data_win.addstr(3, 14, str(name[0:15]))
+        self.draw_field(self.data_win, 3, 14, 17, str(name[0:15]))
 
     def display_turn(self, turn, max_turns):
-        self.clear_data_cell((9, 14), 8)
-        self.clear_data_cell((9, 23), 8)
-        self.data_win.addstr(9, 23, str(turn)+"/"+str(max_turns), curses.A_BOLD)
-        self.data_win.addstr(9, 14, str(turn+1)+"/"+str(max_turns), curses.A_BOLD)
+        self.draw_field(self.data_win, 9, 23, 8, str(turn)+"/"+str(max_turns), curses.A_BOLD)
+        self.draw_field(self.data_win, 9, 14, 8, str(turn+1)+"/"+str(max_turns), curses.A_BOLD)
 
     def display_elapsed(self, elapsed):
-        self.clear_data_cell((7, 14), 17)
         attr = 0
         if elapsed > 0.5:
             attr = curses.color_pair(3) + curses.A_BOLD
-        self.data_win.addstr(7, 20, str(elapsed), attr)
+        self.draw_field(self.data_win, 7, 20, 11, str(elapsed), attr)
 
     def display_pos(self, pos):
-        self.clear_data_cell((11, 14), 8)
-        self.data_win.addstr(11, 14, str(pos))
+        self.draw_field(self.data_win, 11, 14, 8, str(pos))
 
     def display_last_pos(self, pos):
-        self.clear_data_cell((11, 23), 8)
-        self.data_win.addstr(11, 23, str(pos))
+        self.draw_field(self.data_win, 11, 23, 8, str(pos))
 
     def display_action(self, action):
         attr = 0
         if action == "wait":
             # Display "wait" in bold red
             attr = attr = curses.color_pair(3) + curses.A_BOLD
-        self.clear_data_cell((21, 14), 8)
-        self.data_win.addstr(21, 14, str(action), attr)
+        self.draw_field(self.data_win, 21, 14, 8, str(action), attr)
 
     def display_last_action(self, action):
         attr = 0
         if action == "wait":
             # Display "wait" in bold red
             attr = attr = curses.color_pair(3) + curses.A_BOLD
-        self.clear_data_cell((21, 14), 8)
-        self.clear_data_cell((21, 23), 8)
-        self.data_win.addstr(21, 23, str(action), attr)
+        self.draw_field(self.data_win, 21, 23, 8, str(action), attr)
 
     def display_move(self, move):
-        attr = 0
-        if move == "Stay":
-            # Display "Stay" in bold red
-            attr = attr = curses.color_pair(3) + curses.A_BOLD
-        self.clear_data_cell((19, 14), 8)
-        self.data_win.addstr(19, 14, str(move))
+        self.draw_field(self.data_win, 19, 14, 8, str(move))
 
     def display_last_move(self, move):
-        attr = 0
-        if move == "Stay":
-            # Display "Stay" in bold red
-            attr = attr = curses.color_pair(3) + curses.A_BOLD
-        self.clear_data_cell((19, 23), 8)
-        self.data_win.addstr(19, 23, str(move))
+        self.draw_field(self.data_win, 19, 23, 8, str(move))
 
     def display_life(self, life):
-        self.clear_data_cell((13, 14), 8)
         attr = 0
         if life < 20:
             attr = curses.color_pair(3) + curses.A_BOLD
-        self.data_win.addstr(13, 14, str(life), attr)
+        self.draw_field(self.data_win, 13, 14, 8, str(life), attr)
 
     def display_last_life(self, life):
-        self.clear_data_cell((13, 23), 8)
         attr = 0
         if life < 20:
             attr = curses.color_pair(3) + curses.A_BOLD
-        self.data_win.addstr(13, 23, str(life), attr)
+        self.draw_field(self.data_win, 13, 23, 8, str(life), attr)
 
     def display_mine_count(self, mine_count):
-        self.clear_data_cell((15, 14), 8)
         attr = 0
         if mine_count[0] == "0":
             attr = curses.color_pair(3) + curses.A_BOLD
-        self.data_win.addstr(15, 14, str(mine_count), attr)
+        # Column 21 is the mine winner mark
+        self.draw_field(self.data_win, 15, 14, 7, str(mine_count), attr)
 
     def display_last_mine_count(self, mine_count):
-        self.clear_data_cell((15, 23), 8)
         attr = 0
         if mine_count[0] == "0":
             attr = curses.color_pair(3) + curses.A_BOLD
-        self.data_win.addstr(15, 23, str(mine_count), attr)
+        self.draw_field(self.data_win, 15, 23, 8, str(mine_count), attr)
 
     def display_gold(self, gold):
-        self.clear_data_cell((17, 14), 8)
-        self.data_win.addstr(17, 14, str(gold))
+        # Column 21 is the gold winner mark
+        self.draw_field(self.data_win, 17, 14, 7, str(gold))
 
     def display_last_gold(self, gold):
-        self.clear_data_cell((17, 23), 8)
-        self.data_win.addstr(17, 23, str(gold))
+        self.draw_field(self.data_win, 17, 23, 8, str(gold))
 
     def display_elo(self, elo):
-        self.data_win.addstr(5, 20, str(elo))
+        self.draw_field(self.data_win, 5, 20, 11, str(elo))
 
     def display_nearest_mine(self, mine):
-        self.clear_data_cell((27, 14), 8)
-        self.data_win.addstr(27, 14, str(mine))
+        self.draw_field(self.data_win, 27, 14, 8, str(mine))
 
     def display_last_nearest_mine(self, mine):
-        self.clear_data_cell((27, 23), 8)
-        self.data_win.addstr(27, 23, str(mine))
+        self.draw_field(self.data_win, 27, 23, 8, str(mine))
 
     def display_nearest_tavern(self, tavern):
-        self.clear_data_cell((25, 14), 8)
-        self.data_win.addstr(25, 14, str(tavern))
+        self.draw_field(self.data_win, 25, 14, 8, str(tavern))
 
     def display_last_nearest_tavern(self, tavern):
-        self.clear_data_cell((25, 23), 8)
-        self.data_win.addstr(25, 23, str(tavern))
+        self.draw_field(self.data_win, 25, 23, 8, str(tavern))
 
     def display_nearest_hero(self, hero):
-        self.clear_data_cell((23, 14), 8)
-        self.data_win.addstr(23, 14, str(hero))
+        self.draw_field(self.data_win, 23, 14, 8, str(hero))
 
     def display_last_nearest_hero(self, hero):
-        self.clear_data_cell((23, 23), 8)
-        self.data_win.addstr(23, 23, str(hero))
+        self.draw_field(self.data_win, 23, 23, 8, str(hero))
 
     def display_decision(self, decision):
-        self.path_win.hline(1, 14, " ", 51)
         d = ""
         for h in decision:
             d += str(h[0])+": "+str(h[1])+" | "
-        self.path_win.addstr(1, 14, d)
+        self.draw_field(self.path_win, 1, 14, 51, d)
 
     def display_summary(self, played, won, timed_out):
         data = ['', played, '', won, '', timed_out]
         for i in range(1, 7, 2):
-            self.summary_win.hline(i, 11, " ", 8)
-            self.summary_win.addstr(i, 11, data[i])
+            self.draw_field(self.summary_win, i, 11, 8, data[i])
 
     def display_path(self, path):
-        self.path_win.hline(3, 14, " ", 51)
         path = str(path).strip('[').strip(']')[0:48]+"..."
-        self.path_win.addstr(3, 14, path)
+        self.draw_field(self.path_win, 3, 14, 51, path)
+
+    def draw_field(self, win, y, x, length, text, attr=0):
+        """Write text over the length cells at (y, x) of win, unless they already show it"""
+        key = (win, y, x)
+        if self.fields.get(key) == (text, attr):
+            return
+        win.hline(y, x, " ", length)
+        win.addstr(y, x, text, attr)
+        self.fields[key] = (text, attr)
+
+    def draw_mark(self, win, y, x, mark, shown):
+        """Show or hide the gold/mine winner mark at (y, x) of win"""
+        if shown:
+            self.draw_field(win, y, x, 1, mark, curses.A_BOLD + curses.color_pair(4))
+        else:
+            self.draw_field(win, y, x, 1, " ")
 
     def clear_data_cell(self, pos, length):
         self.data_win.hline(pos[0], pos[1], " ", length)
+        self.fields.pop((self.data_win, pos[0], pos[1]), None)
 
 # TIME CURSOR ----------------------------------------------------------
 
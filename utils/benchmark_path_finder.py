@@ -0,0 +1,137 @@
+"""
+Pathfinding benchmark.
+
+Times the parent-pointer BFS engine of `utils.path_finder` against the
+previous implementation, which copied the whole path list for every cell it
+enqueued, and against `DistanceTable` lookups.
+
+By default it runs on six seeded maps, one per standard board size (10x10 up
+to the 28x28 tournament size). Saved games can be given on the command line
+to benchmark on real server maps:
+
+    python -m utils.benchmark_path_finder ~/.vindinium/save/<game id> ...
+"""
+
+import collections
+import random
+import sys
+import time
+
+from game import Game
+from models.ai_base import MapElements
+from utils.map_generator import generate_map, STANDARD_SIZES
+from utils.path_finder import (DEFAULT_WALKABLE_CHARS, NOT_FOUND, bfs_from_xy_to_nearest_char,
+                               bfs_from_xy_to_xy, distance_table)
+from utils.replay import load_states
+
+REPEAT = 5
+
+
+def legacy_bfs_from_xy_to_xy(grid, start_pos, target_pos, walkable_chars={' '}):
+    """The copy-the-path-per-node BFS `bfs_from_xy_to_xy` used to be (no bound checks)."""
+    rows, cols = len(grid), len(grid[0])
+    all_walkable_chars = DEFAULT_WALKABLE_CHARS.union(walkable_chars)
+    queue = collections.deque([(start_pos, [start_pos])])
+    visited = {start_pos}
+    while queue:
+        (r, c), path = queue.popleft()
+        if (r, c) == target_pos:
+            return path, len(path) - 1
+        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < rows and 0 <= nc < cols):
+                continue
+            if (grid[nr][nc] in all_walkable_chars or (nr, nc) == target_pos) and (nr, nc) not in visited:
+                visited.add((nr, nc))
+                new_path = list(path)
+                new_path.append((nr, nc))
+                queue.append(((nr, nc), new_path))
+    return NOT_FOUND
+
+
+def legacy_bfs_from_xy_to_nearest_char(grid, start_pos, end_char, walkable_chars={' '}):
+    """The copy-the-path-per-node BFS `bfs_from_xy_to_nearest_char` used to be."""
+    rows, cols = len(grid), len(grid[0])
+    all_walkable_chars = DEFAULT_WALKABLE_CHARS.union(walkable_chars)
+    queue = collections.deque([(start_pos, [start_pos])])
+    visited = {start_pos}
+    while queue:
+        (r, c), path = queue.popleft()
+        if grid[r][c] == end_char:
+            return path, len(path) - 1
+        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < rows and 0 <= nc < cols):
+                continue
+            neighbor_char = grid[nr][nc]
+            if (neighbor_char in all_walkable_chars or neighbor_char == end_char) and (nr, nc) not in visited:
+                visited.add((nr, nc))
+                new_path = list(path)
+                new_path.append((nr, nc))
+                queue.append(((nr, nc), new_path))
+    return NOT_FOUND
+
+
+def seeded_states():
+    """One initial game state per standard board size."""
+    for size in STANDARD_SIZES:
+        board, spawns = generate_map(size, seed=size)
+        yield f"{size}x{size}", _state(board, spawns)
+
+
+def saved_states(file_names):
+    """The first state of each saved game."""
+    for file_name in file_names:
+        yield file_name, next(iter(load_states(file_name)))
+
+
+def _state(board, spawns):
+    heroes = [{'id': hero_id, 'name': f"bot{hero_id}", 'pos': {'x': r, 'y': c}, 'spawnPos': {'x': r, 'y': c},
+               'life': 100, 'gold': 0, 'crashed': False, 'mineCount': 0}
+              for hero_id, (r, c) in spawns.items()]
+    return {'viewUrl': '', 'hero': heroes[0],
+            'game': {'turn': 0, 'maxTurns': 1200, 'finished': False, 'board': board, 'heroes': heroes}}
+
+
+def _time(function, queries):
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for query in queries:
+            function(*query)
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries) * 1e6
+
+
+def benchmark(name, state):
+    game = Game(state)
+    grid = game.board_map
+    rng = random.Random(0)
+    cells = [(r, c) for r, row in enumerate(grid) for c, char in enumerate(row) if char != '#']
+    targets = game.mines_locs + game.taverns_locs + [h.pos for h in game.heroes]
+    to_xy = [(grid, rng.choice(cells), rng.choice(targets)) for _ in range(200)]
+    to_char = [(grid, rng.choice(cells), rng.choice([MapElements.MINE, MapElements.TAVERN, MapElements.ENEMY]))
+               for _ in range(200)]
+
+    start = time.perf_counter()
+    table = distance_table(game.board.topology)
+    build_ms = (time.perf_counter() - start) * 1e3
+    lookups = [(query[1], query[2]) for query in to_xy]
+
+    legacy_xy = _time(legacy_bfs_from_xy_to_xy, to_xy)
+    new_xy = _time(bfs_from_xy_to_xy, to_xy)
+    legacy_char = _time(legacy_bfs_from_xy_to_nearest_char, to_char)
+    new_char = _time(bfs_from_xy_to_nearest_char, to_char)
+    lookup = _time(table.distance, lookups)
+    print(f"{name:>12} | {legacy_xy:8.1f} {new_xy:8.1f} {legacy_xy / new_xy:5.1f}x"
+          f" | {legacy_char:8.1f} {new_char:8.1f} {legacy_char / new_char:5.1f}x"
+          f" | {lookup:6.2f} {build_ms:8.1f}")
+
+
+if __name__ == "__main__":
+    states = saved_states(sys.argv[1:]) if len(sys.argv) > 1 else seeded_states()
+    print("Microseconds per query (best of %d)" % REPEAT)
+    print(f"{'map':>12} | {'xy: old':>8} {'new':>8} {'gain':>6} | {'char: old':>8} {'new':>8} {'gain':>6}"
+          f" | {'table':>6} {'build ms':>8}")
+    for name, state in states:
+        benchmark(name, state)
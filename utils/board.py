@@ -0,0 +1,182 @@
+"""
+Compact, index-based board representation.
+
+The server sends the board as a single string of two-character tiles. Rather
+than rebuilding a list of strings cell by cell, `Board` keeps one byte per
+cell in a flat ``bytearray`` indexed by ``row * size + col``, plus the index
+sets that never need recomputing (walls, mines, taverns).
+
+Cell codes are the same characters used by the legacy ``board_map`` view:
+``' '`` (air), ``'#'`` (wall), ``'$'`` (mine), ``'T'`` (tavern) and ``'H'``
+(hero). The ``owners`` array holds the owning hero id of each mine and the
+id of each hero cell (``0`` means none).
+
+Walls, mines and taverns never move, so everything derived from them lives in
+a `Topology` shared process-wide through `topology_for`: it is keyed by the
+tile string with the dynamic parts (heroes, mine owners) blanked out, so every
+turn of every game played on the same map reuses one instance. Only hero
+positions and mine owners are parsed per turn. Spawn points are not part of
+the tiles and belong to a game: its boards share the game's own set.
+"""
+
+import re
+import threading
+
+EMPTY = ord(' ')
+WALL = ord('#')
+MINE = ord('$')
+TAVERN = ord('T')
+HERO = ord('H')
+
+# First tile character -> cell code
+_KIND_TABLE = str.maketrans({'[': 'T'})
+# Dynamic tiles: heroes ("@1") and owned mines ("$1")
+_HEROES = re.compile(r'@(\d)')
+_OWNED_MINES = re.compile(r'\$(\d)')
+
+# How many distinct map layouts are kept (training games use random maps)
+TOPOLOGY_CACHE_SIZE = 32
+_topologies = {}
+_topologies_lock = threading.Lock()
+
+
+class Topology:
+    """Static part of a map: walls, mines and taverns."""
+
+    def __init__(self, size: int, skeleton: str):
+        self.size = size
+        self.skeleton = skeleton
+        self.cells = bytes(skeleton[0::2].translate(_KIND_TABLE), 'ascii')
+        cells = self.cells
+        self.walls = frozenset(i for i, c in enumerate(cells) if c == WALL)
+        self.mines = frozenset(i for i, c in enumerate(cells) if c == MINE)
+        self.taverns = frozenset(i for i, c in enumerate(cells) if c == TAVERN)
+        # Heroes can only ever stand on air; mines and taverns are entered
+        # as the last step of a path but never walked through
+        self.walkable = bytes(c == EMPTY for c in cells)
+        # In-bounds, non-wall neighbours of every cell (Up, Down, Left, Right)
+        self.neighbours = [self._neighbours_of(i) for i in range(len(cells))]
+        # Legacy (row, col) views, shared by every Game: treat them as read-only
+        self.walls_locs = [divmod(i, size) for i in sorted(self.walls)]
+        self.mines_locs = [divmod(i, size) for i in sorted(self.mines)]
+        self.taverns_locs = [divmod(i, size) for i in sorted(self.taverns)]
+        text = cells.decode('ascii')
+        self.rows = [text[i:i + size] for i in range(0, len(text), size)]
+        self.distance_table = None  # built lazily by utils.path_finder
+
+    def __deepcopy__(self, memo):
+        # Static and shared: simulators deep-copying a Game must not copy it
+        return self
+
+    def __reduce__(self):
+        # Pickled as its cache key: another process uses (or builds once) its own
+        return topology_for, (self.size, self.skeleton)
+
+    def _neighbours_of(self, index: int):
+        size = self.size
+        r, c = divmod(index, size)
+        candidates = []
+        if r > 0:
+            candidates.append(index - size)
+        if r < size - 1:
+            candidates.append(index + size)
+        if c > 0:
+            candidates.append(index - 1)
+        if c < size - 1:
+            candidates.append(index + 1)
+        return tuple(n for n in candidates if self.cells[n] != WALL)
+
+    def index(self, pos) -> int:
+        """(row, col) -> flat cell index."""
+        return pos[0] * self.size + pos[1]
+
+    def coords(self, index: int):
+        """Flat cell index -> (row, col)."""
+        return divmod(index, self.size)
+
+    def contains(self, pos) -> bool:
+        return 0 <= pos[0] < self.size and 0 <= pos[1] < self.size
+
+
+def skeleton_of(tiles: str) -> str:
+    """The tile string with heroes removed and every mine made neutral."""
+    return _OWNED_MINES.sub('$-', _HEROES.sub('  ', tiles))
+
+
+def topology_for(size: int, tiles: str) -> Topology:
+    """Return the shared `Topology` of the map described by `tiles`."""
+    key = (size, skeleton_of(tiles))
+    topology = _topologies.get(key)
+    if topology is None:
+        with _topologies_lock:
+            topology = _topologies.get(key)
+            if topology is None:
+                topology = Topology(size, key[1])
+                if len(_topologies) >= TOPOLOGY_CACHE_SIZE:
+                    # Drop the oldest layout
+                    del _topologies[next(iter(_topologies))]
+                _topologies[key] = topology
+    return topology
+
+
+class Board:
+    """Flat board: one byte per cell, indexed by ``row * size + col``."""
+
+    def __init__(self, topology: Topology, cells: bytearray, owners: bytearray, heroes: dict, spawns=None):
+        self.topology = topology
+        self.size = topology.size
+        self.cells = cells
+        self.owners = owners
+        self.walls = topology.walls
+        self.mines = topology.mines
+        self.taverns = topology.taverns
+        # Spawn cell indexes of the game, filled by Game once the heroes are known
+        self.spawns = set() if spawns is None else spawns
+        self.heroes = heroes  # hero id -> cell index
+
+    @classmethod
+    def from_tiles(cls, size: int, tiles: str, spawns=None) -> "Board":
+        """Build a board from the server ``tiles`` string; `spawns` is the game's spawn index set."""
+        topology = topology_for(size, tiles)
+        cells = bytearray(topology.cells)
+        owners = bytearray(len(cells))
+        heroes = {}
+        for match in _HEROES.finditer(tiles):
+            index = match.start() // 2
+            hero_id = int(match.group(1))
+            cells[index] = HERO
+            owners[index] = hero_id
+            heroes[hero_id] = index
+        for match in _OWNED_MINES.finditer(tiles):
+            owners[match.start() // 2] = int(match.group(1))
+        return cls(topology, cells, owners, heroes, spawns)
+
+    def index(self, pos) -> int:
+        """(row, col) -> flat cell index."""
+        return pos[0] * self.size + pos[1]
+
+    def coords(self, index: int):
+        """Flat cell index -> (row, col)."""
+        return divmod(index, self.size)
+
+    def char_at(self, pos) -> str:
+        return chr(self.cells[pos[0] * self.size + pos[1]])
+
+    def mine_owner(self, index: int):
+        """Owner id of the mine at `index`, or None if neutral."""
+        return self.owners[index] or None
+
+    def owned_mines(self):
+        """Mine index -> owner id, for owned mines only."""
+        owners = self.owners
+        return {i: owners[i] for i in self.mines if owners[i]}
+
+    def rows(self, hero_id: int | None = None):
+        """Legacy list-of-strings view; `hero_id`'s own cell is drawn as '@'."""
+        rows = list(self.topology.rows)
+        size = self.size
+        for other_id, index in self.heroes.items():
+            r, c = divmod(index, size)
+            char = '@' if other_id == hero_id else 'H'
+            rows[r] = rows[r][:c] + char + rows[r][c + 1:]
+        return rows
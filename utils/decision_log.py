@@ -0,0 +1,177 @@
+"""
+Buffered sink for the AIs' per-turn decision rows.
+
+`AIBase._package` used to open, append to and close ``moves_log/<AI>_<game>.csv``
+on every move. Rows now go to an in-memory buffer, written by a background
+thread every `flush_interval` seconds, when the buffer gets big, at game end
+(`flush()`) and at exit, so a move only costs a list append.
+
+Files are the same CSVs as before, one per AI and game, optionally
+gzip-compressed (``.csv.gz``, readable with ``gzip.open``). A file growing
+past `max_bytes` is rotated like `logging.handlers.RotatingFileHandler` does:
+``x.csv`` becomes ``x.csv.1``, ``x.csv.1`` becomes ``x.csv.2``, and so on, up
+to `backups` files.
+
+The process-wide log is `shared_log()`; `configure()` replaces it, e.g.
+``configure(enabled=False)`` to log nothing at all. Single AIs are silenced
+with their `log_decisions` attribute.
+"""
+
+import atexit
+import csv
+import gzip
+import io
+import os
+import threading
+
+from utils import log
+
+HEADER = ['timestamp', 'turn', 'decision', 'move', 'gold', 'life', 'number_of_mines']
+DEFAULT_DIRECTORY = 'moves_log'
+
+
+class DecisionLog:
+    """Decision rows buffered per file, written in batches off the decision path."""
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, flush_interval=1.0, max_rows=10000, max_bytes=10_000_000,
+                 backups=3, compress=False, enabled=True):
+        self.directory = directory
+        self.flush_interval = flush_interval  # seconds between background flushes
+        self.max_rows = max_rows  # buffered rows that trigger a flush
+        self.max_bytes = max_bytes  # size a file is rotated at, None: never
+        self.backups = backups  # rotated files kept
+        self.compress = compress
+        self.enabled = enabled
+        self._buffer = {}  # file name -> rows
+        self._rows = 0
+        self._lock = threading.Lock()  # guards the buffer
+        self._write_lock = threading.Lock()  # one flush at a time
+        self._wake = threading.Event()
+        self._thread = None
+        self._closed = False
+
+    def file_name(self, name, game_id):
+        extension = '.csv.gz' if self.compress else '.csv'
+        return os.path.join(self.directory, f"{name}_{game_id}{extension}")
+
+    def write(self, name, game_id, row):
+        """Buffer a row of AI `name` for game `game_id`."""
+        if not self.enabled or self._closed:
+            return
+        file_name = self.file_name(name, game_id)
+        with self._lock:
+            rows = self._buffer.get(file_name)
+            if rows is None:
+                rows = self._buffer[file_name] = []
+            rows.append(row)
+            self._rows += 1
+            full = self._rows >= self.max_rows
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Write every buffered row now."""
+        with self._write_lock:
+            with self._lock:
+                buffer, self._buffer, self._rows = self._buffer, {}, 0
+            if not buffer:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            for file_name, rows in buffer.items():
+                self._append(file_name, rows)
+
+    def close(self):
+        """Flush and stop the background thread; later rows are dropped."""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="decision-log", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep flushing later rows: a dead thread would leave them buffered until exit
+                log.get_logger('decision_log').warning("Decision rows not written: %r", e)
+
+    def _append(self, file_name, rows):
+        text = io.StringIO()
+        writer = csv.writer(text)
+        if not os.path.exists(file_name):
+            writer.writerow(HEADER)
+        writer.writerows(rows)
+        if self.compress:
+            with gzip.open(file_name, 'at', newline='') as f:
+                f.write(text.getvalue())
+        else:
+            with open(file_name, 'a', newline='') as f:
+                f.write(text.getvalue())
+        if self.max_bytes is not None and os.path.getsize(file_name) >= self.max_bytes:
+            self._rotate(file_name)
+
+    def _rotate(self, file_name):
+        if self.backups <= 0:
+            os.remove(file_name)
+            return
+        for n in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{file_name}.{n}"):
+                os.replace(f"{file_name}.{n}", f"{file_name}.{n + 1}")
+        os.replace(file_name, f"{file_name}.1")
+
+    def _after_fork(self):
+        # The child has its own copy of the buffer, and no flushing thread
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._buffer, self._rows = {}, 0
+        self._thread = None
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_log() -> DecisionLog:
+    """The process-wide decision log, writing to ``moves_log/`` unless `configure`d otherwise."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = DecisionLog()
+        return _shared
+
+
+def configure(**settings) -> DecisionLog:
+    """Replace the process-wide log by a `DecisionLog(**settings)`, flushing the old one."""
+    global _shared
+    with _shared_lock:
+        old, _shared = _shared, DecisionLog(**settings)
+    if old is not None:
+        old.close()
+    return _shared
+
+
+def flush():
+    """Write the rows buffered by the process-wide log, e.g. at game end."""
+    if _shared is not None:
+        _shared.flush()
+
+
+def _after_fork_in_child():
+    global _shared_lock
+    _shared_lock = threading.Lock()
+    if _shared is not None:
+        _shared._after_fork()
+
+
+atexit.register(flush)
+os.register_at_fork(after_in_child=_after_fork_in_child)
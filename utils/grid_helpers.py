@@ -52,15 +52,20 @@ def replace_map_values(map_grid, replacements, new_char):
     rows = len(map_grid)
     cols = len(map_grid[0]) if rows > 0 else 0
 
-    # Convert the list of strings to a mutable list of lists of characters
-    mutable_grid = [list(row) for row in map_grid]
+    # Only the rows that are actually touched are rebuilt, each one once
+    changed_rows = {}
 
     for r, c in replacements:
         # Validate coordinates
         if 0 <= r < rows and 0 <= c < cols:
-            mutable_grid[r][c] = new_char
+            row = changed_rows.get(r)
+            if row is None:
+                row = changed_rows[r] = list(map_grid[r])
+            row[c] = new_char
         else:
             print(f"Warning: Coordinates ({r}, {c}) are out of bounds for the map. Skipping replacement '{new_char}'.")
 
-    # Convert the mutable grid back to a list of strings
-    return ["".join(row) for row in mutable_grid]
+    new_grid = list(map_grid)
+    for r, row in changed_rows.items():
+        new_grid[r] = "".join(row)
+    return new_grid
@@ -0,0 +1,344 @@
+"""
+In-process Vindinium server, for self-play without docker, MongoDB or HTTP.
+
+`LocalServer` answers the same three endpoints as the real server, with the
+same JSON states, so clients and `game.Game` can't tell the difference:
+
+* ``/api/training`` (``key``, ``turns``, ``map``): a game against three
+  random bots;
+* ``/api/arena`` (``key``): waits for four players and starts a game between
+  them;
+* ``/api/<game id>/<token>/play`` (``dir``): plays a move and waits for the
+  player's next turn.
+
+Rules are the simulator's (`utils.simulator`), maps come from
+`utils.map_generator`. The official maps aren't shipped: ``m1`` to ``m6`` are
+generated stand-ins of the standard sizes, the same for every game. As on the
+real server, ``turns`` counts each hero's moves (``maxTurns`` is four times
+it), and with `move_timeout` set a player that doesn't move in time is marked
+crashed and stays put for the rest of the game. Unknown directions are
+played as "Stay".
+
+A crashed player's token is forgotten at once, and a game with it once it
+has no players left. Players silent for `abandon_timeout` (disconnected
+clients) are crashed when the next game starts, and finished games whose
+last players never fetched the final state are dropped.
+
+Clients reach it with the ``local://`` server url (see `BasicClient`), or
+through `session()` (blocking, `requests`-like) and `AsyncLocalTransport`
+(for `clients.async_client.AsyncTournament`).
+"""
+
+import asyncio
+import concurrent.futures
+import random
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit
+
+from game import Game
+from utils.map_generator import STANDARD_SIZES, generate_map
+from utils.simulator import DIRECTIONS, HERO_IDS, SimState
+
+LOCAL_URL = "local://vindinium"
+ARENA_TURNS = 300
+ABANDON_TIMEOUT = 300  # seconds a player may stay silent before its game is given up
+
+# Stand-ins for the official maps: name -> board size
+MAPS = {f"m{i}": size for i, size in enumerate(STANDARD_SIZES, start=1)}
+
+
+class LocalServerError(Exception):
+    """A request the real server would refuse, with its HTTP status."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class LocalGame:
+    """
+    One game: the simulator state plus who plays each hero.
+
+    Heroes not in `players` (the hero ids played by clients) are played by
+    the server, with random moves; so are crashed heroes, with "Stay".
+    """
+
+    def __init__(self, game_id, board, spawns, max_turns, names, players, rng):
+        self.id = game_id
+        self.names = names  # hero id -> name
+        self.players = players  # hero ids played by clients
+        self.tokens = {}  # hero id -> token, for the players not crashed yet
+        self.crashed = set()
+        self.last_dirs = {}  # hero id -> last direction played
+        self.rng = rng
+        self.turn_started = time.monotonic()  # when the hero to move got its state
+        heroes = [{'id': hero_id, 'name': names[hero_id], 'pos': {'x': r, 'y': c}, 'spawnPos': {'x': r, 'y': c},
+                   'life': 100, 'gold': 0, 'mineCount': 0, 'crashed': False}
+                  for hero_id, (r, c) in sorted(spawns.items())]
+        state = {'game': {'id': game_id, 'turn': 0, 'maxTurns': max_turns, 'heroes': heroes, 'board': board,
+                          'finished': max_turns <= 0},
+                 'hero': heroes[0], 'token': None, 'viewUrl': None, 'playUrl': None}
+        self.sim = SimState.from_game(Game(state))
+        self._play_server_heroes()
+
+    @property
+    def finished(self):
+        return self.sim.finished
+
+    @property
+    def to_move(self):
+        return self.sim.to_move
+
+    def play(self, hero_id, direction):
+        """Play `hero_id`'s move, then the server's heroes until a player is to move."""
+        if self.finished or self.to_move != hero_id:
+            raise LocalServerError(f"Not hero {hero_id}'s turn")
+        self._make(hero_id, direction if direction in DIRECTIONS else "Stay")
+        self._play_server_heroes()
+
+    def crash(self, hero_id):
+        """`hero_id` stops playing: it stays put for the rest of the game."""
+        self.crashed.add(hero_id)
+        self._play_server_heroes()
+
+    def state_for(self, hero_id, token=None, url=LOCAL_URL):
+        """Server JSON state as sent to `hero_id`."""
+        state = self.sim.to_state(hero_id, self.names, self.id)
+        for hero in state['game']['heroes']:
+            hero['crashed'] = hero['id'] in self.crashed
+            if hero['id'] in self.last_dirs:
+                hero['lastDir'] = self.last_dirs[hero['id']]
+        state['token'] = token
+        state['viewUrl'] = f"{url}/{self.id}"
+        state['playUrl'] = f"{url}/api/{self.id}/{token}/play"
+        return state
+
+    def _make(self, hero_id, direction):
+        self.sim.make(hero_id, direction)
+        self.last_dirs[hero_id] = direction
+        self.turn_started = time.monotonic()
+
+    def _play_server_heroes(self):
+        sim = self.sim
+        while not sim.finished:
+            hero_id = sim.to_move
+            if hero_id in self.crashed:
+                self._make(hero_id, "Stay")
+            elif hero_id not in self.players:
+                self._make(hero_id, self.rng.choice(sim.legal_moves(hero_id)))
+            else:
+                break
+
+
+class LocalServer:
+    """Thread-safe in-process server; requests block like HTTP ones until the player's turn."""
+
+    def __init__(self, seed=None, move_timeout=None, url=LOCAL_URL, abandon_timeout=ABANDON_TIMEOUT):
+        self.rng = random.Random(seed)
+        self.move_timeout = move_timeout  # seconds before a silent player is crashed, None: wait forever
+        self.abandon_timeout = abandon_timeout  # seconds before a silent game is given up, None: never
+        self.url = url
+        self.games = {}  # game id -> LocalGame, until all its players got the final state or crashed
+        self._tokens = {}  # token -> (game, hero id)
+        self._arena = []  # players waiting for an arena game: [key, token or None]
+        self._changed = threading.Condition()
+
+    # -- Endpoints ------------------------------------------------------------------
+
+    def post(self, url, data=None, timeout=None):
+        """Answer a POST to `url` like the real server; raises `LocalServerError`."""
+        data = data or {}
+        parts = urlsplit(url).path.strip('/').split('/')
+        if parts[-2:] == ['api', 'training']:
+            return self.training(data.get('key'), int(data.get('turns', 300)), data.get('map'))
+        if parts[-2:] == ['api', 'arena']:
+            return self.arena(data.get('key'), timeout)
+        if len(parts) >= 4 and parts[-4] == 'api' and parts[-1] == 'play':
+            return self.play(parts[-2], data.get('dir'), timeout)
+        raise LocalServerError(f"Not found: {url}", status=404)
+
+    def training(self, key, turns=300, map_name=None):
+        """Start a game against three random bots."""
+        with self._changed:
+            self._sweep()
+            hero_id = self.rng.choice(HERO_IDS)
+            names = {other: "random" for other in HERO_IDS}
+            names[hero_id] = key or "player"
+            game = self._new_game(turns, map_name, names, {hero_id})
+            token = self._token(game, hero_id)
+            return game.state_for(hero_id, token, self.url)
+
+    def arena(self, key, timeout=None):
+        """Join the arena, wait for three more players and start a game."""
+        with self._changed:
+            self._sweep()
+            seat = [key, None]
+            self._arena.append(seat)
+            if len(self._arena) >= len(HERO_IDS):
+                self._start_arena_game()
+            if not self._wait(lambda: seat[1] is not None, timeout):
+                self._arena.remove(seat)
+                raise LocalServerError("Timeout waiting for the arena to fill up", status=408)
+            game, hero_id = self._tokens[seat[1]]
+            self._wait_turn(game, hero_id, timeout)
+            return game.state_for(hero_id, seat[1], self.url)
+
+    def play(self, token, direction, timeout=None):
+        """Play a move, wait for the player's next turn and return its state."""
+        with self._changed:
+            if token not in self._tokens:
+                raise LocalServerError(f"Unknown token: {token}", status=404)
+            game, hero_id = self._tokens[token]
+            game.play(hero_id, direction)
+            self._changed.notify_all()
+            self._wait_turn(game, hero_id, timeout)
+            state = game.state_for(hero_id, token, self.url)
+            if game.finished:
+                self._release(token)
+            return state
+
+    def session(self):
+        """`requests.Session`-like view of this server, for `BasicClient`."""
+        return LocalSession(self)
+
+    # -- Internals --------------------------------------------------------------------
+
+    def _new_game(self, turns, map_name, names, players):
+        if map_name in MAPS:
+            # Same map for every game, as on the real server
+            board, spawns = generate_map(MAPS[map_name], seed=zlib.crc32(map_name.encode()))
+        else:
+            board, spawns = generate_map(self.rng.choice(STANDARD_SIZES), seed=self.rng.getrandbits(32))
+        game_id = self._id()
+        game = LocalGame(game_id, board, spawns, 4 * turns, names, players, random.Random(self.rng.getrandbits(32)))
+        self.games[game_id] = game
+        return game
+
+    def _start_arena_game(self):
+        seats = self._arena[:len(HERO_IDS)]
+        del self._arena[:len(HERO_IDS)]
+        self.rng.shuffle(seats)
+        names = {hero_id: seat[0] or "player" for hero_id, seat in zip(HERO_IDS, seats)}
+        game = self._new_game(ARENA_TURNS, None, names, set(HERO_IDS))
+        for hero_id, seat in zip(HERO_IDS, seats):
+            seat[1] = self._token(game, hero_id)
+        self._changed.notify_all()
+
+    def _token(self, game, hero_id):
+        token = self._id()
+        self._tokens[token] = (game, hero_id)
+        game.tokens[hero_id] = token
+        return token
+
+    def _release(self, token):
+        """Forget a token, and its game with the last one."""
+        game, hero_id = self._tokens.pop(token)
+        del game.tokens[hero_id]
+        if not game.tokens:
+            # Without players the game is over: crashed heroes have played it out
+            del self.games[game.id]
+
+    def _crash(self, game, hero_id):
+        """Crash a silent player and forget its token."""
+        game.crash(hero_id)
+        self._release(game.tokens[hero_id])
+        self._changed.notify_all()
+
+    def _sweep(self):
+        """Give up on the players silent for `abandon_timeout`, e.g. disconnected clients."""
+        if self.abandon_timeout is None:
+            return
+        now = time.monotonic()
+        for game in list(self.games.values()):
+            if now - game.turn_started <= self.abandon_timeout:
+                continue
+            if game.finished:
+                # Its last players never came back for the final state
+                for token in list(game.tokens.values()):
+                    self._release(token)
+            else:
+                self._crash(game, game.to_move)
+
+    def _id(self):
+        return "".join(self.rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(8))
+
+    def _wait_turn(self, game, hero_id, timeout):
+        """Wait (lock held) until `hero_id` is to move or the game is over, crashing silent players."""
+        def ready():
+            if not game.finished and game.to_move != hero_id and self.move_timeout is not None:
+                if time.monotonic() - game.turn_started > self.move_timeout:
+                    self._crash(game, game.to_move)
+            return game.finished or game.to_move == hero_id
+
+        if not self._wait(ready, timeout):
+            raise LocalServerError("Timeout waiting for the other players", status=408)
+
+    def _wait(self, predicate, timeout):
+        # Wake up regularly to check the move timeout of the other players
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not predicate():
+            left = None if deadline is None else deadline - time.monotonic()
+            if left is not None and left <= 0:
+                return False
+            step = self.move_timeout if self.move_timeout is not None else left
+            self._changed.wait(step if left is None else min(step, left))
+        return True
+
+
+class LocalResponse:
+    """The bits of `requests.Response` the clients use."""
+
+    def __init__(self, status_code, payload=None, text=""):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = text
+
+    def json(self):
+        return self._payload
+
+
+class LocalSession:
+    """`requests.Session` stand-in posting to a `LocalServer`."""
+
+    def __init__(self, server):
+        self.server = server
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        try:
+            return LocalResponse(200, self.server.post(url, data, timeout))
+        except LocalServerError as e:
+            return LocalResponse(e.status, text=str(e))
+
+    def close(self):
+        pass
+
+
+class AsyncLocalTransport:
+    """`LocalServer` as the transport of `clients.async_client.AsyncTournament`."""
+
+    def __init__(self, server=None, threads=64):
+        self.server = server or LocalServer()
+        # Requests block until the player's turn: one thread per request in flight
+        self._executor = concurrent.futures.ThreadPoolExecutor(threads, thread_name_prefix="local-server")
+
+    async def post(self, url, data, timeout=None):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.server.post, url, data,
+                                                                timeout)
+
+    async def close(self):
+        self._executor.shutdown(wait=False)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_server():
+    """The process-wide server behind ``local://`` urls."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LocalServer()
+        return _shared
@@ -0,0 +1,159 @@
+"""
+Project-wide logging, kept off the decision path.
+
+Loggers live under ``vindinium``: `get_logger` for modules,
+`ai_logger` for an AI (``vindinium.ai.<AI name>``, so one chatty AI can be
+turned up or down on its own). Their records go through a queue to a
+listener thread that formats and writes them: logging never waits on the
+terminal, and lines of concurrent games and threads come out whole.
+
+Debug dumps (`dump`) are structured records of one event, e.g. the state of
+an AI that found no move. They are rate-limited per logger and event, built
+only when they are written, and go as JSON lines to ``logs/debug.jsonl``
+rather than the console.
+
+Logging is set up with defaults (INFO to stdout) the first time a logger is
+asked for; `setup` changes the levels and destinations::
+
+    log.setup(level=logging.DEBUG)
+    log.ai_logger("tactical_v4").setLevel(logging.WARNING)
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+ROOT = "vindinium"
+DUMP_FILE = os.path.join('logs', 'debug.jsonl')
+DUMP_INTERVAL = 60.0  # seconds between two dumps of the same event by the same logger
+
+_listener = None
+_settings = ()
+_lock = threading.Lock()
+_last_dumps = {}  # (logger name, event) -> time.monotonic() of the last dump
+
+
+def _is_dump(record):
+    return hasattr(record, 'dump')
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {'time': self.formatTime(record), 'logger': record.name, 'event': record.getMessage()}
+        data.update(record.dump)
+        return json.dumps(data, default=str)
+
+
+class _DumpFileHandler(logging.FileHandler):
+    """JSON lines file of the dumps, created with its directory on the first dump."""
+
+    def __init__(self, file_name):
+        super().__init__(file_name, delay=True)
+        self.setFormatter(_JsonFormatter())
+        self.addFilter(_is_dump)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+def setup(level=logging.INFO, stream=None, dump_file=DUMP_FILE, fmt="%(name)s: %(message)s"):
+    """
+    (Re)configure logging.
+
+    Args:
+        level: Level of the ``vindinium`` loggers.
+        stream: Where console records go, stdout by default.
+        dump_file: JSON lines file of the debug dumps, None to drop them.
+        fmt: `logging.Formatter` format of the console records.
+    """
+    with _lock:
+        _start(level, stream, dump_file, fmt)
+
+
+def _start(level=logging.INFO, stream=None, dump_file=DUMP_FILE, fmt="%(name)s: %(message)s"):
+    global _listener, _settings
+    if _listener is not None:
+        _listener.stop()
+    _settings = (level, stream, dump_file, fmt)
+
+    console = logging.StreamHandler(stream or sys.stdout)
+    console.setFormatter(logging.Formatter(fmt))
+    console.addFilter(lambda record: not _is_dump(record))
+    handlers = [console]
+    if dump_file:
+        handlers.append(_DumpFileHandler(dump_file))
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger(ROOT)
+    root.setLevel(level)
+    root.propagate = False
+    root.handlers = [logging.handlers.QueueHandler(records)]
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown():
+    """Write the records still queued and stop the listener thread."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logger(name) -> logging.Logger:
+    """Logger ``vindinium.<name>``."""
+    if _listener is None:
+        with _lock:
+            if _listener is None:
+                _start(*_settings)
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+def ai_logger(ai_name) -> logging.Logger:
+    return get_logger(f"ai.{ai_name}")
+
+
+def dump(logger, event, fields, every=DUMP_INTERVAL):
+    """
+    Write a structured DEBUG record of `event`, at most once every `every` seconds per logger and event.
+
+    `fields` is a dict, or a function returning one: it is only called when
+    the record is written, so expensive dumps cost nothing the rest of the time.
+
+    Returns:
+        bool: True if the record was written.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    key = (logger.name, event)
+    now = time.monotonic()
+    with _lock:
+        last = _last_dumps.get(key)
+        if last is not None and now - last < every:
+            return False
+        _last_dumps[key] = now
+    if callable(fields):
+        fields = fields()
+    logger.debug(event, extra={'dump': fields})
+    return True
+
+
+def _after_fork_in_child():
+    # The listener thread isn't copied: start the child's own
+    global _listener, _lock
+    _lock = threading.Lock()
+    if _listener is not None:
+        _listener = None
+        _start(*_settings)
+
+
+atexit.register(shutdown)
+os.register_at_fork(after_in_child=_after_fork_in_child)
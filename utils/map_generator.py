@@ -0,0 +1,111 @@
+"""
+Seeded Vindinium-like map generator.
+
+Maps are built the way the official server does it: one random quadrant is
+mirrored horizontally and vertically, so all four spawn points are fair.
+Every spawn, mine and tavern is guaranteed to be reachable; air pockets that
+can't be reached are walled up.
+
+The result uses the server ``board`` shape (``{'size': .., 'tiles': ..}``),
+with the four heroes standing on their spawn points.
+"""
+
+import collections
+import random
+
+# Board sizes used by the standard server maps, smallest to tournament size
+STANDARD_SIZES = (10, 12, 14, 18, 24, 28)
+
+
+def generate_map(size=18, seed=None, wall_percent=25, mine_percent=5, max_tries=100):
+    """
+    Generate a random mirrored map.
+
+    Args:
+        size (int): Board width/height, an even number >= 6.
+        seed: Seed for the random generator, the same seed gives the same map.
+        wall_percent (int): Approximate percentage of wall tiles.
+        mine_percent (int): Approximate percentage of mine tiles.
+        max_tries (int): How many quadrants to draw before giving up.
+
+    Returns:
+        tuple: ``(board, spawns)`` where `board` is a server-shaped board dict
+               and `spawns` maps hero id (1-4) to its (row, col) spawn point.
+    """
+    if size < 6 or size % 2:
+        raise ValueError(f"Map size must be an even number >= 6, got {size}")
+    rng = random.Random(seed)
+    half = size // 2
+    for _ in range(max_tries):
+        quadrant = [[' '] * half for _ in range(half)]
+        for r in range(half):
+            for c in range(half):
+                roll = rng.randrange(100)
+                if roll < wall_percent:
+                    quadrant[r][c] = '#'
+                elif roll < wall_percent + mine_percent:
+                    quadrant[r][c] = '$'
+        cells = [(r, c) for r in range(1, half) for c in range(1, half)]
+        spawn, tavern = rng.sample(cells, 2)
+        quadrant[spawn[0]][spawn[1]] = '@'
+        quadrant[tavern[0]][tavern[1]] = 'T'
+        grid = _mirror(quadrant)
+        if _make_connected(grid, (spawn[0], spawn[1])):
+            return _to_board(grid), _spawns(grid)
+    raise RuntimeError(f"Could not generate a connected {size}x{size} map in {max_tries} tries")
+
+
+def _mirror(quadrant):
+    half = len(quadrant)
+    rows = [row + row[::-1] for row in quadrant]
+    rows = rows + [list(row) for row in rows[::-1]]
+    size = 2 * half
+    # Each spawn copy belongs to a different hero: 1 top-left, 2 top-right,
+    # 3 bottom-right, 4 bottom-left
+    for r in range(size):
+        for c in range(size):
+            if rows[r][c] == '@':
+                top, left = r < half, c < half
+                rows[r][c] = '1' if top and left else '2' if top else '3' if not left else '4'
+    return rows
+
+
+def _make_connected(grid, start):
+    """Wall up unreachable air; False if a spawn, mine or tavern is cut off."""
+    size = len(grid)
+    reached = {start}
+    queue = collections.deque([start])
+    while queue:
+        r, c = queue.popleft()
+        for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+            if 0 <= nr < size and 0 <= nc < size and (nr, nc) not in reached:
+                if grid[nr][nc] in ' 1234':
+                    reached.add((nr, nc))
+                    queue.append((nr, nc))
+    for r in range(size):
+        for c in range(size):
+            char = grid[r][c]
+            if char in ' 1234' and (r, c) not in reached:
+                if char != ' ':
+                    return False
+                grid[r][c] = '#'
+            elif char in '$T':
+                touching = ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+                if not any(n in reached for n in touching):
+                    return False
+    return True
+
+
+def _to_board(grid):
+    tiles = {' ': '  ', '#': '##', '$': '$-', 'T': '[]'}
+    return {
+        'size': len(grid),
+        'tiles': "".join(tiles.get(char, '@' + char) for row in grid for char in row),
+    }
+
+
+def _spawns(grid):
+    return dict(sorted((int(char), (r, c))
+                       for r, row in enumerate(grid)
+                       for c, char in enumerate(row)
+                       if char in '1234'))
@@ -0,0 +1,107 @@
+"""
+Root-parallel search across processes.
+
+Search AIs are pure Python and bound by the GIL, but their root candidates
+(first actions, first moves) can be scored independently. A `SearchPool`
+scores them in a `ProcessPoolExecutor`, each task running one AI method on one
+candidate against a copy of the AI and its game. The AI is pickled once per
+call, and each worker unpickles it once per call, whatever the number of
+candidates it scores.
+
+Workers are started by a fork server (``spawn`` where there is none), never
+forked from the caller: searches run in `AIBase.decide_by`'s watchdog thread
+while the logging and decision log threads hold their locks.
+
+Workers stay warm between turns: they are started once, and the static part
+of the map (`utils.board.Topology`) is pickled as its cache key, so each
+worker builds it (and its distance table) once per map and then reuses its
+own copy for every later turn.
+
+It is opt-in, per AI::
+
+    ai.search_pool = SearchPool(workers=8)
+
+Candidates whose result isn't back `timeout` seconds after the call are
+reported as None; the worker still finishes them, so search methods run in
+workers must bound their own time. Candidates whose method raised are None
+too: the error is logged, and raised if every candidate failed.
+"""
+
+import concurrent.futures
+import multiprocessing
+import os
+import pickle
+
+from utils import log
+
+_current = None  # (call, AI) of the last call this worker scored candidates for
+
+
+def _call(call, payload, method, candidate):
+    global _current
+    if _current is None or _current[0] != call:
+        _current = (call, pickle.loads(payload))
+    return getattr(_current[1], method)(candidate)
+
+
+def _ready(_):
+    return os.getpid()
+
+
+class SearchPool:
+    """Pool of warm worker processes scoring root candidates in parallel."""
+
+    def __init__(self, workers=None, timeout=0.8):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout  # seconds to wait for the results of a call
+        self.timeouts = 0  # candidates not scored in time
+        self.failures = 0  # candidates whose method raised
+        self._calls = 0
+        self._executor = None
+
+    def start(self):
+        """Start the workers now rather than on the first call."""
+        if self._executor is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+            list(self._executor.map(_ready, range(self.workers)))
+        return self
+
+    def map(self, ai, method, candidates, timeout=None):
+        """`[ai.<method>(c) for c in candidates]` in the workers; None for late or failed ones."""
+        self.start()
+        self._calls += 1
+        payload = pickle.dumps(ai, protocol=pickle.HIGHEST_PROTOCOL)
+        futures = [self._executor.submit(_call, self._calls, payload, method, candidate) for candidate in candidates]
+        concurrent.futures.wait(futures, timeout=self.timeout if timeout is None else timeout)
+        results = []
+        errors = []
+        for future, candidate in zip(futures, candidates):
+            if not future.done() or future.cancelled():
+                future.cancel()
+                self.timeouts += 1
+                results.append(None)
+            elif future.exception() is not None:
+                error = future.exception()
+                errors.append(error)
+                self.failures += 1
+                log.get_logger("parallel_search").warning("%s.%s(%r) failed in a worker: %r",
+                                                          type(ai).__name__, method, candidate, error)
+                results.append(None)
+            else:
+                results.append(future.result())
+        if errors and len(errors) == len(futures):
+            raise errors[0]
+        return results
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
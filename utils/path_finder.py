@@ -1,7 +1,76 @@
 import collections
+import threading
+from array import array
+
+from utils import log
 
 NOT_FOUND = [], float('inf')
 DEFAULT_WALKABLE_CHARS = {' ', "X"}
+
+
+def _parent_pointer_bfs(grid, start_pos, walkable, target_pos=None, end_char=None):
+    """
+    BFS engine shared by the `bfs_*` functions.
+
+    Cells are numbered ``row * cols + col`` and each visited cell only records
+    its predecessor in a flat list; the path is rebuilt once, on success.
+    Neighbours are explored Up, Down, Left, Right, so the path found is the
+    same one the previous copy-the-path-per-node implementation returned.
+
+    The search stops on `target_pos` or on the first cell holding `end_char`.
+    Those cells can always be stepped into; any other cell must hold one of
+    the `walkable` characters.
+    """
+    rows, cols = len(grid), len(grid[0])
+    flat = "".join(grid)
+    size = rows * cols
+    start = start_pos[0] * cols + start_pos[1]
+    target = target_pos[0] * cols + target_pos[1] if target_pos is not None else -1
+    last_row = size - cols
+    last_col = cols - 1
+
+    parents = [-1] * size
+    parents[start] = start
+
+    def path_to(cell):
+        path = [divmod(cell, cols)]
+        while cell != start:
+            cell = parents[cell]
+            path.append(divmod(cell, cols))
+        path.reverse()
+        return path, len(path) - 1
+
+    if start == target or flat[start] == end_char:
+        return path_to(start)
+
+    queue = [start]
+    # The list grows while it is iterated: that's the FIFO. Cells are
+    # dequeued in the order they are enqueued, so the first goal cell to be
+    # enqueued is the one the search would have stopped on.
+    for current in queue:
+        col = current % cols
+        neighbours = []
+        if current >= cols:
+            neighbours.append(current - cols)  # Up
+        if current < last_row:
+            neighbours.append(current + cols)  # Down
+        if col > 0:
+            neighbours.append(current - 1)  # Left
+        if col < last_col:
+            neighbours.append(current + 1)  # Right
+        for neighbour in neighbours:
+            if parents[neighbour] == -1:
+                char = flat[neighbour]
+                if neighbour == target or char == end_char:
+                    parents[neighbour] = current
+                    return path_to(neighbour)
+                if char in walkable:
+                    parents[neighbour] = current
+                    queue.append(neighbour)
+
+    return NOT_FOUND  # No path found
+
+
 def bfs_from_xy_to_xy(grid, start_pos, target_pos, walkable_chars={' '}):
     """
     Core BFS function to find the shortest path in a grid to a specific coordinate.
@@ -15,70 +84,27 @@ def bfs_from_xy_to_xy(grid, start_pos, target_pos, walkable_chars={' '}):
 
     Returns:
         tuple: A tuple containing the path (list of coordinates) and its length.
-               Returns (None, 0) if no path is found.
+               Returns NOT_FOUND if no path is found.
     """
     rows, cols = len(grid), len(grid[0])
-    ALL_WALKABLE_CHARS = DEFAULT_WALKABLE_CHARS.union(walkable_chars)
     # Validate start and target positions
     if not rows or not cols:
         return NOT_FOUND
     if not (0 <= start_pos[0] < rows and 0 <= start_pos[1] < cols):
-        print(f"Error: Start position {start_pos} is out of map bounds.")
+        log.get_logger("path_finder").warning("Start position %s is out of map bounds.", start_pos)
         return NOT_FOUND
     if not (0 <= target_pos[0] < rows and 0 <= target_pos[1] < cols):
-        print(f"Error: Target position {target_pos} is out of map bounds.")
+        log.get_logger("path_finder").warning("Target position %s is out of map bounds.", target_pos)
         return NOT_FOUND
 
-    # Ensure the target position itself is not a hard obstacle (like '#')
-    # If the target is an obstacle, it's unreachable
-    if grid[target_pos[0]][target_pos[1]] not in ALL_WALKABLE_CHARS:
-        # If target character is not in walkable_chars and it's not a space, it's likely an obstacle
-        # unless it's a specific end character we define (like 'X' or 'H' if we could walk *on* them).
-        # For a specific coordinate, we assume we can step *on* it if it's not a wall.
-        # Let's consider '#' always an obstacle for target position.
-        if grid[target_pos[0]][target_pos[1]] == '#':
-            print(f"Error: Target position {target_pos} contains an impassable obstacle ('#').")
-            return NOT_FOUND
-
-    queue = collections.deque([(start_pos, [start_pos])])
-    visited = {start_pos}
-
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Up, Down, Left, Right
-
-    while queue:
-        (r, c), path = queue.popleft()
-
-        # If the current cell is the target coordinate
-        if (r, c) == target_pos:
-            return path, len(path) - 1
-
-        # Explore neighbors
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-
-            # Check boundaries
-            if not (0 <= nr < rows and 0 <= nc < cols):
-                continue
-
-            neighbor_char = grid[nr][nc]
-
-            # Check if the neighbor is walkable. The target itself is handled by the "if (r,c) == target_pos" above.
-            # We must *not* include characters that are impassable walls (like '#').
-            # We assume anything *not* in walkable_chars, and not the target, is an obstacle.
-            is_valid_move = (neighbor_char in ALL_WALKABLE_CHARS)
-
-            # The target itself can be moved onto, so we explicitly allow moving onto the target coordinate.
-            if (nr, nc) == target_pos:
-                is_valid_move = True
-
-            # Check if not visited and is a valid move
-            if is_valid_move and (nr, nc) not in visited:
-                visited.add((nr, nc))
-                new_path = list(path)
-                new_path.append((nr, nc))
-                queue.append(((nr, nc), new_path))
+    # If the target is an obstacle ('#'), it's unreachable
+    if grid[target_pos[0]][target_pos[1]] == '#':
+        log.get_logger("path_finder").debug("Target position %s contains an impassable obstacle ('#').",
+                                            target_pos)
+        return NOT_FOUND
 
-    return NOT_FOUND  # No path found
+    return _parent_pointer_bfs(grid, start_pos, DEFAULT_WALKABLE_CHARS.union(walkable_chars),
+                               target_pos=tuple(target_pos))
 
 
 def bfs_from_xy_to_nearest_char(grid, start_pos, end_char, walkable_chars={' '}):
@@ -95,7 +121,7 @@ def bfs_from_xy_to_nearest_char(grid, start_pos, end_char, walkable_chars={' '})
 
     Returns:
         tuple: A tuple containing the path (list of coordinates) and its length.
-               Returns (None, 0) if no path is found.
+               Returns NOT_FOUND if no path is found.
     """
     rows, cols = len(grid), len(grid[0])
 
@@ -103,41 +129,8 @@ def bfs_from_xy_to_nearest_char(grid, start_pos, end_char, walkable_chars={' '})
     if not rows or not cols or not (0 <= start_pos[0] < rows and 0 <= start_pos[1] < cols):
         return NOT_FOUND
 
-    queue = collections.deque([(start_pos, [start_pos])])
-    visited = {start_pos}
-
-    # Define possible moves (Up, Down, Left, Right)
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    ALL_WALKABLE_CHARS = DEFAULT_WALKABLE_CHARS.union(walkable_chars)
-
-    while queue:
-        (r, c), path = queue.popleft()
-
-        # If the current cell is the destination character, we've found the path
-        if grid[r][c] == end_char:
-            return path, len(path) - 1  # Path includes start, so subtract 1 for steps
-
-        # Explore neighbors
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-
-            # Check boundaries
-            if not (0 <= nr < rows and 0 <= nc < cols):
-                continue
-
-            neighbor_char = grid[nr][nc]
-
-            # Check if the neighbor is generally walkable OR if it's the specific end_char
-            is_valid_move = (neighbor_char in ALL_WALKABLE_CHARS) or (neighbor_char == end_char)
-
-            # Check if not visited
-            if is_valid_move and (nr, nc) not in visited:
-                visited.add((nr, nc))
-                new_path = list(path)  # Create a new list for each path branch
-                new_path.append((nr, nc))
-                queue.append(((nr, nc), new_path))
-
-    return NOT_FOUND  # No path found
+    return _parent_pointer_bfs(grid, start_pos, DEFAULT_WALKABLE_CHARS.union(walkable_chars),
+                               end_char=end_char)
 
 
 def bfs_from_char_to_nearest_char(grid,
@@ -171,8 +164,352 @@ def bfs_from_char_to_nearest_char(grid,
             break
 
     if not start_pos:
-        print(f"Error: Start character '{start_char}' not found.")
+        log.get_logger("path_finder").debug("Start character '%s' not found.", start_char)
         return NOT_FOUND
 
     # Call the new core BFS function
     return bfs_from_xy_to_nearest_char(grid, start_pos, end_char, walkable)
+
+
+
+
+def distance_field(grid, start_pos, walkable_chars={' '}):
+    """
+    Single BFS sweep from `start_pos` over the whole grid.
+
+    One sweep answers every "how far / which way" question the hero has for
+    the turn: the nearest mine, tavern or enemy, and the distance or path to
+    any cell. Paths are the ones `bfs_from_xy_to_xy` and
+    `bfs_from_xy_to_nearest_char` would return for the same start.
+
+    Args:
+        grid (list of str): The map represented as a list of strings.
+        start_pos (tuple): The (row, col) coordinates of the starting position.
+        walkable_chars (set): A set of characters that represent terrain the hero can walk over.
+
+    Returns:
+        DistanceField: The result of the sweep.
+    """
+    return DistanceField(grid, start_pos, DEFAULT_WALKABLE_CHARS.union(walkable_chars))
+
+
+class DistanceField:
+    """
+    Distances and predecessors of every cell reachable from one start.
+
+    Walkable cells are expanded; any other cell but walls is a leaf that can
+    be stepped into (a mine, a tavern, a hero...) but not walked through.
+    """
+
+    def __init__(self, grid, start_pos, walkable):
+        self.start_pos = tuple(start_pos)
+        self.rows, self.cols = rows, cols = len(grid), len(grid[0]) if grid else 0
+        self._flat = flat = "".join(grid)
+        size = rows * cols
+        self._parents = parents = [-1] * size
+        self._distances = distances = [-1] * size
+        self._order = order = []
+        self._first = None
+        if not (0 <= start_pos[0] < rows and 0 <= start_pos[1] < cols):
+            return
+
+        start = start_pos[0] * cols + start_pos[1]
+        self._start = start
+        parents[start] = start
+        distances[start] = 0
+        order.append(start)
+        last_row = size - cols
+        last_col = cols - 1
+        for current in order:
+            if current != start and flat[current] not in walkable:
+                continue  # a leaf: it can be stepped into, not walked through
+            steps = distances[current] + 1
+            col = current % cols
+            neighbours = []
+            if current >= cols:
+                neighbours.append(current - cols)  # Up
+            if current < last_row:
+                neighbours.append(current + cols)  # Down
+            if col > 0:
+                neighbours.append(current - 1)  # Left
+            if col < last_col:
+                neighbours.append(current + 1)  # Right
+            for neighbour in neighbours:
+                if parents[neighbour] == -1 and flat[neighbour] != '#':
+                    parents[neighbour] = current
+                    distances[neighbour] = steps
+                    order.append(neighbour)
+
+    def _index(self, pos):
+        """Cell index of `pos`, -1 if it is off the map or a wall."""
+        if 0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols:
+            cell = pos[0] * self.cols + pos[1]
+            if self._flat[cell] != '#':
+                return cell
+        return -1
+
+    def _path(self, cell):
+        cols = self.cols
+        parents = self._parents
+        path = [divmod(cell, cols)]
+        while parents[cell] != cell:
+            cell = parents[cell]
+            path.append(divmod(cell, cols))
+        path.reverse()
+        return path, len(path) - 1
+
+    def distance(self, pos):
+        """Number of steps to `pos`, or ``float('inf')`` if unreachable."""
+        cell = self._index(pos)
+        if cell < 0 or self._distances[cell] < 0:
+            return float('inf')
+        return self._distances[cell]
+
+    def path_to(self, pos):
+        """
+        Shortest path to `pos`, the hero stepping into it.
+
+        Returns:
+            tuple: The path (list of coordinates) and its length, or NOT_FOUND.
+        """
+        cell = self._index(pos)
+        if cell < 0 or self._parents[cell] < 0:
+            return NOT_FOUND
+        return self._path(cell)
+
+    def nearest(self, end_char):
+        """
+        Shortest path to the nearest cell holding `end_char`.
+
+        Returns:
+            tuple: The path (list of coordinates) and its length, or NOT_FOUND.
+        """
+        if self._first is None:
+            # First cell of each kind, in BFS order
+            self._first = {}
+            flat = self._flat
+            for cell in self._order:
+                self._first.setdefault(flat[cell], cell)
+        cell = self._first.get(end_char)
+        if cell is None:
+            return NOT_FOUND
+        return self._path(cell)
+
+    def nearest_of(self, positions):
+        """
+        Shortest path to the nearest of `positions`.
+
+        Returns:
+            tuple: The path (list of coordinates) and its length, or NOT_FOUND.
+        """
+        best = None
+        for pos in positions:
+            cell = self._index(pos)
+            if cell >= 0 and self._distances[cell] >= 0:
+                if best is None or self._distances[cell] < self._distances[best]:
+                    best = cell
+        if best is None:
+            return NOT_FOUND
+        return self._path(best)
+
+# ---------------------------------------------------------------------------
+#  Precomputed all-pairs distances
+# ---------------------------------------------------------------------------
+
+UNREACHABLE = 0xFFFF
+_distance_table_lock = threading.Lock()
+
+
+def distance_table(topology):
+    """
+    Return the `DistanceTable` of a map, building it on first use.
+
+    The table is stored on the (process-wide, shared) topology, so it is built
+    once per map layout and reused by every turn of every game.
+
+    Args:
+        topology (utils.board.Topology): The static part of the map,
+                                         e.g. ``game.board.topology``.
+
+    Returns:
+        DistanceTable: The shared table.
+    """
+    table = topology.distance_table
+    if table is None:
+        with _distance_table_lock:
+            table = topology.distance_table
+            if table is None:
+                table = DistanceTable(topology)
+                topology.distance_table = table
+    return table
+
+
+class DistanceTable:
+    """
+    All-pairs shortest-path distances over the walkable cells of a map.
+
+    Distances between every pair of air cells live in one flat ``array('H')``
+    (two bytes per pair). Mines and taverns are never walked through, so paths
+    to or from them are resolved through their walkable neighbours: `distance`
+    is O(1) and `path` is O(path length), walking down the table one step at
+    a time instead of storing next hops.
+
+    Heroes are not part of the static table. Pass their positions as
+    `blocked`: if none of them sits on a shortest path the table answer is
+    exact, otherwise a single BFS around them is run instead.
+    """
+
+    def __init__(self, topology):
+        self.topology = topology
+        self.size = topology.size
+        walkable = topology.walkable
+        neighbours = topology.neighbours
+        cells = [i for i, w in enumerate(walkable) if w]
+        # Cell index -> row/column of that cell in the table (-1 if not walkable)
+        self._slot = array('i', [-1]) * len(walkable)
+        for slot, i in enumerate(cells):
+            self._slot[i] = slot
+        self._count = count = len(cells)
+        # Ways in and out of every cell: (slot, extra steps)
+        self._entries = []
+        for i, w in enumerate(walkable):
+            if w:
+                self._entries.append(((self._slot[i], 0),))
+            elif i in topology.walls:
+                self._entries.append(())
+            else:
+                self._entries.append(tuple((self._slot[n], 1) for n in neighbours[i] if walkable[n]))
+
+        adjacency = [[self._slot[n] for n in neighbours[i] if walkable[n]] for i in cells]
+        dist = self._dist = array('H', [UNREACHABLE]) * (count * count)
+        for source in range(count):
+            base = source * count
+            dist[base + source] = 0
+            frontier = [source]
+            steps = 0
+            while frontier:
+                steps += 1
+                next_frontier = []
+                for u in frontier:
+                    for v in adjacency[u]:
+                        if dist[base + v] == UNREACHABLE:
+                            dist[base + v] = steps
+                            next_frontier.append(v)
+                frontier = next_frontier
+
+    def distance(self, start_pos, target_pos, blocked=()):
+        """
+        Length of the shortest path, the hero stepping into the target.
+
+        Args:
+            start_pos (tuple): The (row, col) coordinates of the starting position.
+            target_pos (tuple): The (row, col) coordinates of the destination.
+            blocked (iterable): (row, col) cells that can't be walked through this
+                                turn, typically the other heroes.
+
+        Returns:
+            int | float: The number of steps, or ``float('inf')`` if unreachable.
+        """
+        topology = self.topology
+        if not (topology.contains(start_pos) and topology.contains(target_pos)):
+            return float('inf')
+        start, target = topology.index(start_pos), topology.index(target_pos)
+        steps = self._index_distance(start, target)
+        if blocked and steps != float('inf') and self._is_detour_needed(start, target, steps, blocked):
+            path = self._bfs(start, target, blocked)
+            return len(path) - 1 if path else float('inf')
+        return steps
+
+    def path(self, start_pos, target_pos, blocked=()):
+        """
+        Shortest path from `start_pos` to `target_pos`, both included.
+
+        Args:
+            start_pos (tuple): The (row, col) coordinates of the starting position.
+            target_pos (tuple): The (row, col) coordinates of the destination.
+            blocked (iterable): (row, col) cells that can't be walked through this turn.
+
+        Returns:
+            list of tuple: The path, or an empty list if the target is unreachable.
+        """
+        topology = self.topology
+        if not (topology.contains(start_pos) and topology.contains(target_pos)):
+            return []
+        start, target = topology.index(start_pos), topology.index(target_pos)
+        steps = self._index_distance(start, target)
+        if steps == float('inf'):
+            return []
+        if blocked and self._is_detour_needed(start, target, steps, blocked):
+            return [topology.coords(i) for i in self._bfs(start, target, blocked)]
+
+        walkable = topology.walkable
+        neighbours = topology.neighbours
+        path = [start]
+        current = start
+        while current != target:
+            steps -= 1
+            for n in neighbours[current]:
+                if n == target or (walkable[n] and self._index_distance(n, target) == steps):
+                    current = n
+                    break
+            path.append(current)
+        return [topology.coords(i) for i in path]
+
+    def _index_distance(self, start, target):
+        if start == target:
+            return 0
+        entries = self._entries
+        if not entries[start] or not entries[target]:
+            return float('inf')
+        if target in self.topology.neighbours[start]:
+            return 1
+        dist = self._dist
+        count = self._count
+        best = UNREACHABLE
+        for start_slot, start_extra in entries[start]:
+            base = start_slot * count
+            for target_slot, target_extra in entries[target]:
+                steps = dist[base + target_slot] + start_extra + target_extra
+                if steps < best:
+                    best = steps
+        return best if best < UNREACHABLE else float('inf')
+
+    def _is_detour_needed(self, start, target, steps, blocked):
+        """True if one of the `blocked` cells lies on a shortest path."""
+        topology = self.topology
+        for pos in blocked:
+            if not topology.contains(pos):
+                continue
+            cell = topology.index(pos)
+            if cell == start or cell == target or not topology.walkable[cell]:
+                continue
+            if self._index_distance(start, cell) + self._index_distance(cell, target) == steps:
+                return True
+        return False
+
+    def _bfs(self, start, target, blocked):
+        """Plain BFS on cell indices, walking around the `blocked` cells."""
+        topology = self.topology
+        walkable = topology.walkable
+        neighbours = topology.neighbours
+        closed = {topology.index(pos) for pos in blocked if topology.contains(pos)}
+        closed.discard(target)
+        parents = array('i', [-1]) * len(walkable)
+        parents[start] = start
+        queue = collections.deque([start])
+        while queue:
+            current = queue.popleft()
+            if current == target:
+                path = [current]
+                while current != start:
+                    current = parents[current]
+                    path.append(current)
+                path.reverse()
+                return path
+            if current != start and not walkable[current]:
+                continue
+            for n in neighbours[current]:
+                if parents[n] == -1 and n not in closed:
+                    parents[n] = current
+                    queue.append(n)
+        return []
@@ -0,0 +1,114 @@
+"""
+Per-turn memoizing front-end to `utils.path_finder`.
+
+Every `Game` owns a `PathService` (``game.paths``). AIs call its `bfs_*`
+methods exactly like the functions of `utils.path_finder`, and identical
+queries made during the turn are answered from memory.
+
+Queries are keyed by the grid they run on, their start, their target (a
+position or a character) and the walkable set. Grids are identified by
+object, not by content: hashing a whole map costs as much as a BFS. The
+service keeps a reference to every grid it has seen, so an id can't be
+reused by another grid while it is cached. Grids must therefore not be
+mutated in place (`replace_map_values` always returns a new one); if one is,
+call `invalidate`.
+
+As soon as a second, different query starts from the same cell of the same
+grid, a `DistanceField` is built for that start and answers all the following
+ones, so ``n`` queries from the hero cost one sweep instead of ``n`` searches.
+"""
+
+import collections
+
+from utils.path_finder import (DEFAULT_WALKABLE_CHARS, NOT_FOUND, DistanceField, bfs_from_xy_to_nearest_char,
+                               bfs_from_xy_to_xy)
+
+
+class PathService:
+    """Memoizing pathfinding service, valid for one turn."""
+
+    def __init__(self):
+        self.counters = collections.Counter()
+        self._grids = {}
+        self._results = {}
+        self._fields = {}
+        self._origins = collections.Counter()
+
+    def invalidate(self):
+        """Forget everything computed so far, e.g. because the board changed."""
+        self._grids.clear()
+        self._results.clear()
+        self._fields.clear()
+        self._origins.clear()
+
+    def stats(self):
+        """Counters plus the query hit rate."""
+        return self.summarize(self.counters)
+
+    @staticmethod
+    def summarize(counters):
+        stats = dict(counters)
+        queries = counters['hits'] + counters['misses']
+        stats['queries'] = queries
+        stats['hit_rate'] = counters['hits'] / queries if queries else 0.0
+        return stats
+
+    def field(self, grid, start_pos, walkable_chars={' '}):
+        """The (memoized) `DistanceField` of `grid` from `start_pos`."""
+        key = self._origin_key(grid, start_pos, walkable_chars)
+        field = self._fields.get(key)
+        if field is None:
+            self.counters['fields'] += 1
+            field = DistanceField(grid, start_pos, DEFAULT_WALKABLE_CHARS.union(walkable_chars))
+            self._fields[key] = field
+        return field
+
+    def bfs_from_xy_to_xy(self, grid, start_pos, target_pos, walkable_chars={' '}):
+        """Memoized `utils.path_finder.bfs_from_xy_to_xy`."""
+        return self._query(grid, start_pos, walkable_chars, ('xy', tuple(target_pos)),
+                           lambda: bfs_from_xy_to_xy(grid, start_pos, target_pos, walkable_chars),
+                           lambda field: field.path_to(target_pos))
+
+    def bfs_from_xy_to_nearest_char(self, grid, start_pos, end_char, walkable_chars={' '}):
+        """Memoized `utils.path_finder.bfs_from_xy_to_nearest_char`."""
+        return self._query(grid, start_pos, walkable_chars, ('char', end_char),
+                           lambda: bfs_from_xy_to_nearest_char(grid, start_pos, end_char, walkable_chars),
+                           lambda field: field.nearest(end_char))
+
+    def _origin_key(self, grid, start_pos, walkable_chars):
+        grid_id = id(grid)
+        if grid_id not in self._grids:
+            self._grids[grid_id] = grid
+        return grid_id, tuple(start_pos), frozenset(walkable_chars)
+
+    def _query(self, grid, start_pos, walkable_chars, target, search, from_field):
+        origin = self._origin_key(grid, start_pos, walkable_chars)
+        key = (origin, target)
+        result = self._results.get(key)
+        if result is not None:
+            self.counters['hits'] += 1
+        else:
+            self.counters['misses'] += 1
+            self._origins[origin] += 1
+            if origin in self._fields or self._origins[origin] > 1:
+                result = from_field(self.field(grid, start_pos, walkable_chars))
+            else:
+                self.counters['searches'] += 1
+                result = search()
+            self._results[key] = result
+        path, length = result
+        # Callers are free to modify the path they get back
+        return (list(path), length) if path else NOT_FOUND
+
+    def __deepcopy__(self, memo):
+        # Simulators deep-copy the Game: branches share the service, their
+        # copied grids are new objects and so never hit stale entries
+        return self
+
+    def __getstate__(self):
+        # Caches are not worth shipping to another process
+        return {'counters': self.counters}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.counters.update(state['counters'])
@@ -0,0 +1,247 @@
+"""
+Append-only store of `models.pattern_ai`'s learned patterns.
+
+The library is a snapshot, ``data/learned_patterns.json`` (same format as
+before: a pattern list per phase), plus a log next to it,
+``learned_patterns.json.log``, with one JSON line per change since the
+snapshot: a pattern added, or the outcome of playing one. A change costs one
+appended line instead of rewriting the whole library.
+
+Once `compact_after` changes are logged, a background thread compacts the
+library: it replays the log over the snapshot, merges the patterns of a
+phase that have the same action and situations at least `merge_similarity`
+alike into the oldest one (adding up their outcomes), writes that as the new
+snapshot and drops the log. Compaction works on the files, so changes logged
+by other processes are kept, and only one process compacts a library at a
+time (``.lock`` file). The snapshot keeps, per phase, an alias from the
+situation of each merged pattern to the one it was merged into, so changes
+logged for a merged pattern (by a process that loaded it before) still count
+for the pattern that replaced it. Patterns in memory stay as they are until
+the next load.
+
+Each process loads a library once (`shared_store`). Every `pattern_ai` of
+the process, clones included, reads the same patterns and `PatternIndex`es,
+and worker processes forked after it was loaded share its memory.
+"""
+
+import json
+import os
+import threading
+import time
+
+from utils.pattern_index import PatternIndex
+
+PHASES = ('opening', 'mid', 'end')
+COMPACT_AFTER = 1000  # logged changes that trigger a compaction
+MERGE_SIMILARITY = 0.98  # patterns this alike (same phase and action) are merged when compacting
+STALE_LOCK = 600  # seconds after which the compaction lock of a dead process is ignored
+
+
+def situation_key(situation):
+    return json.dumps(situation, sort_keys=True)
+
+
+def read_library(path, log_paths):
+    """
+    Patterns of the snapshot at `path` with the changes of `log_paths` replayed.
+
+    Returns:
+        tuple: (library, {(phase, situation key): pattern}, changes replayed),
+        the library being a pattern list per phase plus ``success_rates`` and
+        ``aliases``. Merged situations are keys of the pattern they were merged into.
+    """
+    library = {phase: [] for phase in PHASES}
+    library['success_rates'] = {}
+    library['aliases'] = {}
+    by_key = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            snapshot = json.load(f)
+        library['success_rates'] = snapshot.get('success_rates', {})
+        library['aliases'] = snapshot.get('aliases', {})
+        for phase in PHASES:
+            for pattern in snapshot.get(phase, []):
+                library[phase].append(pattern)
+                by_key[(phase, situation_key(pattern['situation']))] = pattern
+            for merged, kept in library['aliases'].get(phase, {}).items():
+                if (phase, kept) in by_key:
+                    by_key[(phase, merged)] = by_key[(phase, kept)]
+
+    changes = 0
+    for log_path in log_paths:
+        if not os.path.exists(log_path):
+            continue
+        with open(log_path) as f:
+            for line in f:
+                try:
+                    change = json.loads(line)
+                except ValueError:
+                    continue  # line cut short by a crash
+                changes += 1
+                key = (change['phase'], situation_key(change['situation']))
+                if change['type'] == 'add' and key not in by_key:
+                    library[change['phase']].append(change['pattern'])
+                    by_key[key] = change['pattern']
+                elif change['type'] == 'outcome' and key in by_key:
+                    count_outcome(library, by_key[key], change['success'])
+    return library, by_key, changes
+
+
+def count_outcome(library, pattern, success):
+    pattern['success_count' if success else 'failure_count'] += 1
+    total = pattern['success_count'] + pattern['failure_count']
+    library['success_rates'][str(pattern['situation'])] = pattern['success_count'] / total
+
+
+def merge_alike(patterns, merge_similarity=MERGE_SIMILARITY):
+    """
+    `patterns` without the ones at least `merge_similarity` alike an older one with the same action.
+
+    Returns:
+        tuple: (patterns kept, {merged situation key: situation key of the pattern kept instead})
+    """
+    kept = []
+    aliases = {}
+    index = PatternIndex()
+    for pattern in patterns:
+        same = next((kept[i] for i in index.alike(pattern['situation'], merge_similarity)
+                     if kept[i]['action'] == pattern['action']), None)
+        if same is not None:
+            same['success_count'] = same.get('success_count', 0) + pattern.get('success_count', 0)
+            same['failure_count'] = same.get('failure_count', 0) + pattern.get('failure_count', 0)
+            aliases[situation_key(pattern['situation'])] = situation_key(same['situation'])
+            continue
+        kept.append(pattern)
+        index.add(pattern['situation'])
+    return kept, aliases
+
+
+class PatternStore:
+    """Patterns of every phase, their `PatternIndex`es and the files they are kept in."""
+
+    def __init__(self, path, compact_after=COMPACT_AFTER, merge_similarity=MERGE_SIMILARITY):
+        self.path = path
+        self.log_path = path + '.log'
+        self.compact_after = compact_after
+        self.merge_similarity = merge_similarity
+        self._lock = threading.Lock()
+        self._compactor = None
+        # An interrupted compaction leaves the log it was compacting
+        self.patterns, self._by_key, self._logged = read_library(path, [self.log_path + '.compacting',
+                                                                         self.log_path])
+        self.index = {phase: PatternIndex(pattern['situation'] for pattern in self.patterns[phase])
+                      for phase in PHASES}
+
+    def add(self, phase, pattern):
+        """
+        Add a new pattern at the end of its phase.
+
+        Returns:
+            dict: `pattern`, or the pattern already kept for its situation, which
+            is left as is (a replayed log keeps the first one too).
+        """
+        key = (phase, situation_key(pattern['situation']))
+        with self._lock:
+            if key in self._by_key:
+                return self._by_key[key]
+            self.patterns[phase].append(pattern)
+            self.index[phase].add(pattern['situation'])
+            self._by_key[key] = pattern
+            self._append({'type': 'add', 'phase': phase, 'situation': pattern['situation'], 'pattern': pattern})
+            return pattern
+
+    def record_outcome(self, phase, pattern, success):
+        """Count a success or a failure of `pattern`."""
+        with self._lock:
+            count_outcome(self.patterns, pattern, success)
+            self._append({'type': 'outcome', 'phase': phase, 'situation': pattern['situation'],
+                          'success': bool(success)})
+
+    def _append(self, change):
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Opened for each change, so a compaction in another process never takes a line away
+        with open(self.log_path, 'a') as f:
+            f.write(json.dumps(change) + '\n')
+        self._logged += 1
+        if self._logged >= self.compact_after and (self._compactor is None or not self._compactor.is_alive()):
+            self._logged = 0
+            self._compactor = threading.Thread(target=self.compact, name="pattern-compaction", daemon=True)
+            self._compactor.start()
+
+    def compact(self):
+        """Fold the log into a merged snapshot; False if another process is already at it."""
+        lock_path = self.path + '.lock'
+        if not self._take_lock(lock_path):
+            return False
+        try:
+            compacting = self.log_path + '.compacting'
+            if os.path.exists(self.log_path):
+                if os.path.exists(compacting):
+                    # Left by an interrupted compaction: fold it in too
+                    with open(self.log_path) as log, open(compacting, 'a') as f:
+                        f.write(log.read())
+                    os.remove(self.log_path)
+                else:
+                    os.replace(self.log_path, compacting)
+            library, _, _ = read_library(self.path, [compacting])
+            for phase in PHASES:
+                library[phase], merged = merge_alike(library[phase], self.merge_similarity)
+                aliases = library['aliases'].setdefault(phase, {})
+                for key, kept in aliases.items():
+                    aliases[key] = merged.get(kept, kept)
+                aliases.update(merged)
+            with open(self.path + '.tmp', 'w') as f:
+                json.dump(library, f)
+            os.replace(self.path + '.tmp', self.path)
+            if os.path.exists(compacting):
+                os.remove(compacting)
+            return True
+        finally:
+            os.remove(lock_path)
+
+    def _take_lock(self, lock_path):
+        directory = os.path.dirname(lock_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            if time.time() - os.path.getmtime(lock_path) > STALE_LOCK:
+                os.remove(lock_path)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            return False
+
+    def wait(self):
+        """Wait for a running compaction to finish."""
+        if self._compactor is not None:
+            self._compactor.join()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def shared_store(path) -> PatternStore:
+    """The process-wide store of the library at `path`, loaded on first use."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = PatternStore(path)
+        return store
+
+
+def _after_fork_in_child():
+    global _stores_lock
+    _stores_lock = threading.Lock()
+    for store in _stores.values():
+        store._lock = threading.Lock()
+        store._compactor = None
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,326 @@
+"""
+Persistent rating ledger (Glicko).
+
+Each finished game updates the ratings of its players from its final gold
+ranking, and only them: the ledger never goes back over past games. A game
+of four counts as the six head-to-head results it contains (a draw when two
+heroes finish with the same gold), played in one Glicko rating period.
+Heroes of the same player in a game aren't rated against each other.
+
+Every player has a rating and a rating deviation (RD): the rating is within
+about two RDs of the player's true strength 95% of the time. RDs shrink as
+players play and drift back up a little every game, so ratings keep
+following AIs that change.
+
+The ledger lives in ``data/ratings.json``::
+
+    ledger = RatingLedger.load()
+    ledger.record({'tactical_v2': 812, 'heuristic1': 640, ...}, game_id)
+    ledger.save()
+    for line in ledger.leaderboard():
+        print(line.name, line.rating, line.interval())
+
+``python -m utils.ratings results.csv`` rebuilds a ledger from a
+`utils.self_play` results file and prints the leaderboard.
+"""
+
+import csv
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_PATH = os.path.join('data', 'ratings.json')
+
+INITIAL_RATING = 1500.0
+INITIAL_DEVIATION = 350.0
+MIN_DEVIATION = 30.0
+DEVIATION_DRIFT = 10.0  # added (in quadrature) to every player's RD before each of its games
+RECENT_GAMES = 1000  # game ids remembered to ignore a game recorded twice
+
+_Q = math.log(10) / 400
+_G_FACTOR = 3 * _Q * _Q / (math.pi * math.pi)
+_DRIFT_VARIANCE = DEVIATION_DRIFT * DEVIATION_DRIFT
+
+
+class Rating(NamedTuple):
+    name: str
+    rating: float
+    deviation: float
+    games: int  # heroes played
+    wins: int  # heroes that finished first, ties included
+
+    def interval(self, z=1.96):
+        """(low, high) confidence interval of the rating, 95% by default."""
+        return self.rating - z * self.deviation, self.rating + z * self.deviation
+
+
+class RatingLedger:
+    """Ratings of every player seen, updated one game at a time."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.players = {}  # name -> [rating, deviation, games, wins]
+        self.games = 0
+        self.recent = deque()  # ids of the last games recorded, oldest first
+        self._recent_ids = set()
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH) -> "RatingLedger":
+        """The ledger saved at `path`, or an empty one."""
+        ledger = cls(path)
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            ledger.players = {name: list(player) for name, player in data['players'].items()}
+            ledger.games = data['games']
+            ledger.recent.extend(data.get('recent', []))
+            ledger._recent_ids.update(ledger.recent)
+        return ledger
+
+    def save(self, path=None):
+        """Write the ledger, atomically."""
+        path = path or self.path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {'games': self.games, 'players': self.players, 'recent': list(self.recent)}
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(path + '.tmp', path)
+
+    def record(self, ranking, game_id=None) -> bool:
+        """
+        Rate a finished game.
+
+        Args:
+            ranking: Final gold of each hero, as a {name: gold} dict or
+                     (name, gold) pairs (a name may appear more than once).
+            game_id: Id of the game: a game already recorded is ignored.
+
+        Returns:
+            bool: False if the game was ignored.
+        """
+        if game_id is not None:
+            if game_id in self._recent_ids:
+                return False
+            self.recent.append(game_id)
+            self._recent_ids.add(game_id)
+            if len(self.recent) > RECENT_GAMES:
+                self._recent_ids.discard(self.recent.popleft())
+        heroes = list(ranking.items() if isinstance(ranking, dict) else ranking)
+        names = [name for name, _ in heroes]
+        if len(set(names)) < 2:
+            return False
+
+        # Glicko period: RDs drift up, then everyone is rated against the others' pre-game ratings
+        players = self.players
+        before = []
+        for name in names:
+            player = players.get(name)
+            if player is None:
+                player = players[name] = [INITIAL_RATING, INITIAL_DEVIATION, 0, 0]
+            variance = min(INITIAL_DEVIATION * INITIAL_DEVIATION, player[1] * player[1] + _DRIFT_VARIANCE)
+            before.append((player[0], variance, 1 / math.sqrt(1 + _G_FACTOR * variance)))
+
+        totals = {}  # name -> [sum g^2 E (1 - E), sum g (s - E)]
+        for i, (name, gold) in enumerate(heroes):
+            rating = before[i][0]
+            information = surprise = 0.0
+            for j, (other, other_gold) in enumerate(heroes):
+                if other == name:
+                    continue
+                other_rating, _, g = before[j]
+                expected = 1 / (1 + math.exp(g * _Q * (other_rating - rating)))
+                score = 1.0 if gold > other_gold else 0.5 if gold == other_gold else 0.0
+                information += g * g * expected * (1 - expected)
+                surprise += g * (score - expected)
+            total = totals.get(name)
+            if total is None:
+                totals[name] = [i, information, surprise]
+            else:
+                total[1] += information
+                total[2] += surprise
+
+        best = max(gold for _, gold in heroes)
+        for name, (i, information, surprise) in totals.items():
+            rating, variance, _ = before[i]
+            precision = 1 / variance + _Q * _Q * information
+            player = players[name]
+            player[0] = rating + _Q / precision * surprise
+            player[1] = max(MIN_DEVIATION, math.sqrt(1 / precision))
+        for name, gold in heroes:
+            player = players[name]
+            player[2] += 1
+            player[3] += gold == best
+        self.games += 1
+        return True
+
+    def record_many(self, games, period=100):
+        """
+        Rate many finished games at once, e.g. to rebuild ratings from history.
+
+        `games` are ``(ranking, game_id)`` pairs, as for `record`. They are
+        rated in Glicko rating periods of `period` games, everyone being
+        rated against the ratings of the start of the period: with NumPy, a
+        period is rated at once, which is what makes hundreds of thousands
+        of games take well under a second. Periods much smaller than the
+        number of games give about the same ratings as one game at a time.
+        Without NumPy, games are recorded one by one.
+
+        Returns:
+            int: Number of games rated.
+        """
+        if np is None:
+            return sum(self.record(ranking, game_id) for ranking, game_id in games)
+
+        index = {name: i for i, name in enumerate(self.players)}
+        heroes, golds, sizes = [], [], []
+        recent, recent_ids = self.recent, self._recent_ids
+        for ranking, game_id in games:
+            if isinstance(ranking, dict):
+                ranking = ranking.items()
+            row = []
+            for name, gold in ranking:
+                i = index.get(name)
+                if i is None:
+                    i = index[name] = len(index)
+                row.append(i)
+                golds.append(gold)
+            if not row or min(row) == max(row) or game_id in recent_ids:
+                del golds[len(golds) - len(row):]
+                continue
+            if game_id is not None:
+                recent.append(game_id)
+                recent_ids.add(game_id)
+                if len(recent) > RECENT_GAMES:
+                    recent_ids.discard(recent.popleft())
+            heroes.extend(row)
+            sizes.append(len(row))
+        if not sizes:
+            return 0
+
+        # Games as (games, seats) arrays, padded with seat -1
+        sizes = np.array(sizes)
+        seats = sizes.max()
+        hero = np.full((len(sizes), seats), -1, dtype=np.intp)
+        gold = np.zeros((len(sizes), seats))
+        games = np.repeat(np.arange(len(sizes)), sizes)
+        seat = np.arange(len(games)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        hero[games, seat] = heroes
+        gold[games, seat] = golds
+        earlier = np.tri(seats, k=-1, dtype=bool)  # [seat, other]: other comes before seat
+
+        players = len(index)
+        table = np.empty((players, 4))
+        table[:] = INITIAL_RATING, INITIAL_DEVIATION, 0, 0
+        for name, i in index.items():
+            if name in self.players:
+                table[i] = self.players[name]
+        ratings, deviations = table[:, 0], table[:, 1]
+
+        for start in range(0, len(sizes), period):
+            h, gd = hero[start:start + period], gold[start:start + period]
+            seated = h >= 0
+            played = np.bincount(h[seated], minlength=players)
+            # RDs drift once per game played, heroes of the same player counting once
+            repeated = ((h[:, :, None] == h[:, None, :]) & earlier).any(axis=2)
+            games_played = np.bincount(h[seated & ~repeated], minlength=players)
+            variance = np.minimum(INITIAL_DEVIATION ** 2, deviations ** 2 + _DRIFT_VARIANCE * games_played)
+            g = 1 / np.sqrt(1 + _G_FACTOR * variance)
+            r, gj = ratings[h], g[h]
+            # Every hero (axis 1) against every other hero of its game (axis 2)
+            opponents = seated[:, :, None] & seated[:, None, :] & (h[:, :, None] != h[:, None, :])
+            expected = 1 / (1 + np.exp(gj[:, None, :] * _Q * (r[:, None, :] - r[:, :, None])))
+            score = np.sign(gd[:, :, None] - gd[:, None, :]) * 0.5 + 0.5
+            information = np.where(opponents, gj[:, None, :] ** 2 * expected * (1 - expected), 0).sum(axis=2)
+            surprise = np.where(opponents, gj[:, None, :] * (score - expected), 0).sum(axis=2)
+            information = np.bincount(h[seated], information[seated], minlength=players)
+            surprise = np.bincount(h[seated], surprise[seated], minlength=players)
+
+            rated = games_played > 0
+            precision = 1 / variance[rated] + _Q * _Q * information[rated]
+            ratings[rated] += _Q / precision * surprise[rated]
+            deviations[rated] = np.maximum(MIN_DEVIATION, np.sqrt(1 / precision))
+            best = gd == np.where(seated, gd, -np.inf).max(axis=1, keepdims=True)
+            table[:, 2] += played
+            table[:, 3] += np.bincount(h[seated & best], minlength=players)
+
+        for name, i in index.items():
+            rating, deviation, played, wins = table[i]
+            self.players[name] = [float(rating), float(deviation), int(played), int(wins)]
+        self.games += len(sizes)
+        return len(sizes)
+
+    def rating(self, name) -> Rating:
+        rating, deviation, games, wins = self.players.get(name, (INITIAL_RATING, INITIAL_DEVIATION, 0, 0))
+        return Rating(name, rating, deviation, games, wins)
+
+    def leaderboard(self, conservative=False):
+        """
+        `Rating`s, best first.
+
+        With `conservative`, players are ranked by the low end of their 95%
+        interval, so ones with few games don't top the board by luck.
+        """
+        ratings = [self.rating(name) for name in self.players]
+        if conservative:
+            return sorted(ratings, key=lambda r: r.interval()[0], reverse=True)
+        return sorted(ratings, key=lambda r: r.rating, reverse=True)
+
+    def probability_better(self, name, other) -> float:
+        """Probability that `name` is stronger than `other`, from their ratings and deviations."""
+        a, b = self.rating(name), self.rating(other)
+        spread = math.sqrt(a.deviation ** 2 + b.deviation ** 2)
+        return 0.5 * (1 + math.erf((a.rating - b.rating) / (spread * math.sqrt(2))))
+
+
+def record_rows(ledger, rows):
+    """
+    Rate the games of `utils.self_play` result rows (one row per hero, grouped by game).
+
+    Games are told apart by their ``game_id``. Rows written before it
+    existed only have their seed, the same in every batch run with the same
+    ``--seed``: their games are told apart by seed and lineup.
+    """
+    games = {}
+    previous, run = None, 0
+    for row in rows:
+        game_id = row.get('game_id')
+        if not game_id:
+            # The rows of a game are written together
+            if (row['seed'], row['game']) != previous:
+                previous, run = (row['seed'], row['game']), run + 1
+            game_id = (run, row['seed'])
+        games.setdefault(game_id, []).append((row['hero_id'], row['ai'], int(row['gold'])))
+    recorded = []
+    for game_id, heroes in games.items():
+        heroes.sort(key=lambda hero: int(hero[0]))
+        ranking = [(ai, gold) for _, ai, gold in heroes]
+        if isinstance(game_id, tuple):
+            game_id = f"selfplay-{game_id[1]}-" + "-".join(ai for ai, _ in ranking)
+        recorded.append((ranking, game_id))
+    return ledger.record_many(recorded)
+
+
+if __name__ == "__main__":
+    ledger = RatingLedger.load() if len(sys.argv) < 2 else RatingLedger()
+    for results in sys.argv[1:]:
+        with open(results, newline='') as f:
+            rows = list(csv.DictReader(f))
+        start = time.perf_counter()
+        record_rows(ledger, rows)
+        print(f"{results}: {ledger.games} games rated in {time.perf_counter() - start:.3f}s")
+    print(f"{'player':<24}{'rating':>8}{'RD':>6}   95% interval{'games':>9}{'wins':>7}")
+    for line in ledger.leaderboard():
+        low, high = line.interval()
+        print(f"{line.name:<24}{line.rating:>8.0f}{line.deviation:>6.0f}   [{low:.0f}, {high:.0f}]"
+              f"{line.games:>9}{line.wins:>7}")
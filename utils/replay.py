@@ -0,0 +1,211 @@
+"""
+Compact, append-only replay files.
+
+A replay holds the states a client received during a game. The static part
+(map terrain, game id, hero names, spawn points, urls) is written once, in a
+header record; every state after that is a small binary turn record: the
+turn, each hero's position, life, gold, mine count, crashed flag and last
+direction, and only the mines whose owner changed. A state that doesn't fit
+(another game, a changed static field, an error state) is stored whole, as
+JSON, and becomes the new base.
+
+Records are appended as the game is played (`ReplayWriter`) and read back
+one state at a time (`ReplayReader`), so neither side holds the whole game.
+
+File layout: the magic ``VNDR`` and a version byte, then records of one type
+byte, a 4-byte little-endian length and the payload.
+
+Files saved by older versions (one ``str(state)`` per line) are still read
+by `load_states`.
+"""
+
+import ast
+import json
+import os
+import struct
+
+MAGIC = b"VNDR"
+VERSION = 1
+
+SAVE_DIR = os.path.join(os.path.expanduser("~"), ".vindinium", "save")
+
+_HEADER, _TURN, _FULL = b"H", b"T", b"F"
+_RECORD = struct.Struct("<cI")  # type, payload length
+_TURN_HEAD = struct.Struct("<IBH")  # turn, finished, mine changes
+_HERO = struct.Struct("<BBBIHB")  # x, y, life, gold, mine count, crashed | last direction << 1
+_MINE_CHANGE = struct.Struct("<HB")  # mine number, new owner (0: neutral)
+
+_DIRECTIONS = (None, "North", "South", "East", "West", "Stay")
+_DIRECTION_CODES = {direction: code for code, direction in enumerate(_DIRECTIONS)}
+# Hero fields stored in turn records, everything else is static
+_DYNAMIC_FIELDS = {'pos', 'life', 'gold', 'mineCount', 'crashed', 'lastDir'}
+
+
+def _split_board(board):
+    """(terrain tiles, mine tile offsets, mine owners): heroes and mine owners taken out."""
+    tiles = board['tiles']
+    terrain, mines, owners = [], [], []
+    for i in range(0, len(tiles), 2):
+        tile = tiles[i:i + 2]
+        if tile[0] == '@':
+            tile = "  "
+        elif tile[0] == '$':
+            mines.append(i)
+            owners.append(0 if tile[1] == '-' else int(tile[1]))
+            tile = "$-"
+        terrain.append(tile)
+    return "".join(terrain), mines, owners
+
+
+def _static(state):
+    """Everything of `state` that doesn't change from one turn to the next."""
+    game = state['game']
+    return {
+        'top': {key: value for key, value in state.items() if key not in ('game', 'hero')},
+        'game': {key: value for key, value in game.items() if key not in ('turn', 'heroes', 'board', 'finished')},
+        'heroes': [{key: value for key, value in hero.items() if key not in _DYNAMIC_FIELDS}
+                   for hero in game['heroes']],
+        'hero_id': state['hero']['id'],
+        'size': game['board']['size'],
+        'terrain': _split_board(game['board'])[0],
+    }
+
+
+class ReplayWriter:
+    """Appends the states of one game to a replay file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC + bytes([VERSION]))
+        self._static = None
+        self._owners = None
+
+    def append(self, state):
+        try:
+            static = _static(state)
+            if state['hero'] not in state['game']['heroes']:
+                raise ValueError("hero isn't one of the game's heroes")
+            if static != self._static:
+                self._write(_HEADER, json.dumps(static).encode())
+                self._static = static
+                self._owners = None
+            self._write(_TURN, self._turn_record(state))
+        except (KeyError, TypeError, ValueError, struct.error):
+            # Not a regular game state: keep it whole
+            self._write(_FULL, json.dumps(state).encode())
+            self._static = self._owners = None
+
+    def _turn_record(self, state):
+        game = state['game']
+        _, mines, owners = _split_board(game['board'])
+        if self._owners is None:
+            changes = [(n, owner) for n, owner in enumerate(owners)]
+        else:
+            changes = [(n, owner) for n, (owner, old) in enumerate(zip(owners, self._owners)) if owner != old]
+        record = [_TURN_HEAD.pack(game['turn'], bool(game['finished']), len(changes))]
+        for hero in game['heroes']:
+            flags = bool(hero['crashed']) | _DIRECTION_CODES[hero.get('lastDir')] << 1
+            record.append(_HERO.pack(hero['pos']['x'], hero['pos']['y'], hero['life'], hero['gold'],
+                                     hero['mineCount'], flags))
+        record.extend(_MINE_CHANGE.pack(n, owner) for n, owner in changes)
+        self._owners = owners
+        return b"".join(record)
+
+    def _write(self, kind, payload):
+        self._file.write(_RECORD.pack(kind, len(payload)))
+        self._file.write(payload)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayReader:
+    """Iterates over the states of a replay file, decoding them one at a time."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC) + 1) != MAGIC + bytes([VERSION]):
+                raise ValueError(f"{self.path} is not a version {VERSION} replay file")
+            static = tiles = mines = None
+            while True:
+                head = f.read(_RECORD.size)
+                if len(head) < _RECORD.size:
+                    return
+                kind, length = _RECORD.unpack(head)
+                payload = f.read(length)
+                if kind == _HEADER:
+                    static = json.loads(payload)
+                    tiles = [static['terrain'][i:i + 2] for i in range(0, len(static['terrain']), 2)]
+                    mines = [i for i, tile in enumerate(tiles) if tile == "$-"]
+                elif kind == _TURN:
+                    yield _decode_turn(static, tiles, mines, payload)
+                elif kind == _FULL:
+                    yield json.loads(payload)
+
+
+def _decode_turn(static, tiles, mines, payload):
+    """State of a turn record; `tiles` holds the mine tiles of the previous turn and is updated."""
+    turn, finished, changes = _TURN_HEAD.unpack_from(payload)
+    offset = _TURN_HEAD.size
+    heroes = []
+    for hero_static in static['heroes']:
+        x, y, life, gold, mine_count, flags = _HERO.unpack_from(payload, offset)
+        offset += _HERO.size
+        hero = dict(hero_static, pos={'x': x, 'y': y}, life=life, gold=gold, mineCount=mine_count,
+                    crashed=bool(flags & 1))
+        last_dir = _DIRECTIONS[flags >> 1]
+        if last_dir is not None:
+            hero['lastDir'] = last_dir
+        heroes.append(hero)
+    for _ in range(changes):
+        n, owner = _MINE_CHANGE.unpack_from(payload, offset)
+        offset += _MINE_CHANGE.size
+        tiles[mines[n]] = f"${owner}" if owner else "$-"
+
+    board = list(tiles)
+    size = static['size']
+    for hero in heroes:
+        board[hero['pos']['x'] * size + hero['pos']['y']] = f"@{hero['id']}"
+    game = dict(static['game'], turn=turn, heroes=heroes, board={'size': size, 'tiles': "".join(board)},
+                finished=bool(finished))
+    me = next(hero for hero in heroes if hero['id'] == static['hero_id'])
+    return dict(static['top'], game=game, hero=dict(me))
+
+
+def load_states(path):
+    """The states of a saved game, lazily: replay files, or the legacy one-``str(state)``-per-line files."""
+    with open(path, 'rb') as f:
+        is_replay = f.read(len(MAGIC)) == MAGIC
+    if is_replay:
+        yield from ReplayReader(path)
+        return
+    with open(path, 'r') as game_file:
+        for line in game_file:
+            if len(line.strip(chr(0)).strip()) > 0:
+                yield ast.literal_eval(line)
+
+
+def save_states(path, states):
+    """Write `states` as a replay file."""
+    with ReplayWriter(path) as writer:
+        for state in states:
+            writer.append(state)
+
+
+def save_path(game_id):
+    """File of a saved game, in ``~/.vindinium/save``, the directory created if needed."""
+    os.makedirs(SAVE_DIR, exist_ok=True)
+    return os.path.join(SAVE_DIR, game_id)
@@ -0,0 +1,205 @@
+"""
+Batched Monte Carlo rollouts.
+
+`simulate` plays `count` random continuations of a `utils.simulator.SimState`
+at once: our hero first follows a given path, then every hero plays random
+moves until `depth` more rounds have been played. With NumPy, all rollouts
+advance together as arrays (positions, life, gold and mine owners per
+rollout), so thousands of them fit in a move deadline. Without NumPy, the
+same rollouts are played one by one on the simulator.
+
+The rules are the simulator's, with one simplification: the path is followed
+as a fixed list of directions, so a rollout blocked on the way may end up
+off the path.
+"""
+
+import functools
+import random
+from typing import NamedTuple, Sequence
+
+from utils.board import TOPOLOGY_CACHE_SIZE
+from utils.simulator import (ATTACK_DAMAGE, BEER_GOLD_COST, BEER_LIFE, DIRECTIONS, HERO_IDS, MAX_LIFE,
+                             MINE_LIFE_COST, THIRST)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# True when rollouts run as NumPy arrays
+VECTORIZED = np is not None
+
+_MOVES = tuple(DIRECTIONS)
+_AIR, _MINE, _TAVERN, _WALL = range(4)
+
+
+class RolloutResult(NamedTuple):
+    """Final state of `hero_id` in every rollout."""
+
+    gold: Sequence[int]
+    life: Sequence[int]
+    mine_count: Sequence[int]
+    deaths: Sequence[int]
+    turn: int  # game turn the rollouts stopped at
+
+
+def path_directions(path):
+    """Directions ("North", ...) walking along a list of adjacent (row, col)."""
+    offsets = {delta: direction for direction, delta in DIRECTIONS.items()}
+    return [offsets.get((b[0] - a[0], b[1] - a[1]), "Stay") for a, b in zip(path, path[1:])]
+
+
+def simulate(sim, hero_id, path, count, depth, seed=None) -> RolloutResult:
+    """
+    Play `count` random rollouts from `sim`, `hero_id` following `path` first.
+
+    Args:
+        sim (SimState): Current state, left unchanged.
+        hero_id (int): Hero whose results are returned.
+        path (list): (row, col) path starting at the hero's position.
+        count (int): Number of rollouts.
+        depth (int): Rounds (one move of every hero) played after the path.
+        seed: Seed of the random moves.
+    """
+    directions = path_directions(path)
+    moves = 4 * (len(directions) + depth)
+    moves = max(0, min(moves, sim.max_turns - sim.turn))
+    if VECTORIZED:
+        return _BatchRollouts(sim, count, np.random.default_rng(seed)).play(hero_id, directions, moves)
+    return _play_one_by_one(sim, hero_id, directions, count, moves, random.Random(seed))
+
+
+def _play_one_by_one(sim, hero_id, directions, count, moves, rng):
+    gold, life, mine_count, deaths = [], [], [], []
+    for _ in range(count):
+        undos = []
+        own_moves = 0
+        for _ in range(moves):
+            mover = sim.to_move
+            if mover == hero_id and own_moves < len(directions):
+                direction = directions[own_moves]
+                own_moves += 1
+            else:
+                direction = rng.choice(_MOVES)
+            undos.append(sim.make(mover, direction))
+        gold.append(sim.gold[hero_id])
+        life.append(sim.life[hero_id])
+        mine_count.append(sim.mine_count[hero_id])
+        deaths.append(sim.deaths[hero_id])
+        for undo in reversed(undos):
+            sim.unmake(undo)
+    return RolloutResult(gold, life, mine_count, deaths, sim.turn + moves)
+
+
+@functools.lru_cache(maxsize=TOPOLOGY_CACHE_SIZE)
+def _tables(topology):
+    """Per-map lookup arrays: move targets, cell kinds, mine slots, rows and columns."""
+    size = topology.size
+    cells = len(topology.cells)
+    mines = sorted(topology.mines)
+    kind = np.full(cells, _AIR, dtype=np.int8)
+    kind[list(topology.walls)] = _WALL
+    kind[mines] = _MINE
+    kind[list(topology.taverns)] = _TAVERN
+    mine_slot = np.full(cells, -1, dtype=np.intp)
+    mine_slot[mines] = np.arange(len(mines))
+    # Target of each move from each cell; bumping into a wall or the border is staying
+    move = np.empty((cells, len(_MOVES)), dtype=np.intp)
+    for i in range(cells):
+        r, c = divmod(i, size)
+        for d, (dr, dc) in enumerate(DIRECTIONS.values()):
+            nr, nc = r + dr, c + dc
+            inside = 0 <= nr < size and 0 <= nc < size
+            move[i, d] = nr * size + nc if inside and kind[nr * size + nc] != _WALL else i
+    rows, cols = np.divmod(np.arange(cells), size)
+    return move, kind, mine_slot, np.array(mines, dtype=np.intp), rows, cols
+
+
+class _BatchRollouts:
+    """`count` copies of a `SimState`, advanced together."""
+
+    def __init__(self, sim, count, rng):
+        self.rng = rng
+        self.turn = sim.turn
+        self.move, self.kind, self.mine_slot, mines, self.rows, self.cols = _tables(sim.topology)
+        self.all = np.arange(count)
+        self.pos = np.tile(np.array(sim.pos, dtype=np.intp), (count, 1))
+        self.life = np.tile(np.array(sim.life, dtype=np.int64), (count, 1))
+        self.gold = np.tile(np.array(sim.gold, dtype=np.int64), (count, 1))
+        self.deaths = np.tile(np.array(sim.deaths, dtype=np.int64), (count, 1))
+        self.spawn = sim.spawn
+        # Owner of each mine, mines in board order
+        self.owners = np.tile(np.frombuffer(bytes(sim.owners), dtype=np.uint8)[mines].astype(np.int8), (count, 1))
+
+    def play(self, hero_id, directions, moves):
+        count = len(self.all)
+        own_moves = 0
+        for _ in range(moves):
+            mover = self.turn % 4 + 1
+            if mover == hero_id and own_moves < len(directions):
+                d = np.full(count, _MOVES.index(directions[own_moves]), dtype=np.intp)
+                own_moves += 1
+            else:
+                d = self.rng.integers(len(_MOVES), size=count)
+            self._make(mover, d)
+        mine_count = (self.owners == hero_id).sum(axis=1)
+        return RolloutResult(self.gold[:, hero_id], self.life[:, hero_id], mine_count, self.deaths[:, hero_id],
+                             self.turn)
+
+    def _make(self, hero_id, d):
+        pos, life, gold = self.pos, self.life, self.gold
+        current = pos[:, hero_id]
+        target = self.move[current, d]
+        kind = np.where(target != current, self.kind[target], _WALL)
+        deaths = self.deaths[:, hero_id].copy()
+
+        # Into air, unless another hero is there
+        free = (kind == _AIR) & ~(pos == target[:, None]).any(axis=1)
+        pos[free, hero_id] = target[free]
+
+        # Into a mine it doesn't own
+        rollouts = self.all[kind == _MINE]
+        if len(rollouts):
+            slots = self.mine_slot[target[rollouts]]
+            foreign = self.owners[rollouts, slots] != hero_id
+            rollouts, slots = rollouts[foreign], slots[foreign]
+            life[rollouts, hero_id] -= MINE_LIFE_COST
+            alive = life[rollouts, hero_id] > 0
+            self.owners[rollouts[alive], slots[alive]] = hero_id
+            self._die(rollouts[~alive], hero_id, 0)
+
+        # Into a tavern, with the gold for a beer
+        drink = (kind == _TAVERN) & (gold[:, hero_id] >= BEER_GOLD_COST)
+        gold[drink, hero_id] -= BEER_GOLD_COST
+        life[drink, hero_id] = np.minimum(life[drink, hero_id] + BEER_LIFE, MAX_LIFE)
+
+        # Hit adjacent enemies, unless killed by a mine this turn
+        fighting = self.deaths[:, hero_id] == deaths
+        here = pos[:, hero_id]
+        adjacent = {enemy: fighting & (np.abs(self.rows[here] - self.rows[pos[:, enemy]]) +
+                                       np.abs(self.cols[here] - self.cols[pos[:, enemy]]) == 1)
+                    for enemy in HERO_IDS if enemy != hero_id}
+        for enemy, hit in adjacent.items():
+            life[hit, enemy] -= ATTACK_DAMAGE
+            self._die(self.all[hit & (life[:, enemy] <= 0)], enemy, hero_id)
+
+        gold[:, hero_id] += (self.owners == hero_id).sum(axis=1)
+        life[:, hero_id] = np.maximum(life[:, hero_id] - THIRST, 1)
+        self.turn += 1
+
+    def _die(self, rollouts, hero_id, killer_id):
+        """Same as `SimState._die`, in the given rollouts."""
+        if not len(rollouts):
+            return
+        self.deaths[rollouts, hero_id] += 1
+        owners = self.owners[rollouts]
+        owners[owners == hero_id] = killer_id
+        self.owners[rollouts] = owners
+        self.life[rollouts, hero_id] = MAX_LIFE
+        spawn = self.spawn[hero_id]
+        self.pos[rollouts, hero_id] = -1
+        for other in HERO_IDS:
+            if other != hero_id:
+                # Telefrag: the respawning hero kills whoever stands on its spawn
+                self._die(rollouts[self.pos[rollouts, other] == spawn], other, hero_id)
+        self.pos[rollouts, hero_id] = spawn
@@ -0,0 +1,234 @@
+"""
+Headless batch self-play.
+
+Plays games between AIs of `models/` on the in-process rules engine
+(`utils.local_server.LocalGame`), with no server and no network, in a pool of
+worker processes. Every game's map comes from its seed, so a batch can be
+replayed exactly, and the AIs take turns on the four spawn points from one
+game to the next.
+
+Results have one row per hero per game and are written as the games finish:
+CSV, or Parquet when the output ends with ``.parquet`` (needs pyarrow).
+
+    python -m utils.self_play tactical_ai_v2 tactical_ai_v3 tactical_ai_v4 --games 3000 --out data/self_play.csv
+"""
+
+import argparse
+import contextlib
+import csv
+import importlib
+import math
+import multiprocessing
+import os
+import random
+import time
+import uuid
+from collections import defaultdict
+
+from bot import Bot
+from utils import decision_log, log
+from utils.local_server import LocalGame
+from utils.map_generator import STANDARD_SIZES, generate_map
+from utils.ratings import RatingLedger, record_rows
+from utils.simulator import HERO_IDS
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+COLUMNS = ('game', 'game_id', 'seed', 'size', 'turns', 'hero_id', 'ai', 'gold', 'mines', 'deaths', 'rank', 'crashed',
+           'move_ms')
+CRASH_LOG_INTERVAL = 60.0  # seconds between two logged exceptions of the same AI, per worker
+
+_last_crashes = {}  # AI name -> time.monotonic() of its last logged exception
+
+
+def lineup(ai_names, game_index):
+    """AI name of each hero of a game: the AIs rotate over the spawn points."""
+    return [ai_names[(game_index + seat) % len(ai_names)] for seat in range(len(HERO_IDS))]
+
+
+def load_ai(name, log_decisions=False):
+    """Instance of the `AI` class of ``models/<name>.py``."""
+    ai = importlib.import_module(f"models.{name}").AI(name, name)
+    ai.log_decisions = log_decisions
+    return ai
+
+
+def _log_crash(logger, ai_name, hero_id, game_id):
+    """Log the exception being handled, at most once every `CRASH_LOG_INTERVAL` seconds per AI."""
+    now = time.monotonic()
+    if now - _last_crashes.get(ai_name, -CRASH_LOG_INTERVAL) < CRASH_LOG_INTERVAL:
+        return
+    _last_crashes[ai_name] = now
+    logger.exception("%s raised, hero %d of %s crashed", ai_name, hero_id, game_id)
+
+
+def play_game(ai_names, game_index, seed, size=None, turns=300, move_time=None, log_decisions=False):
+    """
+    Play one game, return its result rows.
+
+    Rows carry a random ``game_id``, unique across batches, by which ratings
+    tell games apart: batches run with the same ``--seed`` replay the same
+    maps.
+
+    Args:
+        ai_names (list): AI module names, see `lineup`.
+        game_index (int): Number of the game in its batch.
+        seed (int): Seed of the map, its size if not given, and the game.
+        size (int): Board size, None for one of the standard sizes.
+        turns (int): Moves per hero.
+        move_time (float): Seconds per move (see `AIBase.decide_by`), None for no limit.
+        log_decisions (bool): Write the AIs' moves to ``moves_log/`` (`utils.decision_log`).
+    """
+    rng = random.Random(seed)
+    size = size or rng.choice(STANDARD_SIZES)
+    board, spawns = generate_map(size, seed=rng.getrandbits(32))
+    names = dict(zip(HERO_IDS, lineup(ai_names, game_index)))
+    game_id = f"selfplay-{uuid.uuid4().hex}"
+    game = LocalGame(game_id, board, spawns, 4 * turns, names, set(HERO_IDS), rng)
+    bots = {hero_id: Bot(load_ai(name, log_decisions)) for hero_id, name in names.items()}
+    thinking = defaultdict(float)
+    logger = log.get_logger('self_play')  # before stdout is silenced: the log writes to the real one
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        while not game.finished:
+            hero_id = game.to_move
+            start = time.perf_counter()
+            try:
+                deadline = time.monotonic() + move_time if move_time else None
+                direction = bots[hero_id].move(game.state_for(hero_id), deadline)
+            except Exception:
+                # A broken AI loses its hero, not the batch
+                thinking[hero_id] += time.perf_counter() - start
+                _log_crash(logger, names[hero_id], hero_id, game_id)
+                game.crash(hero_id)
+                continue
+            thinking[hero_id] += time.perf_counter() - start
+            game.play(hero_id, direction)
+    if log_decisions:
+        decision_log.flush()
+
+    sim = game.sim
+    rows = []
+    for hero_id in HERO_IDS:
+        rank = 1 + sum(sim.gold[other] > sim.gold[hero_id] for other in HERO_IDS)
+        rows.append({
+            'game': game_index, 'game_id': game_id, 'seed': seed, 'size': size, 'turns': turns, 'hero_id': hero_id,
+            'ai': names[hero_id], 'gold': sim.gold[hero_id], 'mines': sim.mine_count[hero_id],
+            'deaths': sim.deaths[hero_id], 'rank': rank, 'crashed': hero_id in game.crashed,
+            'move_ms': round(1000 * thinking[hero_id] / max(1, turns), 3),
+        })
+    return rows
+
+
+def _play(args):
+    return play_game(*args)
+
+
+class ResultsWriter:
+    """Result rows to CSV, appended as they come, or to Parquet, written on close."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        if self.parquet and pyarrow is None:
+            raise ImportError("Writing Parquet needs pyarrow; use a .csv output")
+        self._columns = {column: [] for column in COLUMNS}
+        self._file = None
+        self._csv = None
+
+    def write(self, rows):
+        if self.parquet:
+            for row in rows:
+                for column in COLUMNS:
+                    self._columns[column].append(row[column])
+            return
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, 'w', newline='')
+            self._csv = csv.DictWriter(self._file, COLUMNS)
+            self._csv.writeheader()
+        self._csv.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        if self.parquet:
+            pyarrow.parquet.write_table(pyarrow.table(self._columns), self.path)
+        elif self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def run_batch(ai_names, games, out, processes=None, seed=0, size=None, turns=300, move_time=None,
+              log_decisions=False):
+    """Play `games` games in `processes` worker processes, write the rows to `out`; return them all."""
+    rng = random.Random(seed)
+    tasks = [(ai_names, i, rng.getrandbits(32), size, turns, move_time, log_decisions) for i in range(games)]
+    results = []
+    start = time.perf_counter()
+    with ResultsWriter(out) as writer, multiprocessing.Pool(processes) as pool:
+        for done, rows in enumerate(pool.imap_unordered(_play, tasks), start=1):
+            writer.write(rows)
+            results.extend(rows)
+            if done % 10 == 0 or done == games:
+                minutes = (time.perf_counter() - start) / 60
+                print(f"{done}/{games} games, {done / minutes:.1f} games/minute")
+    return results
+
+
+def win_rates(rows):
+    """
+    Per AI: games, wins (shared first places included) and win rate with
+    its 95% Wilson confidence interval, best first.
+    """
+    games, wins = defaultdict(int), defaultdict(int)
+    for row in rows:
+        games[row['ai']] += 1
+        wins[row['ai']] += int(row['rank']) == 1
+    table = []
+    for ai in games:
+        n, rate = games[ai], wins[ai] / games[ai]
+        z = 1.96
+        centre = (rate + z * z / (2 * n)) / (1 + z * z / n)
+        margin = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        table.append((ai, n, wins[ai], rate, centre - margin, centre + margin))
+    return sorted(table, key=lambda line: line[3], reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('ais', nargs='+', help="AI module names from models/")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--out', default=os.path.join('data', 'self_play.csv'), help=".csv or .parquet")
+    parser.add_argument('--processes', type=int, default=None, help="default: one per CPU")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, default=None, help="board size, default: a standard size per game")
+    parser.add_argument('--turns', type=int, default=300)
+    parser.add_argument('--move-time', type=float, default=None, help="seconds per move, default: no limit")
+    parser.add_argument('--ratings', default=None, help="rating ledger to update, e.g. data/ratings.json")
+    parser.add_argument('--log-decisions', action='store_true', help="write every move to moves_log/")
+    args = parser.parse_args(argv)
+
+    rows = run_batch(args.ais, args.games, args.out, args.processes, args.seed, args.size, args.turns,
+                     args.move_time, args.log_decisions)
+    print(f"{'AI':<24}{'games':>8}{'wins':>8}{'win rate':>10}   95% CI")
+    for ai, n, wins, rate, low, high in win_rates(rows):
+        print(f"{ai:<24}{n:>8}{wins:>8}{rate:>10.3f}   [{low:.3f}, {high:.3f}]")
+    if args.ratings:
+        ledger = RatingLedger.load(args.ratings)
+        record_rows(ledger, rows)
+        ledger.save()
+
+
+if __name__ == "__main__":
+    main()
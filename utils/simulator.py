@@ -0,0 +1,296 @@
+"""
+Forward model of the Vindinium rules, for search.
+
+`SimState` is a compact, mutable copy of a game: hero positions are flat cell
+indices (see `utils.board`), mine owners live in a ``bytearray`` and
+everything static is shared with the map's `Topology`. `make` plays one hero
+move with the server rules and returns an undo record, `unmake` takes it
+back: a search explores its whole tree on a single state, without copying.
+
+Rules of one move (heroes normally move in turn, hero ``turn % 4 + 1``):
+
+* moving off the map, into a wall or into another hero does nothing;
+* moving into a mine the hero doesn't own costs it 20 life: if it survives,
+  it takes the mine, otherwise it dies;
+* moving into a tavern costs 2 gold and heals 50 life (up to 100), if the
+  hero has the gold;
+* the hero then hits every adjacent enemy for 20 life;
+* a hero killed by another one gives it its mines, a hero killed by a mine
+  loses them (they become neutral). Either way it respawns on its spawn
+  point with full life, killing (telefragging) any hero standing there;
+* finally the hero earns 1 gold per mine and loses 1 life to thirst, but
+  never goes below 1 life.
+
+Heroes are addressed by their server id (1-4); per-hero lists have an unused
+slot 0 so they can be indexed by id directly.
+"""
+
+from game import GameState, HeroState
+from utils.board import EMPTY, MINE, TAVERN, WALL
+
+MAX_LIFE = 100
+MINE_LIFE_COST = 20
+BEER_GOLD_COST = 2
+BEER_LIFE = 50
+ATTACK_DAMAGE = 20
+THIRST = 1
+
+HERO_IDS = (1, 2, 3, 4)
+
+# Direction -> (row, col) offset
+DIRECTIONS = {
+    "North": (-1, 0),
+    "South": (1, 0),
+    "East": (0, 1),
+    "West": (0, -1),
+    "Stay": (0, 0),
+}
+
+
+class SimState:
+    """Compact, mutable game state with make/unmake moves."""
+
+    __slots__ = ("topology", "size", "turn", "max_turns", "pos", "life", "gold", "mine_count", "spawn", "deaths",
+                 "owners", "_log")
+
+    def __init__(self, topology, turn, max_turns, pos, life, gold, spawn, owners):
+        self.topology = topology
+        self.size = topology.size
+        self.turn = turn
+        self.max_turns = max_turns
+        self.pos = pos  # hero id -> cell index
+        self.life = life
+        self.gold = gold
+        self.spawn = spawn
+        self.owners = owners  # cell index -> owner id, 0 for neutral mines
+        self.mine_count = [0] * len(pos)
+        for mine in topology.mines:
+            if owners[mine]:
+                self.mine_count[owners[mine]] += 1
+        self.deaths = [0] * len(pos)  # how many times each hero died in this state's future
+        self._log = None  # mine changes of the move being made
+
+    @classmethod
+    def from_game(cls, game) -> "SimState":
+        """Build the state of the current turn of a `game.Game`."""
+        topology = game.board.topology
+        pos, life, gold, spawn = [-1] * 5, [0] * 5, [0] * 5, [-1] * 5
+        for hero in game.heroes:
+            pos[hero.bot_id] = topology.index(hero.pos)
+            life[hero.bot_id] = hero.life
+            gold[hero.bot_id] = hero.gold
+            spawn[hero.bot_id] = topology.index(hero.spawn_pos)
+        owners = bytearray(len(topology.cells))
+        for mine, owner in game.board.owned_mines().items():
+            owners[mine] = owner
+        return cls(topology, game.turn, game.max_turns, pos, life, gold, spawn, owners)
+
+    def copy(self) -> "SimState":
+        """Independent copy, e.g. to search branches in parallel."""
+        clone = SimState(self.topology, self.turn, self.max_turns, list(self.pos), list(self.life),
+                         list(self.gold), self.spawn, bytearray(self.owners))
+        clone.deaths = list(self.deaths)
+        return clone
+
+    @property
+    def to_move(self) -> int:
+        """Id of the hero whose turn it is."""
+        return self.turn % 4 + 1
+
+    @property
+    def finished(self) -> bool:
+        return self.turn >= self.max_turns
+
+    # -- Moves ---------------------------------------------------------------
+
+    def make(self, hero_id: int, direction: str):
+        """Play `direction` ("North", ..., "Stay") for `hero_id`; return the undo record."""
+        undo = (self.turn, tuple(self.pos), tuple(self.life), tuple(self.gold), tuple(self.mine_count),
+                tuple(self.deaths), [])
+        self._log = undo[6]
+        self._move(hero_id, direction)
+        if self.deaths[hero_id] == undo[5][hero_id]:
+            # Heroes killed by a mine don't fight on the turn they respawn
+            self._fight(hero_id)
+        self.gold[hero_id] += self.mine_count[hero_id]
+        self.life[hero_id] = max(1, self.life[hero_id] - THIRST)
+        self.turn += 1
+        self._log = None
+        return undo
+
+    def unmake(self, undo):
+        """Take back the move that returned `undo` (moves are undone last-in first-out)."""
+        turn, pos, life, gold, mine_count, deaths, mines = undo
+        self.turn = turn
+        self.pos[:] = pos
+        self.life[:] = life
+        self.gold[:] = gold
+        self.mine_count[:] = mine_count
+        self.deaths[:] = deaths
+        owners = self.owners
+        for mine, owner in reversed(mines):
+            owners[mine] = owner
+
+    def step(self, direction: str):
+        """Play `direction` for the hero whose turn it is."""
+        return self.make(self.to_move, direction)
+
+    def legal_moves(self, hero_id: int):
+        """Directions that don't bump into a wall or the border, "Stay" first."""
+        index = self.pos[hero_id]
+        size = self.size
+        by_offset = {-size: "North", size: "South", 1: "East", -1: "West"}
+        return ["Stay"] + [by_offset[n - index] for n in self.topology.neighbours[index]]
+
+    def move_towards(self, hero_id: int, target) -> str:
+        """Direction from `hero_id` to the adjacent (row, col) `target` ("Stay" if not adjacent)."""
+        r, c = divmod(self.pos[hero_id], self.size)
+        offset = (target[0] - r, target[1] - c)
+        for direction, delta in DIRECTIONS.items():
+            if delta == offset:
+                return direction
+        return "Stay"
+
+    def _move(self, hero_id, direction):
+        size = self.size
+        r, c = divmod(self.pos[hero_id], size)
+        dr, dc = DIRECTIONS[direction]
+        r += dr
+        c += dc
+        if not (dr or dc) or not (0 <= r < size and 0 <= c < size):
+            return
+        target = r * size + c
+        topology = self.topology
+        if target in topology.mines:
+            if self.owners[target] != hero_id:
+                self.life[hero_id] -= MINE_LIFE_COST
+                if self.life[hero_id] > 0:
+                    self._set_owner(target, hero_id)
+                else:
+                    self._die(hero_id, 0)
+        elif target in topology.taverns:
+            if self.gold[hero_id] >= BEER_GOLD_COST:
+                self.gold[hero_id] -= BEER_GOLD_COST
+                self.life[hero_id] = min(MAX_LIFE, self.life[hero_id] + BEER_LIFE)
+        elif topology.walkable[target] and target not in self.pos:
+            self.pos[hero_id] = target
+
+    def _fight(self, hero_id):
+        pos = self.pos
+        neighbours = self.topology.neighbours[pos[hero_id]]
+        # Decide who's hit first: a victim may respawn next to the hero
+        for enemy in [e for e in HERO_IDS if e != hero_id and pos[e] in neighbours]:
+            self.life[enemy] -= ATTACK_DAMAGE
+            if self.life[enemy] <= 0:
+                self._die(enemy, hero_id)
+
+    def _die(self, hero_id, killer_id):
+        """Hand `hero_id`'s mines to `killer_id` (0: neutral) and respawn it."""
+        self.deaths[hero_id] += 1
+        owners = self.owners
+        for mine in self.topology.mines:
+            if owners[mine] == hero_id:
+                self._set_owner(mine, killer_id)
+        self.life[hero_id] = MAX_LIFE
+        spawn = self.spawn[hero_id]
+        for other in HERO_IDS:
+            if other != hero_id and self.pos[other] == spawn:
+                # Telefrag: the respawning hero kills whoever stands on its spawn
+                self.pos[hero_id] = -1
+                self._die(other, hero_id)
+        self.pos[hero_id] = spawn
+
+    def _set_owner(self, mine, owner):
+        old = self.owners[mine]
+        self._log.append((mine, old))
+        self.owners[mine] = owner
+        if old:
+            self.mine_count[old] -= 1
+        if owner:
+            self.mine_count[owner] += 1
+
+    # -- Views -----------------------------------------------------------------
+
+    def signature(self):
+        """Everything that changes during a game, to compare two states."""
+        return self.turn, tuple(self.pos), tuple(self.life), tuple(self.gold), bytes(self.owners)
+
+    def mines_of(self, hero_id: int):
+        """(row, col) of the mines owned by `hero_id`, in board order."""
+        owners = self.owners
+        size = self.size
+        return tuple(divmod(mine, size) for mine in sorted(self.topology.mines) if owners[mine] == hero_id)
+
+    def hero_state(self, hero_id: int) -> HeroState:
+        size = self.size
+        return HeroState(hero_id, divmod(self.pos[hero_id], size), self.life[hero_id], self.gold[hero_id],
+                         self.mines_of(hero_id), self.mine_count[hero_id], divmod(self.spawn[hero_id], size), False)
+
+    def board_map(self, hero_id: int):
+        """Legacy rows seen by `hero_id`: itself '@', other heroes 'H', its own mines 'O'."""
+        cells = bytearray(self.topology.cells)
+        owners = self.owners
+        for mine in self.topology.mines:
+            if owners[mine] == hero_id:
+                cells[mine] = 79  # 'O'
+        for other in HERO_IDS:
+            cells[self.pos[other]] = 64 if other == hero_id else 72  # '@' / 'H'
+        text = cells.decode('ascii')
+        size = self.size
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    def snapshot(self, hero_id: int) -> GameState:
+        """`game.GameState` as seen by `hero_id` (board map included, own mines as 'O')."""
+        hero = self.hero_state(hero_id)
+        heroes = tuple(hero if other == hero_id else self.hero_state(other) for other in HERO_IDS)
+        return GameState(self.turn, self.max_turns, hero, heroes, self.board_map(hero_id))
+
+    def tiles(self) -> str:
+        """The server ``tiles`` string of the board."""
+        heroes = {self.pos[hero_id]: hero_id for hero_id in HERO_IDS}
+        owners = self.owners
+        tiles = []
+        for i, cell in enumerate(self.topology.cells):
+            if i in heroes:
+                tiles.append(f"@{heroes[i]}")
+            elif cell == MINE:
+                tiles.append(f"${owners[i]}" if owners[i] else "$-")
+            else:
+                tiles.append(_TILES[cell])
+        return "".join(tiles)
+
+    def to_state(self, hero_id: int, names=None, game_id=None) -> dict:
+        """Server-shaped JSON state as sent to `hero_id` (enough for `game.Game`)."""
+        size = self.size
+        heroes = []
+        for other in HERO_IDS:
+            r, c = divmod(self.pos[other], size)
+            spawn_r, spawn_c = divmod(self.spawn[other], size)
+            heroes.append({
+                'id': other,
+                'name': (names or {}).get(other, f"hero{other}"),
+                'pos': {'x': r, 'y': c},
+                'spawnPos': {'x': spawn_r, 'y': spawn_c},
+                'life': self.life[other],
+                'gold': self.gold[other],
+                'mineCount': self.mine_count[other],
+                'crashed': False,
+            })
+        return {
+            'game': {
+                'id': game_id,
+                'turn': self.turn,
+                'maxTurns': self.max_turns,
+                'heroes': heroes,
+                'board': {'size': size, 'tiles': self.tiles()},
+                'finished': self.finished,
+            },
+            'hero': heroes[hero_id - 1],
+            'token': None,
+            'viewUrl': None,
+            'playUrl': None,
+        }
+
+
+# Cell code -> server tile, for everything but heroes and mines
+_TILES = {EMPTY: "  ", WALL: "##", TAVERN: "[]"}